@@ -3993,14 +3993,14 @@ const addMonitorUser = (user) => {
  * 更新监控用户
  */
 const updateMonitorUser = (userId, user) => {
-  return api.put(`/monitor/config/users/${userId}`, user);
+  return api.put(`/monitor/config/users/id/${userId}`, user);
 };
 
 /**
  * 删除监控用户
  */
 const deleteMonitorUser = (userId) => {
-  return api.delete(`/monitor/config/users/${userId}`);
+  return api.delete(`/monitor/config/users/id/${userId}`);
 };
 
 /**
@@ -1 +1,2 @@
-from .requests import get, post
\ No newline at end of file
+from .requests import get, post
+from .fixtures import configure_fixtures
\ No newline at end of file
@@ -0,0 +1,189 @@
+"""
+上游请求的录制和回放
+录制模式把上游请求和响应写入 gzip 压缩的 JSONL 归档，Cookie 等敏感请求头和由 Cookie 派生的参数会被替换；
+回放模式只从归档中读取响应，不访问网络，用于离线分析解析逻辑和压测。
+压测时可以通过 UPSTREAM_OVERRIDE 把上游请求改发到本地桩服务，只有配置中开启 upstream_fixtures.bench 时生效。
+请求按方法、域名、路径、排序后的参数和请求体索引，签名、时间戳等每次都不同的参数不参与索引。
+"""
+import asyncio
+import gzip
+import hashlib
+import json
+import os
+import threading
+import time
+from typing import Any, Dict, Optional, Tuple
+from urllib.parse import urlencode, urlparse, urlunparse, parse_qsl
+from lib.logger import logger
+
+MODE_RECORD = 'record'
+MODE_REPLAY = 'replay'
+DEFAULT_PATH = 'data/fixtures/upstream.jsonl.gz'
+
+# 不参与索引的参数：签名、时间戳、随机令牌和设备指纹，录制时一并替换（如 verifyFp 取自 Cookie 中的 s_v_web_id）
+VOLATILE_PARAMS = {
+    'a_bogus', 'X-Bogus', 'msToken', 'verifyFp', 'fp', 'webid',  # douyin
+    'w_rid', 'wts', 'dm_img_list', 'dm_img_str', 'dm_cover_img_str', 'dm_img_inter',  # bilibili
+    't', 'sign',  # taobao
+    '_', 'callback', 'timestamp',
+    'token', 'access_token', 'csrf', 'bili_jct', 'xsec_token',
+}
+# 录制时替换的请求头
+REDACTED_HEADERS = {'cookie', 'authorization', 'x-s', 'x-t', 'x-s-common', 'x-csrf-token'}
+REDACTED = '<redacted>'
+
+
+def fixture_key(method: str, url: str, params: Optional[Dict] = None, body: Any = None) -> str:
+    """
+    生成请求的索引
+    :param method: 请求方法
+    :param url: 请求地址，可带查询参数
+    :param params: 查询参数
+    :param body: 请求体，dict 按键排序后参与索引
+    """
+    parsed = urlparse(url)
+    query = [(k, v) for k, v in parse_qsl(parsed.query, keep_blank_values=True) if k not in VOLATILE_PARAMS]
+    query += [(str(k), str(v)) for k, v in (params or {}).items() if k not in VOLATILE_PARAMS and v is not None]
+    key = f'{method.upper()} {parsed.netloc}{parsed.path}'
+    if query:
+        key += '?' + urlencode(sorted(query))
+    if body is not None:
+        if not isinstance(body, (str, bytes)):
+            body = json.dumps(body, sort_keys=True, ensure_ascii=False, separators=(',', ':'))
+        if isinstance(body, str):
+            body = body.encode('utf-8')
+        key += ' #' + hashlib.sha1(body).hexdigest()[:16]
+    return key
+
+
+def redact_headers(headers: Optional[Dict]) -> Dict[str, str]:
+    return {k: REDACTED if k.lower() in REDACTED_HEADERS else str(v) for k, v in (headers or {}).items()}
+
+
+def redact_params(params: Optional[Dict]) -> Optional[Dict]:
+    if params is None:
+        return None
+    return {k: REDACTED if k in VOLATILE_PARAMS else v for k, v in params.items()}
+
+
+def redact_url(url: str) -> str:
+    """替换地址中不参与索引的查询参数"""
+    parsed = urlparse(url)
+    if not parsed.query:
+        return url
+    query = [(k, REDACTED if k in VOLATILE_PARAMS else v) for k, v in parse_qsl(parsed.query, keep_blank_values=True)]
+    return urlunparse(parsed._replace(query=urlencode(query)))
+
+
+class FixtureArchive:
+    """上游响应归档"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._records: Optional[Dict[str, Dict]] = None
+        self._write_lock = threading.Lock()
+
+    def _load(self) -> Dict[str, Dict]:
+        if self._records is None:
+            records = {}
+            if os.path.exists(self.path):
+                with gzip.open(self.path, 'rt', encoding='utf-8') as f:
+                    for line in f:
+                        if line.strip():
+                            record = json.loads(line)
+                            # 同一请求录制多次时以最后一次为准
+                            records[record['key']] = record
+            self._records = records
+        return self._records
+
+    def __len__(self) -> int:
+        return len(self._load())
+
+    def lookup(self, key: str) -> Optional[Tuple[int, str]]:
+        """
+        查找录制的响应
+        :param key: 请求索引
+        :return: (状态码, 响应内容)，未录制时返回 None
+        """
+        record = self._load().get(key)
+        if record is None:
+            return None
+        return record['status'], record['text']
+
+    async def record(self, key: str, method: str, url: str, headers: Optional[Dict], params: Optional[Dict],
+                     body: Any, status: int, text: str) -> None:
+        """
+        录制一次请求，已录制过成功响应的请求不再重复写入
+        """
+        records = self._load()
+        if records.get(key, {}).get('status') == 200:
+            return
+        record = {
+            'key': key,
+            'method': method,
+            'url': redact_url(url),
+            'params': redact_params(params),
+            'headers': redact_headers(headers),
+            'body': body if body is None or isinstance(body, (str, dict, list)) else str(body),
+            'status': status,
+            'text': text,
+            'recorded_at': int(time.time()),
+        }
+        records[key] = record
+        await asyncio.to_thread(self._append, json.dumps(record, ensure_ascii=False))
+
+    def _append(self, line: str) -> None:
+        with self._write_lock:
+            os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+            # gzip 支持多段拼接，每次追加一段，读取时按一个文件处理
+            with gzip.open(self.path, 'at', encoding='utf-8') as f:
+                f.write(line + '\n')
+
+
+_mode = ''
+_archive: Optional[FixtureArchive] = None
+_override = ''
+
+
+def configure_fixtures(config: Optional[Dict] = None) -> None:
+    """
+    设置录制或回放模式，环境变量 UPSTREAM_FIXTURES_MODE、UPSTREAM_FIXTURES 优先于配置
+    :param config: upstream_fixtures 配置，mode 为 record、replay 或空，path 为归档路径，
+        bench 为 true 时才使用环境变量 UPSTREAM_OVERRIDE 指定的上游地址
+    """
+    global _mode, _archive, _override
+    configured = config is not None
+    config = config or {}
+    mode = os.getenv('UPSTREAM_FIXTURES_MODE', config.get('mode', '') or '').lower()
+    path = os.getenv('UPSTREAM_FIXTURES', config.get('path', '') or DEFAULT_PATH)
+    if mode not in ('', MODE_RECORD, MODE_REPLAY):
+        raise ValueError(f'不支持的上游录制模式: {mode}')
+    _mode = mode
+    _archive = FixtureArchive(path) if mode else None
+    if mode:
+        logger.info(f'上游请求{"录制" if mode == MODE_RECORD else "回放"}模式已开启，归档: {path}')
+
+    # 改发地址会带上真实的 Cookie，只在明确开启压测时使用
+    override = os.getenv('UPSTREAM_OVERRIDE', '').rstrip('/')
+    _override = override if config.get('bench', False) else ''
+    if _override:
+        logger.warning(f'压测模式已开启，所有上游请求改发到 {_override}')
+    elif override and configured:
+        logger.warning('设置了 UPSTREAM_OVERRIDE 但未开启 upstream_fixtures.bench，忽略该设置')
+
+
+def fixture_mode() -> str:
+    """当前模式：record、replay 或空字符串"""
+    return _mode
+
+
+def get_archive() -> Optional[FixtureArchive]:
+    return _archive
+
+
+def upstream_override() -> str:
+    """压测时上游请求改发的地址，未开启时为空字符串"""
+    return _override
+
+
+configure_fixtures()
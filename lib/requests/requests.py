@@ -1,18 +1,32 @@
 import httpx
 import json
 import time
+from urllib.parse import urlparse
 from data.driver import Proxies
+from lib.logger import logger
+from utils.account_pool import account_id_of
+from utils.metrics import upstream_requests, upstream_duration, parse_duration, platform_of, normalize_endpoint
+from utils.tracing import span
+from .fixtures import MODE_RECORD, MODE_REPLAY, fixture_key, fixture_mode, get_archive, upstream_override
             
 proxyModel = Proxies("data/proxies/proxies.db")
 proxies = []
 
 class Response:
-    def __init__(self, status_code, text):
+    def __init__(self, status_code, text, platform=''):
         self.status_code = status_code
         self.text = text
+        self.platform = platform
+        self._json = None
 
     def json(self):
-        return json.loads(self.text)
+        # 只解析一次，调用方多次读取时复用结果
+        if self._json is None:
+            start = time.perf_counter()
+            with span('parse'):
+                self._json = json.loads(self.text)
+            parse_duration.observe(time.perf_counter() - start, self.platform)
+        return self._json
 
 def retry_request(func, max_retries=3):
     async def wrapper(*args, **kwargs):
@@ -26,6 +40,48 @@ def retry_request(func, max_retries=3):
 
     return wrapper
 
+def _proxy_label(proxy):
+    """代理的指标标签，只保留主机和端口，不暴露代理地址中的账号密码"""
+    if not proxy:
+        return ''
+    parsed = urlparse(proxy if '://' in proxy else f'//{proxy}')
+    try:
+        port = parsed.port
+    except ValueError:
+        port = None
+    host = parsed.hostname or ''
+    return f'{host}:{port}' if port else host
+
+def _record(url, headers, proxy, status, start):
+    """记录上游请求的次数和耗时"""
+    parsed = urlparse(url)
+    platform = platform_of(parsed.hostname or '')
+    endpoint = normalize_endpoint(parsed.path)
+    cookie = (headers or {}).get('cookie') or (headers or {}).get('Cookie') or ''
+    upstream_requests.inc(platform, endpoint, str(status), account_id_of(platform, cookie), _proxy_label(proxy))
+    upstream_duration.observe(time.perf_counter() - start, platform, endpoint)
+    return platform
+
+def _target(url):
+    """实际请求的地址，压测时改发到本地桩服务，原域名作为路径的第一段"""
+    override = upstream_override()
+    if not override:
+        return url
+    parsed = urlparse(url)
+    target = f'{override}/{parsed.netloc}{parsed.path}'
+    return f'{target}?{parsed.query}' if parsed.query else target
+
+def _replay(method, url, headers, params=None, body=None):
+    """回放模式：从归档中读取响应，不访问网络，未录制的请求返回 404"""
+    start = time.perf_counter()
+    key = fixture_key(method, url, params, body)
+    found = get_archive().lookup(key)
+    if found is None:
+        logger.warning(f'归档中没有录制的响应: {key}')
+        found = (404, '')
+    platform = _record(url, headers, '', found[0], start)
+    return Response(found[0], found[1], platform)
+
 async def get_proxy():
     global proxies
     proxies = await proxyModel.load(enable = 1)
@@ -36,14 +92,41 @@ async def get_proxy():
 
 @retry_request
 async def get(url, headers=None, params=None) -> Response:
+    mode = fixture_mode()
+    if mode == MODE_REPLAY:
+        return _replay('GET', url, headers, params)
     proxy = await get_proxy()
+    start = time.perf_counter()
     async with httpx.AsyncClient(proxy=proxy) as client:
-        response = await client.get(url, headers=headers, params=params)
-        return Response(response.status_code, response.text)
+        try:
+            with span('upstream'):
+                response = await client.get(_target(url), headers=headers, params=params)
+        except Exception:
+            _record(url, headers, proxy, 'error', start)
+            raise
+        platform = _record(url, headers, proxy, response.status_code, start)
+    if mode == MODE_RECORD:
+        await get_archive().record(fixture_key('GET', url, params), 'GET', url, headers, params, None,
+                                   response.status_code, response.text)
+    return Response(response.status_code, response.text, platform)
 
 @retry_request
 async def post(url, headers=None, data=None, json=None) -> Response:
+    mode = fixture_mode()
+    body = json if json is not None else data
+    if mode == MODE_REPLAY:
+        return _replay('POST', url, headers, body=body)
     proxy = await get_proxy()
+    start = time.perf_counter()
     async with httpx.AsyncClient(proxy=proxy) as client:
-        response = await client.post(url, headers=headers, json=json, data=data)
-        return Response(response.status_code, response.text)
+        try:
+            with span('upstream'):
+                response = await client.post(_target(url), headers=headers, json=json, data=data)
+        except Exception:
+            _record(url, headers, proxy, 'error', start)
+            raise
+        platform = _record(url, headers, proxy, response.status_code, start)
+    if mode == MODE_RECORD:
+        await get_archive().record(fixture_key('POST', url, body=body), 'POST', url, headers, None, body,
+                                   response.status_code, response.text)
+    return Response(response.status_code, response.text, platform)
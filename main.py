@@ -5,12 +5,28 @@ from fastapi.responses import FileResponse
 from importlib import import_module
 from lib.logger import logger
 from utils.douyin_monitor import init_monitor
-from utils.scheduler import start_scheduler, stop_scheduler
+from utils.scheduler import start_scheduler, stop_scheduler, get_scheduler
+from utils.feishu_notification import close_feishu_notifier
+from utils.outbox import start_outbox_worker, stop_outbox_worker, delegate_outbox
+from service.monitor.models import outbox, creators
+from utils.monitored_creators import migrate_config_users
+from utils.page_cache import init_page_cache
+from utils.cookie_manager import configure_cookie_alert
+from utils.account_pool import configure_account_pools
+from utils.config_service import config_service
+from utils.douyin_url_parser import close_url_parser_session
+from utils.tracing import configure_tracing, tracing_middleware
+from lib.requests import configure_fixtures
+from utils.loop_monitor import start_loop_monitor, stop_loop_monitor
+from utils.executor import configure_executor, blocking_executor
+from utils.leader import start_leader_election, stop_leader_election
+from utils.shared_state import configure_shared_state, is_multiprocess
+from utils.sqlite_store import close_all_stores
+from service.jobs.logic import start_job_engine, stop_job_engine
+from service.jobs.models import jobs
 import uvicorn
-import yaml
 import argparse
 import os
-import atexit
 
 CONFIG_PATH = ''
 
@@ -34,44 +50,114 @@ app.add_middleware(
     allow_headers=["*"],  # 允许所有请求头
 )
 
-services = ['xhs', 'weibo', 'taobao', 'kuaishou', 'jd', 'douyin', 'bilibili', 'proxies', 'monitor']
+# 记录请求各阶段耗时，输出 Server-Timing 头
+app.middleware("http")(tracing_middleware)
+
+services = ['xhs', 'weibo', 'taobao', 'kuaishou', 'jd', 'douyin', 'bilibili', 'proxies', 'monitor', 'jobs', 'metrics']
 
 def register_router():
     for service in services:
         module = import_module(f'service.{service}.urls')
         app.include_router(getattr(module, 'router'))
 
+async def start_leader_tasks():
+    """启动只在主进程运行的后台任务"""
+    # 把配置文件中的监控博主迁移到数据库，与是否启用监控无关
+    await migrate_config_users(creators)
+    # 启动采集任务引擎
+    jobs_config = app.state.config.get('jobs', {})
+    if jobs_config.get('enabled', True):
+        await start_job_engine(jobs, jobs_config)
+    # 启动飞书通知发件箱投递协程
+    outbox_config = app.state.config.get('outbox', {})
+    if outbox_config.get('enabled', True):
+        start_outbox_worker(outbox, outbox_config)
+    # 启动定时任务调度器
+    if app.state.config.get('douyin_monitor', {}).get('enabled', False):
+        start_scheduler()
+        await get_scheduler().publish_status()
+        logger.info("定时任务调度器已启动")
+
+@app.on_event("startup")
+async def start_background_tasks():
+    # 启用发件箱时，其他进程的通知也写入发件箱，由主进程投递
+    if app.state.config.get('outbox', {}).get('enabled', True):
+        delegate_outbox()
+    # 多进程部署时只有持有文件锁的主进程运行定时任务和后台任务
+    await start_leader_election(app.state.workers, start_leader_tasks)
+    # 监听配置文件的外部修改
+    config_service.start()
+    # 监控阻塞事件循环的同步调用
+    start_loop_monitor(app.state.config.get('loop_monitor', {}))
+
+@app.on_event("shutdown")
+async def stop_background_tasks():
+    await stop_loop_monitor()
+    stop_scheduler()
+    await stop_job_engine()
+    await stop_outbox_worker()
+    # 发送完队列中的飞书通知并关闭会话
+    await close_feishu_notifier()
+    await close_url_parser_session()
+    # 停止监听配置文件并写回尚未保存的配置
+    await config_service.stop()
+    # 关闭签名和解析使用的线程池、进程池
+    blocking_executor.shutdown()
+    # 关闭所有 SQLite 存储的连接，否则连接线程会阻止进程退出
+    await close_all_stores()
+    # 释放主进程锁，其他进程接管后台任务
+    await stop_leader_election()
+
 def init_service():
     global CONFIG_PATH
     if CONFIG_PATH == '':
         CONFIG_PATH = os.getenv("FILE", 'config/config.yaml')
-    with open(CONFIG_PATH, 'r', encoding='utf-8') as f:
-        config = yaml.safe_load(f)
-        logger.setup(config)
-        
-        # 初始化抖音监控器
-        douyin_monitor_config = config.get('douyin_monitor', {})
-        if douyin_monitor_config.get('enabled', False):
-            monitor = init_monitor(douyin_monitor_config)
-            logger.info(f"抖音监控器初始化完成，状态：{monitor.get_status()}")
-            
-            # 启动定时任务调度器
-            start_scheduler()
-            logger.info("定时任务调度器已启动")
-            
-            # 注册退出时的清理函数
-            atexit.register(stop_scheduler)
-        else:
-            logger.info("抖音监控功能未启用")
+    config = config_service.load(CONFIG_PATH)
+    logger.setup(config)
+    app.state.config = config
+
+    # 初始化搜索分页缓存
+    init_page_cache(config.get('page_cache', {}))
+
+    # Cookie 过期提醒配置
+    configure_cookie_alert(config.get('cookie_alert', {}))
+    # 账号自动过期和隔离配置
+    configure_account_pools(config.get('account_pool', {}))
+    # 请求耗时追踪配置
+    configure_tracing(config.get('tracing', {}))
+    # 上游请求录制和回放
+    configure_fixtures(config.get('upstream_fixtures', {}))
+    # 签名和解析等阻塞任务的执行器
+    configure_executor(config.get('executor', {}))
+    # 多进程部署时启用进程间共享状态
+    workers_config = dict(config.get('workers', {}))
+    if os.getenv('WORKERS'):
+        workers_config['count'] = int(os.getenv('WORKERS'))
+    app.state.workers = workers_config
+    configure_shared_state(workers_config)
+    config_service.multiprocess = is_multiprocess(workers_config)
+    
+    # 初始化抖音监控器
+    douyin_monitor_config = config.get('douyin_monitor', {})
+    if douyin_monitor_config.get('enabled', False):
+        monitor = init_monitor(douyin_monitor_config)
+        logger.info(f"抖音监控器初始化完成，状态：{monitor.get_status()}")
+    else:
+        logger.info("抖音监控功能未启用")
 
 if __name__ == '__main__':
     parser = argparse.ArgumentParser(description='Crawler server.')
     parser.add_argument('-f', '--file', type=str, help='path of config file', default='config/config.yaml')
+    parser.add_argument('-w', '--workers', type=int, help='number of worker processes, default workers.count in config')
     args = parser.parse_args()
     CONFIG_PATH = args.file
+    # 工作进程重新导入 main，通过环境变量传递配置文件路径和进程数
+    os.environ['FILE'] = CONFIG_PATH
+    if args.workers:
+        os.environ['WORKERS'] = str(args.workers)
     register_router()
     init_service()
-    uvicorn.run("main:app", host="0.0.0.0", port=8080)
+    uvicorn.run("main:app", host="0.0.0.0", port=8080, workers=app.state.workers.get('count', 1))
 else:
     register_router()
     init_service()
\ No newline at end of file
@@ -0,0 +1,294 @@
+"""
+离线压测
+启动回放录制响应的上游桩服务，再以 UPSTREAM_OVERRIDE 指向桩服务启动真实的 FastAPI 服务，
+逐个接口发起请求，统计吞吐量、p50/p95/p99 延迟和每个请求消耗的服务进程 CPU 时间。
+服务在临时目录中运行，使用独立的数据库和配置，不影响本地的账号数据。
+结果保存在 script/bench/results 目录，默认与上一次的结果对比。
+
+python script/bench/bench.py --requests 300 --concurrency 16 --latency-ms 80
+python script/bench/bench.py --scenarios douyin.detail,jd.search --error-rate 0.05
+"""
+import argparse
+import asyncio
+import glob
+import json
+import os
+import shutil
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+from typing import Dict, List, Optional
+import httpx
+import yaml
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+ROOT_DIR = os.path.dirname(os.path.dirname(BENCH_DIR))
+RESULT_DIR = os.path.join(BENCH_DIR, 'results')
+
+# (场景名称, 平台, 请求路径)，路径中的 {n} 替换为请求序号，用于绕过分页缓存
+SCENARIOS = [
+    ('douyin.detail', 'douyin', '/douyin/detail?id=7400000000000000001'),
+    ('douyin.comments', 'douyin', '/douyin/comments?id=7400000000000000001&offset=0&limit=20'),
+    ('bilibili.detail', 'bilibili', '/bilibili/detail?id=BV1bench4Ux7'),
+    ('xhs.detail', 'xhs', '/xhs/detail?id=66a0000000000000000000b1'),
+    ('kuaishou.detail', 'kuaishou', '/kuaishou/detail?id=3xbenchphoto'),
+    ('weibo.detail', 'weibo', '/weibo/detail?id=5000000000000001'),
+    ('jd.search', 'jd', '/jd/search?keyword=bench{n}&offset=0&limit=30'),
+    ('taobao.search', 'taobao', '/taobao/search?keyword=bench{n}&offset=0&limit=48'),
+]
+
+# 压测账号的 Cookie，只需满足各平台解析 Cookie 的格式
+ACCOUNTS = {
+    'douyin': 'sessionid=bench; s_v_web_id=verify_bench; dy_swidth=2560; dy_sheight=1440',
+    'bilibili': 'SESSDATA=bench; bili_jct=bench; DedeUserID=2000001',
+    'xhs': 'a1=bench; web_session=bench; webId=bench',
+    'kuaishou': 'did=web_bench; kuaishou.server.web_st=bench',
+    'weibo': 'SUB=bench; SUBP=bench',
+    'jd': 'thor=bench; pin=bench',
+    'taobao': '_m_h5_tk=benchtoken_1720000000000; _m_h5_tk_enc=bench; cookie2=bench',
+}
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+
+def prepare_workspace(log_level: str) -> str:
+    """
+    创建运行服务的临时目录：代码以软链接引用，数据目录只复制代码不复制数据库
+    :return: 临时目录路径
+    """
+    workspace = tempfile.mkdtemp(prefix='crawler-bench-')
+    for name in os.listdir(ROOT_DIR):
+        if name in ('data', 'frontend', '.git', '.log', '.venv') or name.startswith('.'):
+            continue
+        os.symlink(os.path.join(ROOT_DIR, name), os.path.join(workspace, name))
+
+    data_dir = os.path.join(ROOT_DIR, 'data')
+    if os.path.isdir(data_dir):
+        shutil.copytree(data_dir, os.path.join(workspace, 'data'),
+                        ignore=shutil.ignore_patterns('*.db', '*.db-wal', '*.db-shm', '__pycache__'))
+    for service in list(ACCOUNTS) + ['proxies', 'monitor', 'jobs']:
+        os.makedirs(os.path.join(workspace, 'data', service), exist_ok=True)
+
+    dist_dir = os.path.join(ROOT_DIR, 'frontend', 'dist')
+    if os.path.isdir(os.path.join(dist_dir, 'assets')):
+        os.symlink(os.path.join(ROOT_DIR, 'frontend'), os.path.join(workspace, 'frontend'))
+    else:
+        os.makedirs(os.path.join(workspace, 'frontend', 'dist', 'assets'))
+
+    config = {
+        'logger': {'type': 'file', 'level': log_level, 'path': '.log/crawler.log', 'backupcount': 1,
+                   'format': '[%(asctime)s][%(name)s][%(levelname)s]: %(message)s'},
+        'douyin_monitor': {'enabled': False},
+        'jobs': {'enabled': False},
+        'outbox': {'enabled': False},
+        # 只有开启 bench 时服务才使用 UPSTREAM_OVERRIDE
+        'upstream_fixtures': {'bench': True},
+    }
+    with open(os.path.join(workspace, 'bench-config.yaml'), 'w', encoding='utf-8') as f:
+        yaml.dump(config, f, allow_unicode=True)
+    return workspace
+
+
+def process_cpu_seconds(pid: int) -> Optional[float]:
+    """读取进程累计的用户态和内核态 CPU 时间"""
+    try:
+        with open(f'/proc/{pid}/stat', 'r') as f:
+            fields = f.read().rsplit(')', 1)[1].split()
+        return (int(fields[11]) + int(fields[12])) / os.sysconf('SC_CLK_TCK')
+    except OSError:
+        pass
+    try:
+        import psutil
+        times = psutil.Process(pid).cpu_times()
+        return times.user + times.system
+    except Exception:
+        return None
+
+
+async def wait_ready(url: str, process: subprocess.Popen, timeout: float = 30):
+    async with httpx.AsyncClient() as client:
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            if process.poll() is not None:
+                raise RuntimeError(f'进程已退出，退出码 {process.returncode}')
+            try:
+                await client.get(url, timeout=1)
+                return
+            except httpx.HTTPError:
+                await asyncio.sleep(0.2)
+    raise RuntimeError(f'等待 {url} 启动超时')
+
+
+def percentile(values: List[float], p: float) -> float:
+    if not values:
+        return 0.0
+    index = min(len(values) - 1, max(0, int(round(p / 100 * len(values) + 0.5)) - 1))
+    return values[index]
+
+
+async def run_scenario(client: httpx.AsyncClient, app_pid: int, path: str, requests: int, concurrency: int,
+                       warmup: int) -> Dict:
+    """
+    以固定并发发起请求并统计结果
+    :param path: 请求路径
+    :param requests: 请求数
+    :param concurrency: 并发数
+    :param warmup: 预热请求数，不计入结果
+    """
+    for n in range(warmup):
+        await client.get(path.replace('{n}', f'w{n}'))
+
+    latencies = []
+    errors = 0
+    counter = iter(range(requests))
+
+    async def worker():
+        nonlocal errors
+        for n in counter:
+            start = time.perf_counter()
+            try:
+                response = await client.get(path.replace('{n}', str(n)))
+                ok = response.status_code == 200 and response.json().get('code') == 0
+            except Exception:
+                ok = False
+            latencies.append(time.perf_counter() - start)
+            if not ok:
+                errors += 1
+
+    cpu_before = process_cpu_seconds(app_pid)
+    started = time.perf_counter()
+    await asyncio.gather(*[worker() for _ in range(concurrency)])
+    elapsed = time.perf_counter() - started
+    cpu_after = process_cpu_seconds(app_pid)
+
+    latencies.sort()
+    cpu = cpu_after - cpu_before if cpu_before is not None and cpu_after is not None else None
+    return {
+        'requests': len(latencies),
+        'errors': errors,
+        'throughput': round(len(latencies) / elapsed, 2),
+        'p50_ms': round(percentile(latencies, 50) * 1000, 2),
+        'p95_ms': round(percentile(latencies, 95) * 1000, 2),
+        'p99_ms': round(percentile(latencies, 99) * 1000, 2),
+        'cpu_ms_per_request': round(cpu * 1000 / len(latencies), 3) if cpu is not None and latencies else None,
+    }
+
+
+def git_revision() -> str:
+    try:
+        return subprocess.check_output(['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT_DIR,
+                                       stderr=subprocess.DEVNULL).decode().strip()
+    except Exception:
+        return ''
+
+
+def load_previous(compare: str) -> Optional[Dict]:
+    if compare == 'none':
+        return None
+    if compare == 'latest':
+        files = sorted(glob.glob(os.path.join(RESULT_DIR, '*.json')))
+        if not files:
+            return None
+        compare = files[-1]
+    with open(compare, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def print_report(results: Dict, previous: Optional[Dict]):
+    columns = ('throughput', 'p50_ms', 'p95_ms', 'p99_ms', 'cpu_ms_per_request')
+    print(f"{'scenario':<18}{'req':>6}{'err':>6}" + ''.join(f'{column:>22}' for column in columns))
+    for name, result in results['scenarios'].items():
+        before = (previous or {}).get('scenarios', {}).get(name, {})
+        cells = []
+        for column in columns:
+            value, old = result.get(column), before.get(column)
+            cell = '-' if value is None else f'{value}'
+            if value is not None and old:
+                cell += f' ({(value - old) / old * 100:+.1f}%)'
+            cells.append(f'{cell:>22}')
+        print(f"{name:<18}{result['requests']:>6}{result['errors']:>6}" + ''.join(cells))
+    if previous:
+        print(f"对比结果: {previous.get('started_at')} ({previous.get('revision') or '-'})")
+
+
+async def main(args):
+    scenarios = [s for s in SCENARIOS if not args.scenarios or s[0] in args.scenarios.split(',')]
+    if not scenarios:
+        raise SystemExit(f"没有匹配的场景，可选: {', '.join(s[0] for s in SCENARIOS)}")
+    previous = load_previous(args.compare)
+
+    stub_port, app_port = free_port(), free_port()
+    workspace = prepare_workspace(args.log_level)
+    stub = subprocess.Popen(
+        [sys.executable, os.path.join(BENCH_DIR, 'stub_upstream.py'), '--port', str(stub_port),
+         '--latency-ms', str(args.latency_ms), '--jitter-ms', str(args.jitter_ms),
+         '--error-rate', str(args.error_rate), '--timeout-rate', str(args.timeout_rate),
+         '--timeout-seconds', str(args.timeout_seconds)] + (['--archive', args.archive] if args.archive else []))
+    env = dict(os.environ, UPSTREAM_OVERRIDE=f'http://127.0.0.1:{stub_port}',
+               FILE=os.path.join(workspace, 'bench-config.yaml'))
+    app = subprocess.Popen([sys.executable, '-m', 'uvicorn', 'main:app', '--host', '127.0.0.1',
+                            '--port', str(app_port), '--log-level', 'warning'], cwd=workspace, env=env)
+    try:
+        await wait_ready(f'http://127.0.0.1:{stub_port}/_stats', stub)
+        await wait_ready(f'http://127.0.0.1:{app_port}/proxies/list', app)
+
+        limits = httpx.Limits(max_connections=args.concurrency, max_keepalive_connections=args.concurrency)
+        async with httpx.AsyncClient(base_url=f'http://127.0.0.1:{app_port}', limits=limits,
+                                     timeout=args.timeout_seconds + 30) as client:
+            for platform in {s[1] for s in scenarios}:
+                await client.post(f'/{platform}/add_account', json={'id': 'bench', 'cookie': ACCOUNTS[platform]})
+
+            results = {
+                'started_at': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+                'revision': git_revision(),
+                'options': {key: value for key, value in vars(args).items() if key != 'compare'},
+                'scenarios': {},
+            }
+            for name, _, path in scenarios:
+                print(f'运行 {name} ...', flush=True)
+                results['scenarios'][name] = await run_scenario(
+                    client, app.pid, path, args.requests, args.concurrency, args.warmup)
+    finally:
+        for process in (app, stub):
+            process.terminate()
+        for process in (app, stub):
+            try:
+                process.wait(timeout=10)
+            except subprocess.TimeoutExpired:
+                process.kill()
+        if args.keep_workspace:
+            print(f'服务运行目录: {workspace}')
+        else:
+            shutil.rmtree(workspace, ignore_errors=True)
+
+    os.makedirs(RESULT_DIR, exist_ok=True)
+    output = os.path.join(RESULT_DIR, datetime.now().strftime('%Y%m%d-%H%M%S') + '.json')
+    with open(output, 'w', encoding='utf-8') as f:
+        json.dump(results, f, ensure_ascii=False, indent=2)
+    print_report(results, previous)
+    print(f'结果已保存: {output}')
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Offline benchmark against a replaying upstream stub.')
+    parser.add_argument('--scenarios', type=str, default='', help='comma separated scenarios, default all')
+    parser.add_argument('--requests', type=int, default=200, help='requests per scenario')
+    parser.add_argument('--concurrency', type=int, default=8)
+    parser.add_argument('--warmup', type=int, default=5, help='warmup requests per scenario, not counted')
+    parser.add_argument('--latency-ms', type=float, default=50, help='stub upstream base latency')
+    parser.add_argument('--jitter-ms', type=float, default=10, help='stub upstream latency jitter')
+    parser.add_argument('--error-rate', type=float, default=0, help='ratio of upstream 500 responses')
+    parser.add_argument('--timeout-rate', type=float, default=0, help='ratio of upstream responses that hang')
+    parser.add_argument('--timeout-seconds', type=float, default=10, help='how long a hanging response hangs')
+    parser.add_argument('--archive', type=str, default='', help='replay an archive captured by lib/requests record mode')
+    parser.add_argument('--log-level', type=str, default='INFO', help='log level of the service under test')
+    parser.add_argument('--compare', type=str, default='latest', help="result file to compare with, 'latest' or 'none'")
+    parser.add_argument('--keep-workspace', action='store_true', help='keep the temporary service directory')
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,150 @@
+"""
+压测用的上游桩服务
+按 fixtures 目录中录制的响应回放各平台的上游接口，支持设置延迟和注入错误。
+服务以 UPSTREAM_OVERRIDE 的形式接收请求：原域名作为路径的第一段，如
+http://127.0.0.1:9000/www.douyin.com/aweme/v1/web/aweme/detail/?aweme_id=1
+
+也可以回放 lib/requests 录制模式生成的归档（--archive），归档中的响应优先于 fixtures 目录。
+
+单独运行：python script/bench/stub_upstream.py --port 9000 --latency-ms 80 --error-rate 0.02
+"""
+import argparse
+import asyncio
+import glob
+import gzip
+import json
+import os
+import random
+from fnmatch import fnmatch
+from typing import Dict, List, Optional
+from urllib.parse import urlparse
+from fastapi import FastAPI, Request
+from fastapi.responses import Response
+import uvicorn
+
+FIXTURE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures')
+
+
+def load_fixtures(directory: str = FIXTURE_DIR) -> List[Dict]:
+    """
+    加载录制的上游响应
+    每个平台一个 JSON 文件，responses 中每项包含 method、host、path（可用 * 通配）、status、
+    headers，响应体为 body（文本）或 json（对象）
+    :param directory: 响应文件目录
+    :return: 响应列表，按文件中的顺序匹配
+    """
+    fixtures = []
+    for path in sorted(glob.glob(os.path.join(directory, '*.json'))):
+        with open(path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        for item in data.get('responses', []):
+            body = item.get('body')
+            if body is None:
+                body = json.dumps(item.get('json', {}), ensure_ascii=False, separators=(',', ':'))
+            fixtures.append({
+                'platform': data.get('platform', ''),
+                'method': item.get('method', 'GET').upper(),
+                'host': item['host'],
+                'path': item['path'],
+                'status': item.get('status', 200),
+                'headers': item.get('headers', {'content-type': 'application/json; charset=utf-8'}),
+                'body': body.encode('utf-8'),
+            })
+    return fixtures
+
+
+def load_archive(path: str) -> List[Dict]:
+    """
+    加载 lib/requests 录制模式生成的归档，按域名和路径匹配，同一路径以最后录制的成功响应为准
+    :param path: 归档路径
+    """
+    fixtures: Dict[tuple, Dict] = {}
+    with gzip.open(path, 'rt', encoding='utf-8') as f:
+        for line in f:
+            if not line.strip():
+                continue
+            record = json.loads(line)
+            parsed = urlparse(record['url'])
+            key = (record['method'], parsed.netloc, parsed.path)
+            if record['status'] != 200 and key in fixtures:
+                continue
+            fixtures[key] = {
+                'platform': '',
+                'method': record['method'],
+                'host': parsed.netloc,
+                'path': parsed.path,
+                'status': record['status'],
+                'headers': {},
+                'body': record['text'].encode('utf-8'),
+            }
+    return list(fixtures.values())
+
+
+def find_fixture(fixtures: List[Dict], method: str, host: str, path: str) -> Optional[Dict]:
+    for fixture in fixtures:
+        if fixture['method'] == method and fixture['host'] == host and fnmatch(path, fixture['path']):
+            return fixture
+    return None
+
+
+def create_app(fixtures: List[Dict], latency_ms: float = 0, jitter_ms: float = 0, error_rate: float = 0,
+               error_status: int = 500, timeout_rate: float = 0, timeout_seconds: float = 30) -> FastAPI:
+    """
+    创建桩服务
+    :param fixtures: 录制的响应
+    :param latency_ms: 每个响应的基础延迟（毫秒）
+    :param jitter_ms: 延迟的随机抖动范围（毫秒）
+    :param error_rate: 返回 error_status 的比例
+    :param error_status: 注入的错误状态码
+    :param timeout_rate: 长时间不响应的比例，用于模拟上游超时
+    :param timeout_seconds: 模拟超时时的等待时间
+    """
+    app = FastAPI()
+    app.state.stats = {'requests': 0, 'errors': 0, 'timeouts': 0, 'missing': 0}
+
+    @app.api_route('/{host}/{path:path}', methods=['GET', 'POST'])
+    async def replay(host: str, path: str, request: Request):
+        stats = app.state.stats
+        stats['requests'] += 1
+        delay = latency_ms + random.uniform(-jitter_ms, jitter_ms)
+        if delay > 0:
+            await asyncio.sleep(delay / 1000)
+        roll = random.random()
+        if roll < timeout_rate:
+            stats['timeouts'] += 1
+            await asyncio.sleep(timeout_seconds)
+        if roll < timeout_rate + error_rate:
+            stats['errors'] += 1
+            return Response(status_code=error_status)
+        fixture = find_fixture(fixtures, request.method, host, '/' + path)
+        if fixture is None:
+            stats['missing'] += 1
+            return Response(status_code=404, content=f'no fixture for {request.method} {host}/{path}')
+        return Response(status_code=fixture['status'], content=fixture['body'], headers=fixture['headers'])
+
+    @app.get('/_stats')
+    async def get_stats():
+        return app.state.stats
+
+    return app
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Upstream stub server for benchmarks.')
+    parser.add_argument('--host', type=str, default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=9000)
+    parser.add_argument('--fixtures', type=str, default=FIXTURE_DIR, help='directory of recorded responses')
+    parser.add_argument('--archive', type=str, default='', help='archive captured by lib/requests record mode')
+    parser.add_argument('--latency-ms', type=float, default=0, help='base latency of every response')
+    parser.add_argument('--jitter-ms', type=float, default=0, help='random latency jitter')
+    parser.add_argument('--error-rate', type=float, default=0, help='ratio of responses replaced by --error-status')
+    parser.add_argument('--error-status', type=int, default=500)
+    parser.add_argument('--timeout-rate', type=float, default=0, help='ratio of responses that never arrive in time')
+    parser.add_argument('--timeout-seconds', type=float, default=30)
+    args = parser.parse_args()
+    fixtures = load_fixtures(args.fixtures)
+    if args.archive:
+        fixtures = load_archive(args.archive) + fixtures
+    stub = create_app(fixtures, args.latency_ms, args.jitter_ms, args.error_rate,
+                      args.error_status, args.timeout_rate, args.timeout_seconds)
+    uvicorn.run(stub, host=args.host, port=args.port, log_level='warning')
@@ -1,24 +1,32 @@
 from .common import common_request, detail_request, API_HOST
+from utils.cursor_cache import cursor_cache, resume_point, encode_cursor
 import json
 
-async def request_comments(id: str, cookie: str, offset: int, limit: int) -> tuple[dict, bool]:
+async def request_comments(id: str, cookie: str, offset: int, limit: int, cursor: str = '') -> tuple[dict, bool]:
     """
     请求bilibili获取评论信息
+    :param cursor: 上一页返回的续页令牌，为空时使用服务端游标缓存
     """
     headers = {"cookie": cookie}
-    data, succ = await detail_request(id, headers)
-    if not succ:
-        return data, succ
-    oid = data.get('aid', 0)
+    start, state, total = resume_point('bilibili', id, offset, cursor, {})
+    # 令牌经过签名，其中的 oid 由服务端根据同一视频写入，带有 oid 时无需再请求视频详情页
+    oid = state.get('oid', 0)
+    if not oid:
+        data, succ = await detail_request(id, headers)
+        if not succ:
+            return data, succ
+        oid = data.get('aid', 0)
+        start, state, total = 0, {}, None
+    total = total or 0
     end_length = offset + limit
     comments = []
-    pagination = '{"offset":""}'
-    is_end = False
-    total = 0
+    pagination = state.get('pagination', '{"offset":""}')
+    is_end = state.get('is_end', False)
+    next_cursor = '' if is_end else encode_cursor('bilibili', id, start, {'oid': oid, 'pagination': pagination, 'is_end': is_end}, total)
     # tip: web_location 可能需要定期更换
-    while not is_end and len(comments) < end_length:
+    while not is_end and start + len(comments) < end_length:
         params = {'oid': oid, 'type': 1, 'mode': 3, 'pagination_str': pagination, 'plat': 1, 'web_location': 1315875}
-        if comments == []: # 第一次要加这个参数
+        if start == 0 and comments == []: # 第一次要加这个参数
             params['seek_rpid'] = ''
         resp, succ = await common_request(API_HOST, '/x/v2/reply/wbi/main', params, headers, False, True)
         if not succ:
@@ -28,7 +36,11 @@ async def request_comments(id: str, cookie: str, offset: int, limit: int) -> tup
         pagination = '{"offset":%s}' % next_offset
         is_end = resp.get('data', {}).get('cursor', {}).get('is_end', False)
         total = resp.get('data', {}).get('cursor', {}).get('all_count', 0)
+        state = {'oid': oid, 'pagination': pagination, 'is_end': is_end}
+        position = start + len(comments)
+        cursor_cache.put('bilibili', id, position, state, total)
+        if position <= end_length:
+            next_cursor = '' if is_end else encode_cursor('bilibili', id, position, state, total)
 
-    ret = {'total': total, 'comments': comments[offset:end_length]}
+    ret = {'total': total, 'comments': comments[offset - start:end_length - start], 'cursor': next_cursor}
     return ret, True
-
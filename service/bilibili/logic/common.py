@@ -1,7 +1,11 @@
 from lib.logger import logger
 from bs4 import BeautifulSoup
 from lib import requests
-from utils.cookie_manager import check_cookie_expired
+from utils.cookie_manager import check_cookie_expired, report_auth_failure
+from utils.account_pool import AUTH_FAILURE_STATUS
+from utils.metrics import sign_duration
+from utils.tracing import span, traced
+from utils.executor import run_blocking, HASH, HTML
 import urllib.parse
 import time
 import hashlib
@@ -35,6 +39,7 @@ COMMON_HEADERS = {
 }
 
 
+@traced('bilibili.request')
 async def common_request(host: str, uri: str, params: dict, headers: dict, doc: bool = False, need_sign: bool = False) -> tuple[dict, bool]:
     """
     请求 bilibili
@@ -56,7 +61,8 @@ async def common_request(host: str, uri: str, params: dict, headers: dict, doc:
         headers['cookie'] = cookie
 
     if need_sign:
-        params = await sign(params)
+        with sign_duration.time('bilibili'), span('bilibili.sign'):
+            params = await sign(params)
     if doc:
         headers['accept'] = "text/html,application/xhtml+xml,application/xml;q=0.9,image/avif,image/webp,image/apng,*/*;q=0.8,application/signed-exchange;v=b3;q=0.7"
 
@@ -69,6 +75,8 @@ async def common_request(host: str, uri: str, params: dict, headers: dict, doc:
     if response.status_code != 200 or response.text == '':
         logger.error(
             f'url: {url}, params: {params}, request error, code: {response.status_code}, body: {response.text}')
+        if response.status_code in AUTH_FAILURE_STATUS:
+            await report_auth_failure('bilibili', cookie)
         return {}, False
 
     if doc:
@@ -80,10 +88,9 @@ async def common_request(host: str, uri: str, params: dict, headers: dict, doc:
             f'url: {url}, params: {params}, request error, code: {response.status_code}, body: {response.text}')
         
         # 检查Cookie是否过期
-        cookie = headers.get('cookie', '') or headers.get('Cookie', '')
         if cookie:
             account_id = cookie.split(';')[0].split('=')[1] if '=' in cookie.split(';')[0] else 'unknown'
-            is_expired, _ = await check_cookie_expired(response_json, 'bilibili', account_id)
+            is_expired, _ = await check_cookie_expired(response_json, 'bilibili', account_id, cookie=cookie)
             if is_expired:
                 logger.warning(f'Cookie已过期: account_id={account_id}')
         
@@ -93,16 +100,36 @@ async def common_request(host: str, uri: str, params: dict, headers: dict, doc:
 
 
 def extract_outermost_json(text):
-    # 尝试从字符串的不同长度解析JSON，直到成功
-    for i in range(len(text), 0, -1):
-        try:
-            # 尝试解析前i个字符
-            json_obj = json.loads(text[:i])
-            return json_obj
-        except json.JSONDecodeError:
-            # 如果解析失败，继续尝试下一个长度
-            continue
-    raise ValueError("No valid JSON found")
+    """
+    解析字符串开头的 JSON，忽略其后的脚本内容
+    :param text: 以 JSON 开头的字符串
+    :return: 解析结果
+    """
+    try:
+        json_obj, _ = json.JSONDecoder().raw_decode(text.lstrip())
+        return json_obj
+    except json.JSONDecodeError:
+        raise ValueError("No valid JSON found")
+
+
+def parse_detail_html(document: str) -> tuple[dict, dict]:
+    """
+    解析视频详情页
+    :param document: 详情页 html
+    :return: 下载信息和视频信息
+    """
+    soup = BeautifulSoup(document, 'html.parser')
+    # 下载信息
+    pattern = re.compile('window\\.__playinfo__.*')
+    target = soup.head.find('script', text=pattern).text.replace(
+        'window.__playinfo__=', '')
+    download_data = json.loads(target).get("data", {})
+    # 视频信息
+    pattern = re.compile('window\\.__INITIAL_STATE__=')
+    target = extract_outermost_json(soup.head.find(
+        'script', text=pattern).text.replace('window.__INITIAL_STATE__=', ''))
+    detail_data = target.get('videoData', {})
+    return download_data, detail_data
 
 
 async def detail_request(id: str,  headers: dict) -> tuple[dict, bool]:
@@ -115,17 +142,8 @@ async def detail_request(id: str,  headers: dict) -> tuple[dict, bool]:
     if not succ:
         return {}, succ
     try:
-        # 下载信息
-        soup = BeautifulSoup(document, 'html.parser')
-        pattern = re.compile('window\\.__playinfo__.*')
-        target = soup.head.find('script', text=pattern).text.replace(
-            'window.__playinfo__=', '')
-        download_data = json.loads(target).get("data", {})
-        # 视频信息
-        pattern = re.compile('window\\.__INITIAL_STATE__=')
-        target = extract_outermost_json(soup.head.find(
-            'script', text=pattern).text.replace('window.__INITIAL_STATE__=', ''))
-        detail_data = target.get('videoData', {})
+        with span('bilibili.parse'):
+            download_data, detail_data = await run_blocking(HTML, parse_detail_html, document, size=len(document))
     except Exception as e:
         logger.error(f'parse hrml error, id: {id}, headers: {headers} doc: {document}, err: {e}')
         return {}, False
@@ -185,11 +203,15 @@ async def sign(params: dict):
               for k, v in params.items()}
     query = urllib.parse.urlencode(params)
     salt = await get_img_url_sub_url()
-    wbi_sign = hashlib.md5((query + salt).encode()).hexdigest()  # 计算 w_rid
+    wbi_sign = await run_blocking(HASH, wbi_md5, query + salt, size=len(query))  # 计算 w_rid
     params['w_rid'] = wbi_sign
     return params
 
 
+def wbi_md5(text: str) -> str:
+    return hashlib.md5(text.encode()).hexdigest()
+
+
 def random_cacl_1(a, b) -> list:
     random_search_seed = random.randint(0, 114)
     return [2 * a + 2 * b + 3 * random_search_seed, 4 * a - b + random_search_seed, random_search_seed]
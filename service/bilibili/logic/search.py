@@ -1,4 +1,5 @@
 from .common import common_request, API_HOST
+from utils.page_cache import page_cache, account_key, is_full_page
 from asyncio import gather
 
 async def request_search(keyword: str, cookie: str, offset: int = 0, limit: int = 10) -> dict:
@@ -9,8 +10,12 @@ async def request_search(keyword: str, cookie: str, offset: int = 0, limit: int
     start_page = int( offset / page_size )+ 1
     end_page = int((offset + limit - 1) / page_size) + 1
     ret = []
-    tasks = [request_page(keyword, cookie, page) for page in range(start_page, end_page + 1)]
+    account = account_key(cookie)
+    tasks = [page_cache.get(('bilibili', account, keyword, page), lambda page=page: request_page(keyword, cookie, page))
+             for page in range(start_page, end_page + 1)]
     pages = await gather(*tasks)
+    if is_full_page(len(pages[-1]), page_size):
+        page_cache.prefetch(('bilibili', account, keyword, end_page + 1), lambda: request_page(keyword, cookie, end_page + 1))
     for page in pages:
         ret.extend(page)
     ret = ret[(offset % page_size):(offset % page_size + limit)]
@@ -1,3 +1,4 @@
 from data.driver import CommonAccount
+from utils.account_pool import AccountPool
 
-accounts = CommonAccount("data/bilibili/bilibili.db")
+accounts = AccountPool('bilibili', CommonAccount("data/bilibili/bilibili.db"))
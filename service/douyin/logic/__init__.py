@@ -1,4 +1,4 @@
-from .detail import request_detail
+from .detail import request_detail, request_multi_detail
 from .comments import request_comments
 from .replys import request_replys
 from .search import request_search
@@ -1,6 +1,11 @@
 from lib.logger import logger
 import execjs
 from lib import requests
+from utils.cookie_manager import check_cookie_expired, report_auth_failure
+from utils.account_pool import AUTH_FAILURE_STATUS
+from utils.metrics import sign_duration
+from utils.tracing import span, traced
+from utils.executor import run_blocking, JS
 import urllib.parse
 import re
 import random
@@ -59,6 +64,7 @@ COMMON_HEADERS ={
 
 DOUYIN_SIGN = execjs.compile(open('lib/js/douyin.js', encoding='utf-8').read())
 
+@traced('douyin.webid')
 async def get_webid(headers: dict):
     url = 'https://www.douyin.com/?recommend=1'
     logger.info(
@@ -112,6 +118,7 @@ def get_ms_token(randomlength=120):
         random_str += base_str[random.randint(0, length)]
     return random_str
 
+@traced('douyin.request')
 async def common_request(uri: str, params: dict, headers: dict) -> tuple[dict, bool]:
     """
     请求 douyin
@@ -129,7 +136,8 @@ async def common_request(uri: str, params: dict, headers: dict) -> tuple[dict, b
     call_name = 'sign_datail'
     if 'reply' in uri:
         call_name = 'sign_reply'
-    a_bogus = DOUYIN_SIGN.call(call_name, query, headers["User-Agent"])
+    with sign_duration.time('douyin'), span('douyin.sign'):
+        a_bogus = await run_blocking(JS, DOUYIN_SIGN.call, call_name, query, headers["User-Agent"])
     params["a_bogus"] = a_bogus
 
     logger.info(
@@ -141,10 +149,13 @@ async def common_request(uri: str, params: dict, headers: dict) -> tuple[dict, b
     if response.status_code != 200 or response.text == '':
         logger.error(
             f'url: {url}, params: {params}, request error, code: {response.status_code}, body: {response.text}')
+        if response.status_code in AUTH_FAILURE_STATUS:
+            await report_auth_failure('douyin', headers.get('cookie', ''))
         return {}, False
     if response.json().get('status_code', 0) != 0:
         logger.error(
             f'url: {url}, params: {params}, request error, code: {response.status_code}, body: {response.text}')
+        await check_cookie_expired(response.json(), 'douyin', cookie=headers.get('cookie', ''))
         return response.json(), False
 
     return response.json(), True
\ No newline at end of file
@@ -10,4 +10,18 @@ async def request_detail(id: str, cookie: str) -> tuple[dict, bool]:
     if not succ:
         return resp, succ
     ret = resp.get('aweme_detail', {})
-    return ret, succ
\ No newline at end of file
+    return ret, succ
+
+async def request_multi_detail(ids: list[str], cookie: str) -> tuple[list[dict], bool]:
+    """
+    批量请求抖音获取多个视频信息，一次请求返回多个视频的统计数据
+    :param ids: 视频ID列表
+    :param cookie: 请求cookie
+    :return: 视频信息列表和是否成功
+    """
+    params = {"aweme_ids": '[' + ','.join(ids) + ']'}
+    headers = {"cookie": cookie}
+    resp, succ = await common_request('/aweme/v1/web/multi/aweme/detail/', params, headers)
+    if not succ:
+        return [], succ
+    return resp.get('aweme_details') or [], succ
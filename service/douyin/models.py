@@ -1,3 +1,4 @@
 from data.driver import CommonAccount
+from utils.account_pool import AccountPool
 
-accounts = CommonAccount("data/douyin/douyin.db")
+accounts = AccountPool('douyin', CommonAccount("data/douyin/douyin.db"))
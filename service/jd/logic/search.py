@@ -4,6 +4,9 @@ from lib import requests
 from lib.logger import logger
 from urllib.parse import quote
 from bs4 import BeautifulSoup
+from utils.page_cache import page_cache, account_key, is_full_page
+from utils.tracing import traced
+from utils.executor import run_blocking, HTML
 from asyncio import gather
 
 async def request_search(keyword: str, cookie: str, offset: int = 0, limit: int = 30) -> dict:
@@ -16,18 +19,25 @@ async def request_search(keyword: str, cookie: str, offset: int = 0, limit: int
     end_page = int((offset + limit - 1) / page_size) + 1
     keyword = quote(keyword)
     total = 0
+    account = account_key(cookie)
     tasks = []
     for page_it in range(start_page, end_page + 1):
         page = page_it * 2 - 1
-        tasks.append(search(keyword, page, cookie))
+        tasks.append(page_cache.get(('jd', account, keyword, page), lambda page=page: search(keyword, page, cookie), _has_items))
     task_results = await gather(*tasks)
     for data, _total in task_results:
         if _total != 0:
             total = _total
         results.extend(data)
+    if is_full_page(len(task_results[-1][0]), page_size, end_page * page_size, total):
+        next_page = end_page * 2 + 1
+        page_cache.prefetch(('jd', account, keyword, next_page), lambda: search(keyword, next_page, cookie), _has_items)
     ret = {"results": results[(offset % page_size):(offset % page_size + limit)], "total": total}
     return ret
 
+def _has_items(result: tuple[list, int]) -> bool:
+    return len(result[0]) > 0
+
 async def search(keyword: str, page: int, cookie: str) -> tuple[list, int]:
     query = f'?keyword={keyword}&page={page}'
     url = f'{SEARCH_URL}{query}'
@@ -37,12 +47,13 @@ async def search(keyword: str, page: int, cookie: str) -> tuple[list, int]:
         logger.info(f'request url: {url}')
         resp = await requests.get(url, headers=headers)
         logger.info(f'response url: {url}, body: {resp.text}')
-        ret, total = parse_search_html(resp.text)
+        ret, total = await run_blocking(HTML, parse_search_html, resp.text, size=len(resp.text))
         return ret, total
     except Exception as e:
         logger.error(f"failed to request {url}, error: {e}")
         return [], 0
 
+@traced('jd.parse')
 def parse_search_html(html) -> tuple[list, int]:
     soup = BeautifulSoup(html, "html.parser")
     datalist = []
@@ -1,3 +1,4 @@
 from data.driver import CommonAccount
+from utils.account_pool import AccountPool
 
-accounts = CommonAccount("data/jd/jd.db")
+accounts = AccountPool('jd', CommonAccount("data/jd/jd.db"))
@@ -0,0 +1,3 @@
+from .store import JobStore
+from .ops import get_op
+from .engine import start_job_engine, stop_job_engine, get_job_engine
@@ -0,0 +1,155 @@
+"""
+采集任务执行引擎
+后台协程从持久化队列领取队列项，逐页抓取并写入检查点，进程重启后从检查点继续
+"""
+import asyncio
+import random
+from importlib import import_module
+from typing import Dict, List, Optional
+from lib.logger import logger
+from .ops import get_op
+from .store import JobStore
+
+
+class JobEngine:
+    """采集任务执行引擎"""
+
+    def __init__(self, store: JobStore, config: Dict):
+        """
+        初始化执行引擎
+        :param store: 任务存储
+        :param config: jobs 配置
+        """
+        self.store = store
+        self.workers = max(config.get('workers', 2), 1)
+        self.page_size = config.get('page_size', 20)
+        self.max_attempts = config.get('max_attempts', 3)
+        # 失败后按指数退避重试，避免账号或接口异常时立即重复请求
+        self.retry_base_seconds = config.get('retry_base_seconds', 30)
+        self.retry_max_seconds = config.get('retry_max_seconds', 600)
+        self.poll_seconds = config.get('poll_seconds', 2)
+        self._wakeup = asyncio.Event()
+        self._tasks: List[asyncio.Task] = []
+
+    async def start(self):
+        """启动工作协程"""
+        if self._tasks:
+            return
+        recovered = await self.store.recover()
+        if recovered:
+            logger.info(f'恢复了 {recovered} 个未完成的采集队列项')
+        self._tasks = [asyncio.create_task(self._worker(index)) for index in range(self.workers)]
+        logger.info(f'采集任务引擎已启动，工作协程数：{self.workers}')
+
+    async def stop(self):
+        """停止工作协程，执行中的队列项在下次启动时恢复"""
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        await self.store.close()
+        logger.info('采集任务引擎已停止')
+
+    def notify(self):
+        """有新任务时唤醒空闲的工作协程"""
+        self._wakeup.set()
+
+    async def _worker(self, index: int):
+        while True:
+            try:
+                task = await self.store.claim()
+                if task is None:
+                    self._wakeup.clear()
+                    try:
+                        await asyncio.wait_for(self._wakeup.wait(), timeout=self.poll_seconds)
+                    except asyncio.TimeoutError:
+                        pass
+                    continue
+                await self._run_task(task)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f'采集工作协程 {index} 发生异常: {e}')
+                await asyncio.sleep(self.poll_seconds)
+
+    async def _run_task(self, task: Dict):
+        spec = task['spec']
+        platform, op, depth = spec['platform'], spec['op'], spec.get('depth', 0)
+        job_id, target = task['job_id'], task['target']
+        fetch = get_op(platform, op)
+        if fetch is None:
+            await self.store.finish_task(task['id'], job_id, 'failed', f'不支持的操作: {platform}.{op}')
+            return
+
+        offset, cursor, fetched = task['offset'], task['cursor'], task['fetched']
+        while depth <= 0 or fetched < depth:
+            if await self.store.is_cancelled(job_id):
+                await self.store.finish_task(task['id'], job_id, 'cancelled')
+                return
+            cookie = await self._pick_cookie(platform)
+            if cookie is None:
+                await self._fail(task, '没有可用账号')
+                return
+            page_size = self.page_size if depth <= 0 else min(self.page_size, depth - fetched)
+            try:
+                items, offset, cursor, finished, succ = await fetch(target, cookie, offset, cursor, page_size)
+            except Exception as e:
+                logger.error(f'采集失败, job: {job_id}, target: {target}, offset: {offset}, err: {e}')
+                succ, finished, items = False, False, []
+            if not succ:
+                await self._fail(task, f'请求失败, offset: {offset}')
+                return
+            if depth > 0:
+                items = items[:depth - fetched]
+            await self.store.checkpoint(task['id'], job_id, target, items, offset, cursor)
+            task['attempts'] = 0
+            fetched += len(items)
+            logger.info(f'采集进度, job: {job_id}, target: {target}, fetched: {fetched}')
+            if finished:
+                break
+        await self.store.finish_task(task['id'], job_id, 'done')
+
+    async def _fail(self, task: Dict, error: str):
+        if task['attempts'] + 1 >= self.max_attempts:
+            await self.store.finish_task(task['id'], task['job_id'], 'failed', error)
+            logger.error(f'采集队列项失败, job: {task["job_id"]}, target: {task["target"]}, err: {error}')
+            return
+        delay = min(self.retry_base_seconds * 2 ** task['attempts'], self.retry_max_seconds)
+        await self.store.retry_task(task['id'], error, delay)
+
+    async def _pick_cookie(self, platform: str) -> Optional[str]:
+        accounts = import_module(f'service.{platform}.models').accounts
+        available = [account for account in await accounts.load() if account.get('expired', 0) != 1]
+        if not available:
+            return None
+        return random.choice(available).get('cookie', '')
+
+
+_engine: Optional[JobEngine] = None
+
+
+async def start_job_engine(store: JobStore, config: Dict) -> JobEngine:
+    """
+    启动全局采集任务引擎
+    :param store: 任务存储
+    :param config: jobs 配置
+    :return: 引擎实例
+    """
+    global _engine
+    if _engine is None:
+        _engine = JobEngine(store, config)
+        await _engine.start()
+    return _engine
+
+
+async def stop_job_engine():
+    """停止全局采集任务引擎"""
+    global _engine
+    if _engine is not None:
+        await _engine.stop()
+        _engine = None
+
+
+def get_job_engine() -> Optional[JobEngine]:
+    """获取全局采集任务引擎"""
+    return _engine
@@ -0,0 +1,108 @@
+"""
+采集任务操作
+把各平台 service/*/logic 的请求函数适配为统一的单页抓取接口：
+fetch(target, cookie, offset, cursor, page_size) -> (结果列表, 下一页偏移量, 下一页游标, 是否结束, 是否成功)
+"""
+from importlib import import_module
+from typing import Any, Awaitable, Callable, Dict, List, Tuple
+
+PageResult = Tuple[List[Any], int, str, bool, bool]
+Fetcher = Callable[[str, str, int, str, int], Awaitable[PageResult]]
+
+
+def _logic(platform: str):
+    # 按需导入，避免未使用的平台在启动时编译签名脚本
+    return import_module(f'service.{platform}.logic')
+
+
+def _cursor_comments(platform: str) -> Fetcher:
+    """基于续页令牌翻页的评论接口（快手、小红书、微博、哔哩哔哩）"""
+    async def fetch(target: str, cookie: str, offset: int, cursor: str, page_size: int) -> PageResult:
+        res, succ = await _logic(platform).request_comments(target, cookie, offset, page_size, cursor)
+        if not succ or res == {}:
+            return [], offset, cursor, False, False
+        items = res.get('comments', [])
+        next_cursor = res.get('cursor', '')
+        return items, offset + len(items), next_cursor, next_cursor == '' or not items, True
+    return fetch
+
+
+async def _douyin_comments(target: str, cookie: str, offset: int, cursor: str, page_size: int) -> PageResult:
+    res, succ = await _logic('douyin').request_comments(target, cookie, offset, page_size)
+    if not succ:
+        return [], offset, cursor, False, False
+    items = res.get('comments') or []
+    next_offset = offset + len(items)
+    return items, next_offset, cursor, not items or next_offset >= res.get('total', 0), True
+
+
+async def _taobao_comments(target: str, cookie: str, offset: int, cursor: str, page_size: int) -> PageResult:
+    res = await _logic('taobao').request_comments(target, cookie, offset, page_size)
+    items = res.get('comments', [])
+    return items, offset + len(items), cursor, len(items) < page_size, True
+
+
+async def _douyin_user_posts(target: str, cookie: str, offset: int, cursor: str, page_size: int) -> PageResult:
+    from service.douyin.logic.user_posts import request_user_posts
+    resp, succ = await request_user_posts(target, int(cursor or 0), cookie, page_size)
+    if not succ:
+        return [], offset, cursor, False, False
+    items = resp.get('aweme_list') or []
+    next_cursor = str(resp.get('max_cursor', 0))
+    return items, offset + len(items), next_cursor, resp.get('has_more', 0) != 1 or not items, True
+
+
+def _search(platform: str) -> Fetcher:
+    """搜索接口，各平台返回结构不同，这里统一为结果列表"""
+    async def fetch(target: str, cookie: str, offset: int, cursor: str, page_size: int) -> PageResult:
+        logic = _logic(platform)
+        if platform == 'xhs':
+            res = await logic.request_search(target, cookie, 'general', offset, page_size)
+        else:
+            res = await logic.request_search(target, cookie, offset, page_size)
+        succ = True
+        if isinstance(res, tuple):
+            res, succ = res
+        if isinstance(res, dict):
+            res = res.get('results', [])
+        items = res if isinstance(res, list) else []
+        if not succ:
+            return [], offset, cursor, False, False
+        return items, offset + len(items), cursor, len(items) < page_size, True
+    return fetch
+
+
+def _detail(platform: str) -> Fetcher:
+    """详情接口只有一页"""
+    async def fetch(target: str, cookie: str, offset: int, cursor: str, page_size: int) -> PageResult:
+        res = await _logic(platform).request_detail(target, cookie)
+        succ = True
+        if isinstance(res, tuple):
+            res, succ = res
+        if not succ or not res:
+            return [], offset, cursor, False, False
+        return [res], offset + 1, cursor, True, True
+    return fetch
+
+
+OPS: Dict[Tuple[str, str], Fetcher] = {
+    ('douyin', 'comments'): _douyin_comments,
+    ('kuaishou', 'comments'): _cursor_comments('kuaishou'),
+    ('xhs', 'comments'): _cursor_comments('xhs'),
+    ('weibo', 'comments'): _cursor_comments('weibo'),
+    ('bilibili', 'comments'): _cursor_comments('bilibili'),
+    ('taobao', 'comments'): _taobao_comments,
+    ('douyin', 'user_posts'): _douyin_user_posts,
+}
+for _platform in ['douyin', 'kuaishou', 'xhs', 'weibo', 'bilibili', 'taobao', 'jd']:
+    OPS[(_platform, 'search')] = _search(_platform)
+for _platform in ['douyin', 'kuaishou', 'xhs', 'bilibili', 'taobao']:
+    OPS[(_platform, 'detail')] = _detail(_platform)
+
+
+def get_op(platform: str, op: str) -> Fetcher:
+    """
+    获取平台操作对应的抓取函数
+    :return: 抓取函数，不支持时返回 None
+    """
+    return OPS.get((platform, op))
@@ -0,0 +1,249 @@
+"""
+采集任务持久化队列
+jobs 记录任务规格和进度，job_tasks 为每个目标ID的队列项和分页检查点，job_results 保存采集结果
+"""
+import json
+import time
+import uuid
+from typing import Any, Dict, List, Optional
+from utils.sqlite_store import SqliteStore
+
+
+class JobStore(SqliteStore):
+    """采集任务存储"""
+
+    SCHEMA = '''
+    CREATE TABLE IF NOT EXISTS jobs (
+        id TEXT PRIMARY KEY,
+        platform TEXT NOT NULL,
+        op TEXT NOT NULL,
+        spec TEXT NOT NULL,
+        status TEXT NOT NULL,
+        error TEXT NOT NULL DEFAULT '',
+        created_at REAL NOT NULL,
+        updated_at REAL NOT NULL
+    );
+    CREATE INDEX IF NOT EXISTS idx_jobs_created ON jobs(created_at);
+    CREATE TABLE IF NOT EXISTS job_tasks (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        job_id TEXT NOT NULL,
+        target TEXT NOT NULL,
+        status TEXT NOT NULL,
+        offset INTEGER NOT NULL DEFAULT 0,
+        cursor TEXT NOT NULL DEFAULT '',
+        fetched INTEGER NOT NULL DEFAULT 0,
+        attempts INTEGER NOT NULL DEFAULT 0,
+        error TEXT NOT NULL DEFAULT '',
+        next_attempt_at REAL NOT NULL DEFAULT 0,
+        updated_at REAL NOT NULL,
+        UNIQUE (job_id, target)
+    );
+    CREATE INDEX IF NOT EXISTS idx_job_tasks_status ON job_tasks(status, id);
+    CREATE TABLE IF NOT EXISTS job_results (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        job_id TEXT NOT NULL,
+        target TEXT NOT NULL,
+        data TEXT NOT NULL
+    );
+    CREATE INDEX IF NOT EXISTS idx_job_results_job ON job_results(job_id, id);
+    '''
+
+    async def connect(self):
+        first = self._db is None
+        db = await super().connect()
+        if first:
+            # 旧版本创建的队列没有重试时间列
+            async with db.execute('PRAGMA table_info(job_tasks)') as cursor:
+                columns = {row['name'] for row in await cursor.fetchall()}
+            if 'next_attempt_at' not in columns:
+                await db.execute('ALTER TABLE job_tasks ADD COLUMN next_attempt_at REAL NOT NULL DEFAULT 0')
+                await db.commit()
+        return db
+
+    async def create(self, platform: str, op: str, ids: List[str], depth: int) -> str:
+        """
+        创建任务，每个目标ID生成一个队列项
+        :return: 任务ID
+        """
+        db = await self.connect()
+        job_id = uuid.uuid4().hex
+        now = time.time()
+        spec = json.dumps({'platform': platform, 'op': op, 'ids': ids, 'depth': depth}, ensure_ascii=False)
+        async with self.lock:
+            await db.execute(
+                'INSERT INTO jobs (id, platform, op, spec, status, created_at, updated_at) VALUES (?, ?, ?, ?, ?, ?, ?)',
+                (job_id, platform, op, spec, 'pending', now, now))
+            await db.executemany(
+                'INSERT OR IGNORE INTO job_tasks (job_id, target, status, updated_at) VALUES (?, ?, ?, ?)',
+                [(job_id, target, 'pending', now) for target in ids])
+            await db.commit()
+        return job_id
+
+    async def recover(self) -> int:
+        """
+        进程重启后把执行中的队列项放回队列，从检查点继续
+        :return: 恢复的队列项数
+        """
+        db = await self.connect()
+        async with self.lock:
+            cursor = await db.execute("UPDATE job_tasks SET status = 'pending' WHERE status = 'running'")
+            await db.commit()
+        return cursor.rowcount
+
+    async def claim(self) -> Optional[Dict[str, Any]]:
+        """
+        领取一个已到执行时间的待执行队列项，已取消或已结束的任务不再领取
+        :return: 队列项及其任务规格，队列为空时返回 None
+        """
+        db = await self.connect()
+        now = time.time()
+        async with self.lock:
+            async with db.execute(
+                    '''SELECT t.id, t.job_id, t.target, t.offset, t.cursor, t.fetched, t.attempts, j.spec
+                       FROM job_tasks t JOIN jobs j ON j.id = t.job_id
+                       WHERE t.status = 'pending' AND t.next_attempt_at <= ?
+                         AND j.status NOT IN ('cancelled', 'done', 'failed')
+                       ORDER BY t.id LIMIT 1''', (now,)) as cursor:
+                row = await cursor.fetchone()
+            if row is None:
+                return None
+            await db.execute("UPDATE job_tasks SET status = 'running', updated_at = ? WHERE id = ?", (now, row['id']))
+            await db.execute(
+                "UPDATE jobs SET status = 'running', updated_at = ? WHERE id = ? AND status = 'pending'",
+                (now, row['job_id']))
+            await db.commit()
+        task = dict(row)
+        task['spec'] = json.loads(task['spec'])
+        return task
+
+    async def checkpoint(self, task_id: int, job_id: str, target: str, items: List[Any],
+                         offset: int, cursor: str) -> None:
+        """
+        在同一事务中写入一页结果并推进检查点，重启后不会重复写入
+        :param task_id: 队列项ID
+        :param items: 本页结果
+        :param offset: 下一页的偏移量
+        :param cursor: 下一页的游标
+        """
+        db = await self.connect()
+        async with self.lock:
+            await db.executemany(
+                'INSERT INTO job_results (job_id, target, data) VALUES (?, ?, ?)',
+                [(job_id, target, json.dumps(item, ensure_ascii=False)) for item in items])
+            await db.execute(
+                '''UPDATE job_tasks SET offset = ?, cursor = ?, fetched = fetched + ?, attempts = 0, updated_at = ?
+                   WHERE id = ?''',
+                (offset, cursor, len(items), time.time(), task_id))
+            await db.commit()
+
+    async def finish_task(self, task_id: int, job_id: str, status: str, error: str = '') -> None:
+        """
+        结束队列项，所有队列项结束后更新任务状态
+        :param status: done、failed 或 cancelled
+        """
+        db = await self.connect()
+        now = time.time()
+        async with self.lock:
+            await db.execute('UPDATE job_tasks SET status = ?, error = ?, updated_at = ? WHERE id = ?',
+                             (status, error, now, task_id))
+            async with db.execute(
+                    '''SELECT COUNT(*) FROM job_tasks
+                       WHERE job_id = ? AND status IN ('pending', 'running')''', (job_id,)) as cursor:
+                remaining = (await cursor.fetchone())[0]
+            if remaining == 0:
+                async with db.execute(
+                        "SELECT COUNT(*) FROM job_tasks WHERE job_id = ? AND status = 'failed'", (job_id,)) as cursor:
+                    failed = (await cursor.fetchone())[0]
+                await db.execute(
+                    "UPDATE jobs SET status = ?, updated_at = ? WHERE id = ? AND status != 'cancelled'",
+                    ('failed' if failed else 'done', now, job_id))
+            await db.commit()
+
+    async def retry_task(self, task_id: int, error: str, delay: float = 0) -> None:
+        """
+        队列项执行失败，放回队列等待重试
+        :param delay: 重试前等待的秒数
+        """
+        db = await self.connect()
+        now = time.time()
+        async with self.lock:
+            await db.execute(
+                '''UPDATE job_tasks SET status = 'pending', attempts = attempts + 1, error = ?, next_attempt_at = ?,
+                   updated_at = ? WHERE id = ?''',
+                (error, now + delay, now, task_id))
+            await db.commit()
+
+    async def cancel(self, job_id: str) -> bool:
+        """
+        取消任务，未执行的队列项不再执行
+        :return: 任务是否存在
+        """
+        db = await self.connect()
+        now = time.time()
+        async with self.lock:
+            cursor = await db.execute(
+                "UPDATE jobs SET status = 'cancelled', updated_at = ? WHERE id = ? AND status IN ('pending', 'running')",
+                (now, job_id))
+            await db.execute(
+                "UPDATE job_tasks SET status = 'cancelled', updated_at = ? WHERE job_id = ? AND status = 'pending'",
+                (now, job_id))
+            await db.commit()
+        return cursor.rowcount > 0
+
+    async def is_cancelled(self, job_id: str) -> bool:
+        db = await self.connect()
+        async with db.execute('SELECT status FROM jobs WHERE id = ?', (job_id,)) as cursor:
+            row = await cursor.fetchone()
+        return row is None or row['status'] == 'cancelled'
+
+    async def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """
+        获取任务详情和进度
+        :param job_id: 任务ID
+        :return: 任务信息
+        """
+        db = await self.connect()
+        async with db.execute('SELECT * FROM jobs WHERE id = ?', (job_id,)) as cursor:
+            row = await cursor.fetchone()
+        if row is None:
+            return None
+        job = dict(row)
+        job['spec'] = json.loads(job['spec'])
+        async with db.execute(
+                '''SELECT target, status, offset, fetched, attempts, error FROM job_tasks
+                   WHERE job_id = ? ORDER BY id''', (job_id,)) as cursor:
+            tasks = [dict(task) for task in await cursor.fetchall()]
+        progress = {'total': len(tasks), 'items': sum(task['fetched'] for task in tasks)}
+        for task in tasks:
+            progress[task['status']] = progress.get(task['status'], 0) + 1
+        job['progress'] = progress
+        job['tasks'] = tasks
+        return job
+
+    async def list(self, offset: int = 0, limit: int = 20) -> List[Dict[str, Any]]:
+        """
+        分页获取任务列表，按创建时间倒序
+        """
+        db = await self.connect()
+        async with db.execute(
+                'SELECT id, platform, op, status, error, created_at, updated_at FROM jobs ORDER BY created_at DESC LIMIT ? OFFSET ?',
+                (limit, offset)) as cursor:
+            return [dict(row) for row in await cursor.fetchall()]
+
+    async def iter_results(self, job_id: str, batch_size: int = 1000):
+        """
+        按写入顺序分批读取任务结果，不一次性加载全部数据
+        :return: 异步生成器，每次产出 (target, data)
+        """
+        db = await self.connect()
+        last_id = 0
+        while True:
+            async with db.execute(
+                    'SELECT id, target, data FROM job_results WHERE job_id = ? AND id > ? ORDER BY id LIMIT ?',
+                    (job_id, last_id, batch_size)) as cursor:
+                rows = await cursor.fetchall()
+            if not rows:
+                return
+            for row in rows:
+                yield row['target'], json.loads(row['data'])
+            last_id = rows[-1]['id']
@@ -0,0 +1,3 @@
+from .logic import JobStore
+
+jobs = JobStore("data/jobs/jobs.db")
@@ -0,0 +1,10 @@
+from . import views
+from fastapi import APIRouter
+
+router = APIRouter(prefix='/jobs')
+
+router.add_api_route('', views.create_job, methods=['POST'])
+router.add_api_route('', views.job_list, methods=['GET'])
+router.add_api_route('/{job_id}', views.job_detail, methods=['GET'])
+router.add_api_route('/{job_id}/cancel', views.cancel_job, methods=['POST'])
+router.add_api_route('/{job_id}/export', views.export_job, methods=['GET'])
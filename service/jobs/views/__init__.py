@@ -0,0 +1,5 @@
+from .create_job import create_job
+from .job_list import job_list
+from .job_detail import job_detail
+from .cancel_job import cancel_job
+from .export_job import export_job
@@ -0,0 +1,13 @@
+from utils.error_code import ErrorCode
+from utils.reply import reply
+from ..models import jobs
+from lib.logger import logger
+
+async def cancel_job(job_id: str):
+    '''
+    取消采集任务
+    '''
+    if not await jobs.cancel(job_id):
+        return reply(ErrorCode.PARAMETER_ERROR, '任务不存在或已结束')
+    logger.info(f'cancel job, id: {job_id}')
+    return reply()
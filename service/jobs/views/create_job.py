@@ -0,0 +1,30 @@
+from utils.error_code import ErrorCode
+from utils.reply import reply
+from ..models import jobs
+from ..logic import get_op, get_job_engine
+from lib.logger import logger
+from pydantic import BaseModel
+from typing import List
+
+class Param(BaseModel):
+    platform: str
+    op: str
+    ids: List[str]
+    depth: int = 100
+
+async def create_job(param: Param):
+    '''
+    创建采集任务，任务在后台执行
+    '''
+    if get_op(param.platform, param.op) is None:
+        return reply(ErrorCode.PARAMETER_ERROR, f'不支持的操作: {param.platform}.{param.op}')
+    ids = list(dict.fromkeys(id.strip() for id in param.ids if id.strip()))
+    if not ids:
+        return reply(ErrorCode.PARAMETER_ERROR, 'ids is required')
+
+    job_id = await jobs.create(param.platform, param.op, ids, param.depth)
+    engine = get_job_engine()
+    if engine:
+        engine.notify()
+    logger.info(f'create job, id: {job_id}, platform: {param.platform}, op: {param.op}, ids: {len(ids)}, depth: {param.depth}')
+    return reply(ErrorCode.OK, '成功', {'id': job_id})
@@ -0,0 +1,51 @@
+from utils.error_code import ErrorCode
+from utils.reply import reply
+from utils.exporter import FORMATS, get_schema, export_records, remove_stale_exports
+from ..models import jobs
+from lib.logger import logger
+from fastapi.responses import StreamingResponse, FileResponse
+from starlette.background import BackgroundTask
+import asyncio
+import json
+import os
+import uuid
+
+EXPORT_DIR = 'data/exports'
+# 导出文件发送后即删除，发送中断或进程退出时留下的文件超过该时间后清理
+EXPORT_RETENTION_SECONDS = 3600
+
+async def export_job(job_id: str, format: str = 'jsonl', flatten: bool = False):
+    '''
+    导出采集结果
+    format 为 jsonl 且不展开时流式返回原始结构，每行一条 {"target": ..., "data": ...}；
+    其他情况按平台结果类型展开为固定列，写入 data/exports 后返回文件，发送完成后删除
+    '''
+    job = await jobs.get(job_id)
+    if job is None:
+        return reply(ErrorCode.PARAMETER_ERROR, '任务不存在')
+    if format not in FORMATS:
+        return reply(ErrorCode.PARAMETER_ERROR, f'不支持的导出格式: {format}')
+
+    if format == 'jsonl' and not flatten:
+        async def lines():
+            async for target, data in jobs.iter_results(job_id):
+                yield json.dumps({'target': target, 'data': data}, ensure_ascii=False) + '\n'
+
+        return StreamingResponse(lines(), media_type='application/x-ndjson', headers={
+            'Content-Disposition': f'attachment; filename="{job_id}.jsonl"'
+        })
+
+    schema = get_schema(job['platform'], job['op'])
+    if schema is None and (flatten or format == 'parquet'):
+        return reply(ErrorCode.PARAMETER_ERROR, f'{job["platform"]}.{job["op"]} 不支持展开导出')
+    filename = f'{job_id}{FORMATS[format]}'
+    # 每次导出使用不同的文件，同一任务同时导出时互不覆盖
+    path = f'{EXPORT_DIR}/{job_id}-{uuid.uuid4().hex[:8]}{FORMATS[format]}'
+    try:
+        await asyncio.to_thread(remove_stale_exports, EXPORT_DIR, EXPORT_RETENTION_SECONDS)
+        count = await export_records(jobs.iter_results(job_id), path, format, schema if flatten or format == 'parquet' else None)
+    except Exception as e:
+        logger.error(f'export job failed, id: {job_id}, format: {format}, err: {e}')
+        return reply(ErrorCode.INTERNAL_ERROR, f'导出失败: {str(e)}')
+    logger.info(f'export job success, id: {job_id}, format: {format}, rows: {count}, path: {path}')
+    return FileResponse(path, filename=filename, background=BackgroundTask(os.remove, path))
@@ -0,0 +1,12 @@
+from utils.error_code import ErrorCode
+from utils.reply import reply
+from ..models import jobs
+
+async def job_detail(job_id: str):
+    '''
+    获取采集任务进度
+    '''
+    job = await jobs.get(job_id)
+    if job is None:
+        return reply(ErrorCode.PARAMETER_ERROR, '任务不存在')
+    return reply(ErrorCode.OK, '成功', job)
@@ -0,0 +1,9 @@
+from utils.error_code import ErrorCode
+from utils.reply import reply
+from ..models import jobs
+
+async def job_list(offset: int = 0, limit: int = 20):
+    '''
+    获取采集任务列表
+    '''
+    return reply(ErrorCode.OK, '成功', await jobs.list(offset, limit))
@@ -1,15 +1,20 @@
 from .common import common_request, load_graphql_queries, GraphqlQuery
+from utils.cursor_cache import cursor_cache, resume_point, encode_cursor
 
-async def request_comments(id: str, cookie: str, offset: int, limit: int) -> tuple[dict, bool]:
+async def request_comments(id: str, cookie: str, offset: int, limit: int, cursor: str = '') -> tuple[dict, bool]:
     """
     请求快手获取评论信息
+    :param cursor: 上一页返回的续页令牌，为空时使用服务端游标缓存
     """
-    pcursor = ''
+    start, pcursor, total = resume_point('kuaishou', id, offset, cursor, '')
+    total = total or 0
     headers = {"cookie": cookie}
     end_length = offset + limit
+    # 已经没有更多评论时返回空令牌
+    next_cursor = encode_cursor('kuaishou', id, start, pcursor, total) if pcursor != 'no_more' else ''
     comments = []
-    total = 0
-    while pcursor != 'no_more' and len(comments) < end_length:
+    succ = True
+    while pcursor != 'no_more' and start + len(comments) < end_length:
         data = {
             "operationName": "commentListQuery",
             "variables": {
@@ -25,6 +30,10 @@ async def request_comments(id: str, cookie: str, offset: int, limit: int) -> tup
         comments.extend(resp.get('data', {}).get('visionCommentList', {}).get('rootComments', []))
         pcursor = resp.get('data', {}).get('visionCommentList', {}).get('pcursor', '')
         total = resp.get('data', {}).get('visionCommentList', {}).get('commentCount', 0)
+        position = start + len(comments)
+        cursor_cache.put('kuaishou', id, position, pcursor, total)
+        if position <= end_length:
+            next_cursor = encode_cursor('kuaishou', id, position, pcursor, total) if pcursor != 'no_more' else ''
 
-    ret = {"total": total, "comments": comments[offset:end_length]}
+    ret = {"total": total, "comments": comments[offset - start:end_length - start], "cursor": next_cursor}
     return ret, succ
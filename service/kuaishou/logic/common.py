@@ -1,6 +1,9 @@
 from enum import Enum
 from lib.logger import logger
 from lib import requests
+from utils.cookie_manager import report_auth_failure
+from utils.account_pool import AUTH_FAILURE_STATUS
+from utils.tracing import traced
 
 HOST = 'https://www.kuaishou.com'
 
@@ -53,6 +56,7 @@ for type, file in GRAPHQL_FILES.items():
 def load_graphql_queries(type: GraphqlQuery) -> str:
     return graphql.get(type)
 
+@traced('kuaishou.request')
 async def common_request(data: dict, headers: dict) -> tuple[dict, bool]:
     """
     请求 kuaishou
@@ -72,6 +76,8 @@ async def common_request(data: dict, headers: dict) -> tuple[dict, bool]:
     if response.status_code != 200 or response.text == '':
         logger.error(
             f'url: {url}, body: {data}, request error, code: {response.status_code}, body: {response.text}')
+        if response.status_code in AUTH_FAILURE_STATUS:
+            await report_auth_failure('kuaishou', headers.get('Cookie', '') or headers.get('cookie', ''))
         return {}, False
 
     return response.json(), True
\ No newline at end of file
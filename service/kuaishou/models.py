@@ -1,3 +1,4 @@
 from data.driver import CommonAccount
+from utils.account_pool import AccountPool
 
-accounts = CommonAccount("data/kuaishou/kuaishou.db")
+accounts = AccountPool('kuaishou', CommonAccount("data/kuaishou/kuaishou.db"))
@@ -0,0 +1,8 @@
+from . import views
+from fastapi import APIRouter
+
+router = APIRouter()
+
+router.add_api_route('/metrics', views.metrics, methods=['GET'], include_in_schema=False)
+router.add_api_route('/debug/profile', views.profile, methods=['GET'], include_in_schema=False)
+router.add_api_route('/debug/loop_lag', views.loop_lag, methods=['GET'], include_in_schema=False)
@@ -0,0 +1,3 @@
+from .metrics import metrics
+from .profile import profile
+from .loop_lag import loop_lag
@@ -0,0 +1,13 @@
+from utils.error_code import ErrorCode
+from utils.reply import reply
+from utils.loop_monitor import get_loop_monitor
+
+
+async def loop_lag():
+    '''
+    返回事件循环最近的阻塞记录和阻塞时的调用栈
+    '''
+    monitor = get_loop_monitor()
+    if monitor is None:
+        return reply(ErrorCode.INTERNAL_ERROR, '事件循环阻塞监控未启用')
+    return reply(ErrorCode.OK, '成功', monitor.get_status())
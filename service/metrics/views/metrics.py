@@ -0,0 +1,11 @@
+from fastapi.responses import PlainTextResponse
+from utils.metrics import registry
+
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+
+async def metrics():
+    '''
+    以 Prometheus 文本格式返回运行指标
+    '''
+    return PlainTextResponse(registry.render(), media_type=CONTENT_TYPE)
@@ -0,0 +1,36 @@
+import asyncio
+from fastapi.responses import PlainTextResponse
+from utils.error_code import ErrorCode
+from utils.reply import reply
+from utils.profiler import run_profile
+from lib.logger import logger
+
+# 单次采样的最长时间（秒）
+MAX_SECONDS = 120
+
+
+async def profile(seconds: float = 10, interval_ms: float = 10, format: str = 'collapsed', idle: bool = False):
+    '''
+    对当前进程采样 seconds 秒，返回 collapsed stack 格式（可直接生成火焰图）或按函数汇总的结果
+    同一时间只允许一个采样会话
+    '''
+    if seconds <= 0 or seconds > MAX_SECONDS:
+        return reply(ErrorCode.PARAMETER_ERROR, f'采样时长必须在 0 到 {MAX_SECONDS} 秒之间')
+    if interval_ms < 1 or interval_ms > 1000:
+        return reply(ErrorCode.PARAMETER_ERROR, '采样间隔必须在 1 到 1000 毫秒之间')
+    if format not in ('collapsed', 'top'):
+        return reply(ErrorCode.PARAMETER_ERROR, 'format 只支持 collapsed 和 top')
+
+    logger.info(f'开始性能采样，时长 {seconds} 秒，间隔 {interval_ms} 毫秒')
+    profiler = await asyncio.to_thread(run_profile, seconds, interval_ms / 1000, idle)
+    if profiler is None:
+        return reply(ErrorCode.PARAMETER_ERROR, '已有性能采样正在运行，请稍后再试')
+    logger.info(f'性能采样结束，共 {profiler.total} 个样本')
+
+    if format == 'top':
+        return reply(ErrorCode.OK, '成功', {
+            'duration': round(profiler.duration, 2),
+            'samples': profiler.total,
+            'functions': profiler.top(),
+        })
+    return PlainTextResponse(profiler.collapsed())
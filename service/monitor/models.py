@@ -0,0 +1,13 @@
+from utils.creator_schedule import CreatorScheduleStore
+from utils.dedup_store import DedupStore
+from utils.monitored_creators import MonitoredCreatorStore
+from utils.outbox import OutboxStore
+from utils.video_stats import VideoStatsStore
+from utils.watermark_store import WatermarkStore
+
+notified_videos = DedupStore("data/monitor/monitor.db")
+creator_schedule = CreatorScheduleStore("data/monitor/monitor.db")
+watermarks = WatermarkStore("data/monitor/monitor.db")
+video_stats = VideoStatsStore("data/monitor/monitor.db")
+outbox = OutboxStore("data/monitor/monitor.db")
+creators = MonitoredCreatorStore("data/monitor/monitor.db")
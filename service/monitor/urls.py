@@ -10,13 +10,26 @@ router = APIRouter(prefix='/monitor')
 router.add_api_route('/status', views.get_monitor_status, methods=['GET'])
 router.add_api_route('/run-once', views.run_monitor_once, methods=['POST'])
 router.add_api_route('/scheduler/status', views.get_scheduler_status, methods=['GET'])
+router.add_api_route('/schedule', views.get_monitor_schedule, methods=['GET'])
+router.add_api_route('/videos/{aweme_id}/history', views.get_video_history, methods=['GET'])
+
+# 通知发件箱
+router.add_api_route('/outbox', views.get_outbox, methods=['GET'])
+router.add_api_route('/outbox/replay', views.replay_outbox, methods=['POST'])
 
 # 配置管理相关
 router.add_api_route('/config', views.get_monitor_config, methods=['GET'])
 router.add_api_route('/config', views.update_monitor_config, methods=['PUT'])
 router.add_api_route('/config/users', views.get_monitor_users, methods=['GET'])
+router.add_api_route('/config/users/page', views.get_monitor_users_page, methods=['GET'])
 router.add_api_route('/config/users', views.add_monitor_user, methods=['POST'])
+router.add_api_route('/config/users/export', views.export_monitor_users, methods=['GET'])
+router.add_api_route('/config/users/import', views.import_monitor_users, methods=['POST'])
+router.add_api_route('/config/users/bulk', views.bulk_import_monitor_users, methods=['POST'])
+router.add_api_route('/config/users/bulk/csv', views.bulk_import_monitor_users_csv, methods=['POST'])
 router.add_api_route('/config/users/{user_id}', views.update_monitor_user, methods=['PUT'])
 router.add_api_route('/config/users/{user_id}', views.delete_monitor_user, methods=['DELETE'])
+router.add_api_route('/config/users/id/{creator_id}', views.update_monitor_user_by_id, methods=['PUT'])
+router.add_api_route('/config/users/id/{creator_id}', views.delete_monitor_user_by_id, methods=['DELETE'])
 router.add_api_route('/config/toggle', views.toggle_monitor, methods=['POST'])
 router.add_api_route('/test-notification', views.test_notification, methods=['POST'])
\ No newline at end of file
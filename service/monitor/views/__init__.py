@@ -1,25 +1,41 @@
 """
 监控管理视图
 """
-from .status import get_monitor_status, get_scheduler_status
+from .status import get_monitor_status, get_scheduler_status, get_monitor_schedule
 from .control import run_monitor_once
+from .videos import get_video_history
+from .outbox import get_outbox, replay_outbox
+from .bulk_import import bulk_import_monitor_users, bulk_import_monitor_users_csv
 from .config import (
     get_monitor_config, update_monitor_config, 
-    get_monitor_users, add_monitor_user, 
+    get_monitor_users, get_monitor_users_page, add_monitor_user, 
+    export_monitor_users, import_monitor_users, 
     update_monitor_user, delete_monitor_user, 
+    update_monitor_user_by_id, delete_monitor_user_by_id,
     toggle_monitor, test_notification
 )
 
 __all__ = [
     'get_monitor_status',
     'get_scheduler_status', 
+    'get_monitor_schedule',
     'run_monitor_once',
+    'get_video_history',
+    'get_outbox',
+    'replay_outbox',
     'get_monitor_config',
     'update_monitor_config', 
     'get_monitor_users',
+    'get_monitor_users_page',
     'add_monitor_user',
+    'export_monitor_users',
+    'import_monitor_users',
+    'bulk_import_monitor_users',
+    'bulk_import_monitor_users_csv',
     'update_monitor_user', 
     'delete_monitor_user',
+    'update_monitor_user_by_id',
+    'delete_monitor_user_by_id',
     'toggle_monitor',
     'test_notification'
 ]
\ No newline at end of file
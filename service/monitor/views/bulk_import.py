@@ -0,0 +1,170 @@
+"""
+批量导入监控博主接口
+"""
+import asyncio
+import csv
+import io
+from typing import Dict, List, Optional
+from fastapi import UploadFile
+from pydantic import BaseModel
+from utils.error_code import ErrorCode
+from utils.reply import reply
+from utils.douyin_monitor import get_monitor
+from utils.douyin_url_parser import resolve_sec_user_ids, validate_douyin_url, format_douyin_url
+from service.douyin.logic.user import request_user_detail
+from service.douyin.models import accounts
+from service.monitor.models import creators
+from lib.logger import logger
+
+# 单次导入的主页地址上限
+MAX_IMPORT_SIZE = 1000
+# 同时解析的短链接数
+RESOLVE_CONCURRENCY = 8
+# 同时获取昵称的请求数
+DETAIL_CONCURRENCY = 4
+
+
+class BulkImportItem(BaseModel):
+    """批量导入的博主"""
+    profile_url: str
+    nickname: str = ''
+    like_threshold: Optional[int] = None
+    enabled: bool = True
+
+
+class BulkImportModel(BaseModel):
+    """批量导入请求"""
+    urls: List[str] = []  # 只有主页地址时直接传地址列表
+    items: List[BulkImportItem] = []
+    like_threshold: int = 10000  # 未单独指定时的点赞阈值
+    enabled: bool = True
+    overwrite: bool = False  # 博主已存在时是否覆盖
+
+
+async def _fill_nicknames(users: List[Dict]):
+    """用抖音账号并发获取未填写昵称的博主昵称，没有可用账号时跳过"""
+    pending = [user for user in users if not user['nickname']]
+    if not pending:
+        return
+    available = [account for account in await accounts.load() if account.get('expired', 0) != 1]
+    if not available:
+        logger.warning('没有可用的抖音账号，跳过获取博主昵称')
+        return
+    semaphore = asyncio.Semaphore(DETAIL_CONCURRENCY)
+
+    async def fill(index: int, user: Dict):
+        async with semaphore:
+            account = available[index % len(available)]
+            try:
+                detail = await request_user_detail(user['sec_user_id'], account.get('cookie', ''))
+                user['nickname'] = detail.get('nickname', '')
+            except Exception as e:
+                logger.error(f"获取博主 {user['sec_user_id']} 的昵称失败: {e}")
+
+    await asyncio.gather(*[fill(index, user) for index, user in enumerate(pending)])
+
+
+async def _import(items: List[BulkImportItem], like_threshold: int, enabled: bool, overwrite: bool):
+    if not items:
+        return reply(ErrorCode.PARAMETER_ERROR, '主页地址不能为空')
+    if len(items) > MAX_IMPORT_SIZE:
+        return reply(ErrorCode.PARAMETER_ERROR, f'单次最多导入 {MAX_IMPORT_SIZE} 个主页地址')
+    if like_threshold <= 0:
+        return reply(ErrorCode.PARAMETER_ERROR, '点赞阈值必须大于0')
+
+    failed = []
+    valid = []
+    for item in items:
+        profile_url = format_douyin_url(item.profile_url)
+        if not validate_douyin_url(profile_url):
+            failed.append({'profile_url': item.profile_url, 'reason': '不是有效的抖音主页地址'})
+            continue
+        valid.append((profile_url, item))
+
+    # 并发解析，相同地址只解析一次
+    resolved = await resolve_sec_user_ids([profile_url for profile_url, _ in valid], RESOLVE_CONCURRENCY)
+
+    users: Dict[str, Dict] = {}
+    duplicates = 0
+    for profile_url, item in valid:
+        sec_user_id = resolved.get(profile_url, '')
+        if not sec_user_id:
+            failed.append({'profile_url': item.profile_url, 'reason': '无法从主页地址中提取用户ID'})
+            continue
+        if sec_user_id in users:
+            duplicates += 1
+            continue
+        users[sec_user_id] = {
+            'sec_user_id': sec_user_id,
+            'profile_url': profile_url,
+            'nickname': item.nickname.strip(),
+            'like_threshold': item.like_threshold or like_threshold,
+            'enabled': item.enabled and enabled,
+        }
+
+    existing = await creators.existing(users.keys())
+    if not overwrite:
+        for sec_user_id in existing:
+            users.pop(sec_user_id)
+    await _fill_nicknames(list(users.values()))
+
+    added, updated = await creators.bulk_upsert(list(users.values()), overwrite)
+    monitor = get_monitor()
+    if monitor:
+        await monitor.reload_users()
+
+    result = {
+        'added': added,
+        'updated': updated,
+        'skipped': 0 if overwrite else len(existing),
+        'duplicates': duplicates,
+        'failed': failed,
+    }
+    logger.info(f"批量导入监控博主完成: 新增 {added}，覆盖 {updated}，跳过 {result['skipped']}，"
+                f"重复 {duplicates}，失败 {len(failed)}")
+    return reply(ErrorCode.OK, '批量导入完成', result)
+
+
+async def bulk_import_monitor_users(data: BulkImportModel):
+    """
+    按主页地址批量导入监控博主
+    """
+    try:
+        items = [BulkImportItem(profile_url=url) for url in data.urls if url.strip()] + data.items
+        return await _import(items, data.like_threshold, data.enabled, data.overwrite)
+
+    except Exception as e:
+        logger.error(f'批量导入监控博主失败: {e}')
+        return reply(ErrorCode.INTERNAL_ERROR, f'批量导入监控博主失败: {str(e)}')
+
+
+async def bulk_import_monitor_users_csv(file: UploadFile, like_threshold: int = 10000, enabled: bool = True,
+                                        overwrite: bool = False):
+    """
+    上传 CSV 批量导入监控博主
+    CSV 可以只有一列主页地址，也可以带表头 profile_url,nickname,like_threshold,enabled
+    """
+    try:
+        text = (await file.read()).decode('utf-8-sig')
+        rows = [row for row in csv.reader(io.StringIO(text)) if row and row[0].strip()]
+        items = []
+        if rows and rows[0][0].strip().lower() in ('profile_url', 'url'):
+            header = [column.strip().lower() for column in rows[0]]
+            for row in rows[1:]:
+                record = dict(zip(header, (cell.strip() for cell in row)))
+                threshold = record.get('like_threshold', '')
+                items.append(BulkImportItem(
+                    profile_url=record.get('profile_url') or record.get('url', ''),
+                    nickname=record.get('nickname', ''),
+                    like_threshold=int(threshold) if threshold.isdigit() else None,
+                    enabled=record.get('enabled', 'true').lower() not in ('false', '0', 'no'),
+                ))
+        else:
+            items = [BulkImportItem(profile_url=row[0].strip()) for row in rows]
+        return await _import(items, like_threshold, enabled, overwrite)
+
+    except UnicodeDecodeError:
+        return reply(ErrorCode.PARAMETER_ERROR, 'CSV 文件必须是 UTF-8 编码')
+    except Exception as e:
+        logger.error(f'批量导入监控博主失败: {e}')
+        return reply(ErrorCode.INTERNAL_ERROR, f'批量导入监控博主失败: {str(e)}')
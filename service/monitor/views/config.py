@@ -1,17 +1,15 @@
 """
 监控配置管理接口
 """
-import yaml
-import os
-import fcntl
-import time
-from typing import Dict, List
-from fastapi import HTTPException
+from typing import Dict, List, Optional
 from pydantic import BaseModel
 from utils.error_code import ErrorCode
 from utils.reply import reply
-from utils.douyin_monitor import get_monitor, init_monitor
+from utils.douyin_monitor import apply_monitor_config, get_monitor
+from utils.monitored_creators import CREATOR_FIELDS, migrate_config_users
+from service.monitor.models import creators
 from utils.scheduler import get_scheduler
+from utils.config_service import config_service
 from utils.douyin_url_parser import get_sec_user_id_from_any_url, validate_douyin_url, format_douyin_url
 from lib.logger import logger
 
@@ -22,6 +20,23 @@ class MonitorUserModel(BaseModel):
     nickname: str
     like_threshold: int
     enabled: bool = True
+    velocity: Optional[Dict] = None  # 点赞增速规则，覆盖 settings.velocity
+
+
+class MonitorUserRecord(BaseModel):
+    """导入导出的监控用户"""
+    sec_user_id: str
+    profile_url: str = ''
+    nickname: str = ''
+    like_threshold: int = 10000
+    enabled: bool = True
+    velocity: Optional[Dict] = None
+
+
+class MonitorUsersImportModel(BaseModel):
+    """批量导入监控用户"""
+    users: List[MonitorUserRecord]
+    overwrite: bool = False  # sec_user_id 已存在时是否覆盖
 
 
 class MonitorConfigModel(BaseModel):
@@ -35,48 +50,38 @@ class MonitorConfigModel(BaseModel):
     dedup_cache_hours: int = 72
 
 
-def _get_config_path() -> str:
-    """获取配置文件路径"""
-    return os.getenv("FILE", 'config/config.yaml')
+def _validate_monitor_config(config: Dict):
+    """校验监控配置，外部修改的配置文件不合法时不会替换当前配置"""
+    monitor_config = config.get('douyin_monitor') or {}
+    if not isinstance(monitor_config, dict):
+        raise ValueError('douyin_monitor 必须是字典')
+    users = monitor_config.get('users') or []
+    if not isinstance(users, list):
+        raise ValueError('douyin_monitor.users 必须是列表')
+    for user in users:
+        if not isinstance(user, dict) or not user.get('sec_user_id'):
+            raise ValueError('监控用户缺少 sec_user_id')
 
 
-def _load_config() -> Dict:
-    """加载配置文件"""
-    config_path = _get_config_path()
-    try:
-        with open(config_path, 'r', encoding='utf-8') as f:
-            return yaml.safe_load(f)
-    except Exception as e:
-        logger.error(f"加载配置文件失败: {e}")
-        raise HTTPException(status_code=500, detail=f"加载配置文件失败: {str(e)}")
+async def _on_monitor_config_changed(old: Optional[Dict], new: Optional[Dict]):
+    """监控配置变化时只更新变化的部分，配置文件中出现的用户迁移到数据库"""
+    if (new or {}).get('users'):
+        await migrate_config_users(creators)
+    if apply_monitor_config(old, new):
+        get_scheduler().update_monitor_task()
+        await get_scheduler().publish_status()
+    logger.info('监控配置已生效')
 
 
-def _save_config(config: Dict) -> Dict[str, any]:
-    """保存配置文件（带文件锁）"""
-    config_path = _get_config_path()
-    temp_path = config_path + '.tmp'
-    try:
-        # 先写入临时文件，然后原子性替换
-        with open(temp_path, 'w', encoding='utf-8') as f:
-            # 获取文件锁
-            fcntl.flock(f.fileno(), fcntl.LOCK_EX)
-            yaml.dump(config, f, default_flow_style=False, allow_unicode=True)
-            f.flush()
-            os.fsync(f.fileno())  # 确保数据写入磁盘
-        
-        # 原子性替换文件
-        os.replace(temp_path, config_path)
-        return {"success": True, "error": None}
-    except Exception as e:
-        error_msg = str(e)
-        logger.error(f"保存配置文件失败: {error_msg}")
-        # 清理临时文件
-        try:
-            if os.path.exists(temp_path):
-                os.remove(temp_path)
-        except:
-            pass
-        return {"success": False, "error": error_msg}
+config_service.add_validator(_validate_monitor_config)
+config_service.subscribe('douyin_monitor', _on_monitor_config_changed)
+
+
+async def _reload_monitor_users():
+    """用户列表变化后刷新监控器中的用户列表"""
+    monitor = get_monitor()
+    if monitor:
+        await monitor.reload_users()
 
 
 async def get_monitor_config():
@@ -84,8 +89,7 @@ async def get_monitor_config():
     获取监控配置
     """
     try:
-        config = _load_config()
-        monitor_config = config.get('douyin_monitor', {})
+        monitor_config = config_service.get('douyin_monitor', {})
         
         # 格式化配置数据
         formatted_config = {
@@ -102,7 +106,7 @@ async def get_monitor_config():
         
     except Exception as e:
         logger.error(f'获取监控配置失败: {e}')
-        return reply(ErrorCode.ERROR, f'获取监控配置失败: {str(e)}')
+        return reply(ErrorCode.INTERNAL_ERROR, f'获取监控配置失败: {str(e)}')
 
 
 async def update_monitor_config(config_data: MonitorConfigModel):
@@ -112,82 +116,123 @@ async def update_monitor_config(config_data: MonitorConfigModel):
     try:
         # 参数校验
         if config_data.interval_hours <= 0:
-            return reply(ErrorCode.ERROR, '监控间隔必须大于0小时')
+            return reply(ErrorCode.PARAMETER_ERROR, '监控间隔必须大于0小时')
         if config_data.videos_per_check <= 0 or config_data.videos_per_check > 50:
-            return reply(ErrorCode.ERROR, '每次检查视频数量必须在1-50之间')
+            return reply(ErrorCode.PARAMETER_ERROR, '每次检查视频数量必须在1-50之间')
         if config_data.recent_hours <= 0:
-            return reply(ErrorCode.ERROR, '检查最近视频的时间范围必须大于0小时')
+            return reply(ErrorCode.PARAMETER_ERROR, '检查最近视频的时间范围必须大于0小时')
         if config_data.dedup_cache_hours <= 0:
-            return reply(ErrorCode.ERROR, '去重缓存时间必须大于0小时')
+            return reply(ErrorCode.PARAMETER_ERROR, '去重缓存时间必须大于0小时')
         if not config_data.feishu_webhook_url.strip():
-            return reply(ErrorCode.ERROR, '飞书webhook地址不能为空')
-        
-        config = _load_config()
+            return reply(ErrorCode.PARAMETER_ERROR, '飞书webhook地址不能为空')
         
-        # 更新监控配置
-        if 'douyin_monitor' not in config:
-            config['douyin_monitor'] = {}
-        
-        monitor_config = config['douyin_monitor']
-        monitor_config['enabled'] = config_data.enabled
-        monitor_config['interval_hours'] = config_data.interval_hours
-        
-        # 更新飞书配置
-        if 'feishu' not in monitor_config:
-            monitor_config['feishu'] = {}
-        monitor_config['feishu']['webhook_url'] = config_data.feishu_webhook_url
-        
-        # 更新设置
-        if 'settings' not in monitor_config:
-            monitor_config['settings'] = {}
-        settings = monitor_config['settings']
-        settings['videos_per_check'] = config_data.videos_per_check
-        settings['recent_hours'] = config_data.recent_hours
-        settings['enable_deduplication'] = config_data.enable_deduplication
-        settings['dedup_cache_hours'] = config_data.dedup_cache_hours
-        
-        # 保存配置
-        save_result = _save_config(config)
-        if not save_result['success']:
-            return reply(ErrorCode.ERROR, f'保存配置文件失败: {save_result["error"]}')
-        
-        # 重新初始化监控器
-        await _reload_monitor_config()
+        def mutate(config: Dict):
+            # 更新监控配置
+            if 'douyin_monitor' not in config:
+                config['douyin_monitor'] = {}
+            
+            monitor_config = config['douyin_monitor']
+            monitor_config['enabled'] = config_data.enabled
+            monitor_config['interval_hours'] = config_data.interval_hours
+            
+            # 更新飞书配置
+            if 'feishu' not in monitor_config:
+                monitor_config['feishu'] = {}
+            monitor_config['feishu']['webhook_url'] = config_data.feishu_webhook_url
+            
+            # 更新设置
+            if 'settings' not in monitor_config:
+                monitor_config['settings'] = {}
+            settings = monitor_config['settings']
+            settings['videos_per_check'] = config_data.videos_per_check
+            settings['recent_hours'] = config_data.recent_hours
+            settings['enable_deduplication'] = config_data.enable_deduplication
+            settings['dedup_cache_hours'] = config_data.dedup_cache_hours
+        
+        # 更新配置快照，订阅者按变化更新监控器，配置文件稍后异步写入
+        await config_service.update(mutate)
         
         logger.info('监控配置更新成功')
         return reply(ErrorCode.OK, '监控配置更新成功')
         
     except Exception as e:
         logger.error(f'更新监控配置失败: {e}')
-        return reply(ErrorCode.ERROR, f'更新监控配置失败: {str(e)}')
+        return reply(ErrorCode.INTERNAL_ERROR, f'更新监控配置失败: {str(e)}')
+
+
+async def get_monitor_users(keyword: str = ''):
+    """
+    获取全部监控用户的列表
+    :param keyword: 按昵称模糊匹配或按 sec_user_id 精确匹配
+    """
+    try:
+        return reply(ErrorCode.OK, '成功', await creators.list(0, -1, keyword))
+        
+    except Exception as e:
+        logger.error(f'获取监控用户列表失败: {e}')
+        return reply(ErrorCode.INTERNAL_ERROR, f'获取监控用户列表失败: {str(e)}')
 
 
-async def get_monitor_users():
+async def get_monitor_users_page(offset: int = 0, limit: int = 50, keyword: str = ''):
     """
-    获取监控用户列表
+    分页获取监控用户
+    :param offset: 偏移量
+    :param limit: 每页条数
+    :param keyword: 按昵称模糊匹配或按 sec_user_id 精确匹配
+    :return: {total, users}
     """
     try:
-        config = _load_config()
-        users = config.get('douyin_monitor', {}).get('users', [])
-        
-        # 为每个用户添加ID（使用索引）
-        formatted_users = []
-        for index, user in enumerate(users):
-            user_data = {
-                'id': index,
-                'sec_user_id': user.get('sec_user_id', ''),
-                'profile_url': user.get('profile_url', ''),  # 添加主页地址字段
-                'nickname': user.get('nickname', ''),
-                'like_threshold': user.get('like_threshold', 10000),
-                'enabled': user.get('enabled', True)
-            }
-            formatted_users.append(user_data)
-        
-        return reply(ErrorCode.OK, '成功', formatted_users)
+        if offset < 0 or limit <= 0:
+            return reply(ErrorCode.PARAMETER_ERROR, '偏移量不能小于0，每页条数必须大于0')
+        if limit > 500:
+            return reply(ErrorCode.PARAMETER_ERROR, '每页条数不能超过500')
+        return reply(ErrorCode.OK, '成功', {
+            'total': await creators.count(keyword),
+            'users': await creators.list(offset, limit, keyword),
+        })
         
     except Exception as e:
         logger.error(f'获取监控用户列表失败: {e}')
-        return reply(ErrorCode.ERROR, f'获取监控用户列表失败: {str(e)}')
+        return reply(ErrorCode.INTERNAL_ERROR, f'获取监控用户列表失败: {str(e)}')
+
+
+async def export_monitor_users():
+    """
+    导出所有监控用户
+    """
+    try:
+        users = [{field: user[field] for field in CREATOR_FIELDS} for user in await creators.load_all()]
+        return reply(ErrorCode.OK, '成功', users)
+        
+    except Exception as e:
+        logger.error(f'导出监控用户失败: {e}')
+        return reply(ErrorCode.INTERNAL_ERROR, f'导出监控用户失败: {str(e)}')
+
+
+async def import_monitor_users(data: MonitorUsersImportModel):
+    """
+    批量导入监控用户，格式与导出一致，在一个事务中写入
+    """
+    try:
+        users = {}
+        for user in data.users:
+            if not user.sec_user_id.strip():
+                return reply(ErrorCode.PARAMETER_ERROR, '用户ID不能为空')
+            if user.like_threshold <= 0:
+                return reply(ErrorCode.PARAMETER_ERROR, f'点赞阈值必须大于0: {user.sec_user_id}')
+            # 同一批中重复的用户以最后一个为准
+            users[user.sec_user_id.strip()] = {**user.model_dump(), 'sec_user_id': user.sec_user_id.strip()}
+        
+        added, updated = await creators.bulk_upsert(list(users.values()), data.overwrite)
+        await _reload_monitor_users()
+        
+        result = {'added': added, 'updated': updated, 'skipped': len(users) - added - updated}
+        logger.info(f'批量导入监控用户成功: {result}')
+        return reply(ErrorCode.OK, '批量导入监控用户成功', result)
+        
+    except Exception as e:
+        logger.error(f'批量导入监控用户失败: {e}')
+        return reply(ErrorCode.INTERNAL_ERROR, f'批量导入监控用户失败: {str(e)}')
 
 
 async def add_monitor_user(user_data: MonitorUserModel):
@@ -197,35 +242,21 @@ async def add_monitor_user(user_data: MonitorUserModel):
     try:
         # 输入校验
         if not user_data.nickname.strip():
-            return reply(ErrorCode.ERROR, '博主昵称不能为空')
+            return reply(ErrorCode.PARAMETER_ERROR, '博主昵称不能为空')
         if user_data.like_threshold <= 0:
-            return reply(ErrorCode.ERROR, '点赞阈值必须大于0')
+            return reply(ErrorCode.PARAMETER_ERROR, '点赞阈值必须大于0')
         if not user_data.profile_url.strip():
-            return reply(ErrorCode.ERROR, '主页地址不能为空')
+            return reply(ErrorCode.PARAMETER_ERROR, '主页地址不能为空')
             
         # 验证抖音URL
         profile_url = format_douyin_url(user_data.profile_url)
         if not validate_douyin_url(profile_url):
-            return reply(ErrorCode.ERROR, '请输入有效的抖音主页地址')
+            return reply(ErrorCode.PARAMETER_ERROR, '请输入有效的抖音主页地址')
         
         # 从URL提取sec_user_id
         sec_user_id = await get_sec_user_id_from_any_url(profile_url)
         if not sec_user_id:
-            return reply(ErrorCode.ERROR, '无法从主页地址中提取用户ID，请检查地址是否正确')
-        
-        config = _load_config()
-        
-        # 确保监控配置存在
-        if 'douyin_monitor' not in config:
-            config['douyin_monitor'] = {}
-        if 'users' not in config['douyin_monitor']:
-            config['douyin_monitor']['users'] = []
-        
-        # 检查用户是否已存在
-        users = config['douyin_monitor']['users']
-        for user in users:
-            if user.get('sec_user_id') == sec_user_id:
-                return reply(ErrorCode.ERROR, '该用户已存在')
+            return reply(ErrorCode.PARAMETER_ERROR, '无法从主页地址中提取用户ID，请检查地址是否正确')
         
         # 添加新用户
         new_user = {
@@ -235,111 +266,144 @@ async def add_monitor_user(user_data: MonitorUserModel):
             'like_threshold': user_data.like_threshold,
             'enabled': user_data.enabled
         }
-        users.append(new_user)
+        if user_data.velocity is not None:
+            new_user['velocity'] = user_data.velocity
         
-        # 保存配置
-        save_result = _save_config(config)
-        if not save_result['success']:
-            return reply(ErrorCode.ERROR, f'保存配置文件失败: {save_result["error"]}')
-        
-        # 重新初始化监控器
-        await _reload_monitor_config()
+        # sec_user_id 唯一索引保证不会重复添加
+        if await creators.add(new_user) is None:
+            return reply(ErrorCode.PARAMETER_ERROR, '该用户已存在')
+        await _reload_monitor_users()
         
         logger.info(f'添加监控用户成功: {user_data.nickname} ({sec_user_id})')
         return reply(ErrorCode.OK, '添加监控用户成功')
         
     except Exception as e:
         logger.error(f'添加监控用户失败: {e}')
-        return reply(ErrorCode.ERROR, f'添加监控用户失败: {str(e)}')
+        return reply(ErrorCode.INTERNAL_ERROR, f'添加监控用户失败: {str(e)}')
 
 
-async def update_monitor_user(user_id: int, user_data: MonitorUserModel):
+async def _creator_at(index: int) -> Optional[Dict]:
+    """按列表中的位置（从 0 开始，按添加顺序）获取博主"""
+    if index < 0:
+        return None
+    users = await creators.list(index, 1)
+    return users[0] if users else None
+
+
+async def _update_creator(user: Optional[Dict], user_data: MonitorUserModel):
     """
-    更新监控用户
+    校验并更新博主
+    :param user: 要更新的博主，不存在时为 None
+    :param user_data: 新的博主信息
     """
     try:
         # 输入校验
         if not user_data.nickname.strip():
-            return reply(ErrorCode.ERROR, '博主昵称不能为空')
+            return reply(ErrorCode.PARAMETER_ERROR, '博主昵称不能为空')
         if user_data.like_threshold <= 0:
-            return reply(ErrorCode.ERROR, '点赞阈值必须大于0')
+            return reply(ErrorCode.PARAMETER_ERROR, '点赞阈值必须大于0')
         if not user_data.profile_url.strip():
-            return reply(ErrorCode.ERROR, '主页地址不能为空')
+            return reply(ErrorCode.PARAMETER_ERROR, '主页地址不能为空')
             
         # 验证抖音URL
         profile_url = format_douyin_url(user_data.profile_url)
         if not validate_douyin_url(profile_url):
-            return reply(ErrorCode.ERROR, '请输入有效的抖音主页地址')
+            return reply(ErrorCode.PARAMETER_ERROR, '请输入有效的抖音主页地址')
         
         # 从URL提取sec_user_id
         sec_user_id = await get_sec_user_id_from_any_url(profile_url)
         if not sec_user_id:
-            return reply(ErrorCode.ERROR, '无法从主页地址中提取用户ID，请检查地址是否正确')
-        
-        config = _load_config()
-        users = config.get('douyin_monitor', {}).get('users', [])
-        
-        if user_id < 0 or user_id >= len(users):
-            return reply(ErrorCode.ERROR, '用户不存在')
+            return reply(ErrorCode.PARAMETER_ERROR, '无法从主页地址中提取用户ID，请检查地址是否正确')
         
-        # 检查是否与其他用户重复（排除自己）
-        for index, user in enumerate(users):
-            if index != user_id and user.get('sec_user_id') == sec_user_id:
-                return reply(ErrorCode.ERROR, '该用户已存在')
+        if user is None:
+            return reply(ErrorCode.PARAMETER_ERROR, '用户不存在')
         
-        # 更新用户信息
-        users[user_id] = {
-            'sec_user_id': sec_user_id,
-            'profile_url': profile_url,  # 保存主页地址
-            'nickname': user_data.nickname,
-            'like_threshold': user_data.like_threshold,
-            'enabled': user_data.enabled
-        }
-        
-        # 保存配置
-        save_result = _save_config(config)
-        if not save_result['success']:
-            return reply(ErrorCode.ERROR, f'保存配置文件失败: {save_result["error"]}')
-        
-        # 重新初始化监控器
-        await _reload_monitor_config()
+        # 更新用户信息，未传入增速规则时保留原有规则，与其他用户重复时由唯一索引拒绝
+        try:
+            await creators.update(user['id'], {
+                'sec_user_id': sec_user_id,
+                'profile_url': profile_url,  # 保存主页地址
+                'nickname': user_data.nickname,
+                'like_threshold': user_data.like_threshold,
+                'enabled': user_data.enabled,
+                'velocity': user_data.velocity if user_data.velocity is not None else user.get('velocity')
+            })
+        except ValueError as e:
+            return reply(ErrorCode.PARAMETER_ERROR, str(e))
+        await _reload_monitor_users()
         
         logger.info(f'更新监控用户成功: {user_data.nickname} ({sec_user_id})')
         return reply(ErrorCode.OK, '更新监控用户成功')
         
     except Exception as e:
         logger.error(f'更新监控用户失败: {e}')
-        return reply(ErrorCode.ERROR, f'更新监控用户失败: {str(e)}')
+        return reply(ErrorCode.INTERNAL_ERROR, f'更新监控用户失败: {str(e)}')
 
 
-async def delete_monitor_user(user_id: int):
+async def _delete_creator(creator_id: Optional[int]):
     """
-    删除监控用户
+    删除博主
+    :param creator_id: 博主ID，不存在时为 None
     """
     try:
-        config = _load_config()
-        users = config.get('douyin_monitor', {}).get('users', [])
-        
-        if user_id < 0 or user_id >= len(users):
-            return reply(ErrorCode.ERROR, '用户不存在')
-        
-        # 删除用户
-        deleted_user = users.pop(user_id)
-        
-        # 保存配置
-        save_result = _save_config(config)
-        if not save_result['success']:
-            return reply(ErrorCode.ERROR, f'保存配置文件失败: {save_result["error"]}')
-        
-        # 重新初始化监控器
-        await _reload_monitor_config()
+        deleted_user = await creators.delete(creator_id) if creator_id is not None else None
+        if deleted_user is None:
+            return reply(ErrorCode.PARAMETER_ERROR, '用户不存在')
+        await _reload_monitor_users()
         
         logger.info(f'删除监控用户成功: {deleted_user.get("nickname", "未知")}')
         return reply(ErrorCode.OK, '删除监控用户成功')
         
     except Exception as e:
         logger.error(f'删除监控用户失败: {e}')
-        return reply(ErrorCode.ERROR, f'删除监控用户失败: {str(e)}')
+        return reply(ErrorCode.INTERNAL_ERROR, f'删除监控用户失败: {str(e)}')
+
+
+async def update_monitor_user(user_id: int, user_data: MonitorUserModel):
+    """
+    按列表位置更新监控用户
+    :param user_id: 用户在完整列表中的位置，从 0 开始
+    """
+    try:
+        user = await _creator_at(user_id)
+    except Exception as e:
+        logger.error(f'更新监控用户失败: {e}')
+        return reply(ErrorCode.INTERNAL_ERROR, f'更新监控用户失败: {str(e)}')
+    return await _update_creator(user, user_data)
+
+
+async def delete_monitor_user(user_id: int):
+    """
+    按列表位置删除监控用户
+    :param user_id: 用户在完整列表中的位置，从 0 开始
+    """
+    try:
+        user = await _creator_at(user_id)
+    except Exception as e:
+        logger.error(f'删除监控用户失败: {e}')
+        return reply(ErrorCode.INTERNAL_ERROR, f'删除监控用户失败: {str(e)}')
+    return await _delete_creator(user['id'] if user else None)
+
+
+async def update_monitor_user_by_id(creator_id: int, user_data: MonitorUserModel):
+    """
+    按ID更新监控用户
+    :param creator_id: 列表中返回的 id
+    """
+    try:
+        user = await creators.get(creator_id)
+    except Exception as e:
+        logger.error(f'更新监控用户失败: {e}')
+        return reply(ErrorCode.INTERNAL_ERROR, f'更新监控用户失败: {str(e)}')
+    return await _update_creator(user, user_data)
+
+
+async def delete_monitor_user_by_id(creator_id: int):
+    """
+    按ID删除监控用户
+    :param creator_id: 列表中返回的 id
+    """
+    return await _delete_creator(creator_id)
 
 
 async def toggle_monitor(data: dict = None):
@@ -347,28 +411,16 @@ async def toggle_monitor(data: dict = None):
     切换监控开关
     """
     try:
-        config = _load_config()
-        
         # 从请求数据中获取enabled状态
         enabled = data.get('enabled') if data else None
         
         # 如果没有指定状态，则切换当前状态
         if enabled is None:
-            current_enabled = config.get('douyin_monitor', {}).get('enabled', False)
+            current_enabled = config_service.get('douyin_monitor.enabled', False)
             enabled = not current_enabled
         
         # 更新配置
-        if 'douyin_monitor' not in config:
-            config['douyin_monitor'] = {}
-        config['douyin_monitor']['enabled'] = enabled
-        
-        # 保存配置
-        save_result = _save_config(config)
-        if not save_result['success']:
-            return reply(ErrorCode.ERROR, f'保存配置文件失败: {save_result["error"]}')
-        
-        # 重新初始化监控器
-        await _reload_monitor_config()
+        await config_service.update(lambda config: config.setdefault('douyin_monitor', {}).update(enabled=enabled))
         
         # 发送飞书通知
         status_text = '启用' if enabled else '停用'
@@ -382,27 +434,7 @@ async def toggle_monitor(data: dict = None):
         
     except Exception as e:
         logger.error(f'切换监控开关失败: {e}')
-        return reply(ErrorCode.ERROR, f'切换监控开关失败: {str(e)}')
-
-
-async def _reload_monitor_config():
-    """重新加载监控配置"""
-    try:
-        config = _load_config()
-        monitor_config = config.get('douyin_monitor', {})
-        
-        # 重新初始化监控器
-        monitor = init_monitor(monitor_config)
-        
-        # 更新调度器任务
-        scheduler = get_scheduler()
-        scheduler.update_monitor_task()
-        
-        logger.info('监控配置重新加载成功')
-        
-    except Exception as e:
-        logger.error(f'重新加载监控配置失败: {e}')
-        raise
+        return reply(ErrorCode.INTERNAL_ERROR, f'切换监控开关失败: {str(e)}')
 
 
 async def _send_status_notification(message: str):
@@ -439,4 +471,4 @@ async def test_notification():
         
     except Exception as e:
         logger.error(f'发送测试通知失败: {e}')
-        return reply(ErrorCode.ERROR, f'发送测试通知失败: {str(e)}')
\ No newline at end of file
+        return reply(ErrorCode.INTERNAL_ERROR, f'发送测试通知失败: {str(e)}')
\ No newline at end of file
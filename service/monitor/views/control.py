@@ -13,9 +13,13 @@ async def run_monitor_once():
     """
     try:
         logger.info('手动触发监控任务')
-        await run_monitor_immediately()
+        result = await run_monitor_immediately()
+        if result == 'busy':
+            return reply(ErrorCode.PARAMETER_ERROR, '巡检正在执行，请稍后再试')
+        if result == 'queued':
+            return reply(ErrorCode.OK, '已通知主进程执行监控任务')
         return reply(ErrorCode.OK, '监控任务执行完成')
         
     except Exception as e:
         logger.error(f'执行监控任务失败: {e}')
-        return reply(ErrorCode.ERROR, f'执行监控任务失败: {str(e)}')
\ No newline at end of file
+        return reply(ErrorCode.INTERNAL_ERROR, f'执行监控任务失败: {str(e)}')
\ No newline at end of file
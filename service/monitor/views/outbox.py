@@ -0,0 +1,50 @@
+"""
+通知发件箱查看和重新投递接口
+"""
+from typing import Optional
+from utils.error_code import ErrorCode
+from utils.reply import reply
+from utils.outbox import get_outbox_worker
+from service.monitor.models import outbox
+from lib.logger import logger
+
+
+async def get_outbox(status: str = '', offset: int = 0, limit: int = 20):
+    """
+    分页查看发件箱中的通知
+    :param status: pending、sent、dead，为空时不限
+    """
+    try:
+        if status not in ('', 'pending', 'sent', 'dead'):
+            return reply(ErrorCode.PARAMETER_ERROR, 'status 只能为 pending、sent、dead')
+        if limit <= 0 or limit > 100:
+            return reply(ErrorCode.PARAMETER_ERROR, 'limit 必须在1-100之间')
+        
+        data = {
+            'counts': await outbox.count_by_status(),
+            'items': await outbox.list(status, offset, limit),
+        }
+        return reply(ErrorCode.OK, '成功', data)
+        
+    except Exception as e:
+        logger.error(f'获取通知发件箱失败: {e}')
+        return reply(ErrorCode.INTERNAL_ERROR, f'获取通知发件箱失败: {str(e)}')
+
+
+async def replay_outbox(id: Optional[int] = None):
+    """
+    重新投递死信
+    :param id: 通知ID，不传时重新投递所有死信
+    """
+    try:
+        count = await outbox.replay(id)
+        worker = get_outbox_worker()
+        if worker is not None:
+            worker.notify()
+        
+        logger.info(f'重新投递了 {count} 条死信')
+        return reply(ErrorCode.OK, '成功', {'replayed': count})
+        
+    except Exception as e:
+        logger.error(f'重新投递死信失败: {e}')
+        return reply(ErrorCode.INTERNAL_ERROR, f'重新投递死信失败: {str(e)}')
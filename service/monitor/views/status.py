@@ -5,6 +5,8 @@ from utils.error_code import ErrorCode
 from utils.reply import reply
 from utils.douyin_monitor import get_monitor
 from utils.scheduler import get_scheduler
+from utils.leader import is_leader, worker_status
+from utils.shared_state import read
 from lib.logger import logger
 
 
@@ -15,14 +17,19 @@ async def get_monitor_status():
     try:
         monitor = get_monitor()
         if not monitor:
-            return reply(ErrorCode.ERROR, '监控器未初始化')
+            return reply(ErrorCode.INTERNAL_ERROR, '监控器未初始化')
         
+        await monitor.reload_users()
         status = monitor.get_status()
+        # 巡检只在主进程运行，其他进程读取主进程写入的巡检状态
+        if not is_leader():
+            status['last_sweep'] = await read('monitor.last_sweep', status['last_sweep'])
+        status['worker'] = worker_status()
         return reply(ErrorCode.OK, '成功', status)
         
     except Exception as e:
         logger.error(f'获取监控状态失败: {e}')
-        return reply(ErrorCode.ERROR, f'获取监控状态失败: {str(e)}')
+        return reply(ErrorCode.INTERNAL_ERROR, f'获取监控状态失败: {str(e)}')
 
 
 async def get_scheduler_status():
@@ -32,8 +39,28 @@ async def get_scheduler_status():
     try:
         scheduler = get_scheduler()
         status = scheduler.get_job_status()
+        if not is_leader():
+            status = await read('scheduler.status', status)
+        status['worker'] = worker_status()
         return reply(ErrorCode.OK, '成功', status)
         
     except Exception as e:
         logger.error(f'获取调度器状态失败: {e}')
-        return reply(ErrorCode.ERROR, f'获取调度器状态失败: {str(e)}')
\ No newline at end of file
+        return reply(ErrorCode.INTERNAL_ERROR, f'获取调度器状态失败: {str(e)}')
+
+
+async def get_monitor_schedule():
+    """
+    获取各博主的自适应轮询状态
+    """
+    try:
+        monitor = get_monitor()
+        if not monitor:
+            return reply(ErrorCode.INTERNAL_ERROR, '监控器未初始化')
+        
+        await monitor.reload_users()
+        return reply(ErrorCode.OK, '成功', monitor.get_schedule())
+        
+    except Exception as e:
+        logger.error(f'获取轮询状态失败: {e}')
+        return reply(ErrorCode.INTERNAL_ERROR, f'获取轮询状态失败: {str(e)}')
\ No newline at end of file
@@ -0,0 +1,31 @@
+"""
+作品统计数据查询接口
+"""
+from utils.error_code import ErrorCode
+from utils.reply import reply
+from service.monitor.models import video_stats
+from lib.logger import logger
+
+
+async def get_video_history(aweme_id: str, start: int = 0, end: int = 0, bucket: int = 0, limit: int = 1000):
+    """
+    获取作品的统计数据历史
+    :param aweme_id: 作品ID
+    :param start: 开始时间戳（秒），0 表示不限
+    :param end: 结束时间戳（秒），0 表示不限
+    :param bucket: 降采样时间桶（秒），每个桶取最后一个数据点，0 表示返回原始数据点
+    :param limit: 最多返回的数据点数
+    """
+    try:
+        if limit <= 0 or limit > 10000:
+            return reply(ErrorCode.PARAMETER_ERROR, 'limit 必须在1-10000之间')
+        meta = await video_stats.get_meta(aweme_id)
+        if meta is None:
+            return reply(ErrorCode.PARAMETER_ERROR, '没有该作品的统计数据')
+        
+        points = await video_stats.history(aweme_id, start, end, bucket, limit)
+        return reply(ErrorCode.OK, '成功', {**meta, 'points': points})
+        
+    except Exception as e:
+        logger.error(f'获取作品统计数据失败: {e}')
+        return reply(ErrorCode.INTERNAL_ERROR, f'获取作品统计数据失败: {str(e)}')
@@ -6,6 +6,9 @@ import json
 import time
 import re
 import asyncio
+from utils.page_cache import page_cache, account_key, is_full_page
+from utils.tracing import span
+from utils.executor import run_blocking, JSON
 
 async def request_search(keyword: str, cookie: str, offset: int = 0, limit: int = 48) -> dict:
     """
@@ -17,15 +20,22 @@ async def request_search(keyword: str, cookie: str, offset: int = 0, limit: int
     end_page = int((offset + limit - 1) / page_size) + 1
     total = 0
     
-    tasks = [search(keyword, cookie, page) for page in range(start_page, end_page + 1)]
+    account = account_key(cookie)
+    tasks = [page_cache.get(('taobao', account, keyword, page), lambda page=page: search(keyword, cookie, page), _has_items)
+             for page in range(start_page, end_page + 1)]
     task_results = await asyncio.gather(*tasks)
     for data in task_results:
         results.extend(data.get('itemsArray', []))
         total = data.get('mainInfo', {}).get('totalResults', 0)
+    if is_full_page(len(task_results[-1].get('itemsArray', [])), page_size, end_page * page_size, total):
+        page_cache.prefetch(('taobao', account, keyword, end_page + 1), lambda: search(keyword, cookie, end_page + 1), _has_items)
 
     ret = {'total': total, 'results': results[(offset % page_size):(offset % page_size + limit)]}
     return ret
 
+def _has_items(data: dict) -> bool:
+    return len(data.get('itemsArray', [])) > 0
+
 def pack_search_query(cookie, keyword, page):
     quote_keyword = quote(keyword, 'utf-8')
     str_data = f'{{"appId":"34385","params":"{{\\"device\\":\\"HMA-AL00\\",\\"isBeta\\":\\"false\\",\\"grayHair\\":\\"false\\",\\"from\\":\\"nt_history\\",\\"brand\\":\\"HUAWEI\\",\\"info\\":\\"wifi\\",\\"index\\":\\"4\\",\\"rainbow\\":\\"\\",\\"schemaType\\":\\"auction\\",\\"elderHome\\":\\"false\\",\\"isEnterSrpSearch\\":\\"true\\",\\"newSearch\\":\\"false\\",\\"network\\":\\"wifi\\",\\"subtype\\":\\"\\",\\"hasPreposeFilter\\":\\"false\\",\\"prepositionVersion\\":\\"v2\\",\\"client_os\\":\\"Android\\",\\"gpsEnabled\\":\\"false\\",\\"searchDoorFrom\\":\\"srp\\",\\"debug_rerankNewOpenCard\\":\\"false\\",\\"homePageVersion\\":\\"v7\\",\\"searchElderHomeOpen\\":\\"false\\",\\"search_action\\":\\"initiative\\",\\"sugg\\":\\"_4_1\\",\\"sversion\\":\\"13.6\\",\\"style\\":\\"list\\",\\"ttid\\":\\"600000@taobao_pc_10.7.0\\",\\"needTabs\\":\\"true\\",\\"areaCode\\":\\"CN\\",\\"vm\\":\\"nw\\",\\"countryNum\\":\\"156\\",\\"m\\":\\"pc\\",\\"page\\":{page},\\"n\\":48,\\"q\\":\\"{quote_keyword}\\",\\"tab\\":\\"all\\",\\"pageSize\\":48,\\"sourceS\\":\\"0\\",\\"sort\\":\\"_coefp\\",\\"bcoffset\\":\\"\\",\\"ntoffset\\":\\"\\",\\"filterTag\\":\\"\\",\\"service\\":\\"\\",\\"prop\\":\\"\\",\\"loc\\":\\"\\",\\"start_price\\":null,\\"end_price\\":null,\\"startPrice\\":null,\\"endPrice\\":null,\\"itemIds\\":null,\\"p4pIds\\":null,\\"categoryp\\":\\"\\"}}"}}'
@@ -46,9 +56,18 @@ async def search(keyword: str, cookie: str, page: int) -> dict:
         logger.info(f'request url: {url}')
         resp = await requests.get(url, headers=headers)
         logger.info(f'response url: {url}, body: {resp.text}')
-        res_str = re.sub(r'^\s*mtopjsonp2\(|\)$', '', resp.text)
-        res = json.loads(res_str)
+        with span('taobao.parse'):
+            res = await run_blocking(JSON, parse_jsonp, resp.text, size=len(resp.text))
         return res.get('data', {})
     except Exception as e:
         logger.error(f"failed to request {url}, error: {e}")
-        return {}
\ No newline at end of file
+        return {}
+
+def parse_jsonp(text: str) -> dict:
+    """
+    去掉 mtopjsonp2(...) 包装后解析 JSON
+    :param text: 接口返回的 JSONP
+    :return: 解析结果
+    """
+    res_str = re.sub(r'^\s*mtopjsonp2\(|\)$', '', text)
+    return json.loads(res_str)
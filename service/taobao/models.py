@@ -1,3 +1,4 @@
 from data.driver import CommonAccount
+from utils.account_pool import AccountPool
 
-accounts = CommonAccount("data/taobao/taobao.db")
+accounts = AccountPool('taobao', CommonAccount("data/taobao/taobao.db"))
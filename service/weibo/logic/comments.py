@@ -1,16 +1,21 @@
 from .common import common_request
+from utils.cursor_cache import cursor_cache, resume_point, encode_cursor
 
-async def request_comments(id: str, cookie: str, offset: int = 0, limit: int = 20) -> tuple[dict, bool]:
+async def request_comments(id: str, cookie: str, offset: int = 0, limit: int = 20, cursor: str = '') -> tuple[dict, bool]:
     """
     请求微博获取评论信息
+    :param cursor: 上一页返回的续页令牌，为空时使用服务端游标缓存
     """
     headers = {"cookie": cookie}
     end_length = offset + limit
     comments = []
-    max_id = 0
-    total = 0
-    is_end = False
-    while not is_end and len(comments) < end_length:
+    start, max_id, total = resume_point('weibo', id, offset, cursor, 0)
+    total = total or 0
+    # 非首页的 max_id 为 0 表示已经没有更多评论
+    is_end = start > 0 and max_id == 0
+    next_cursor = '' if is_end else encode_cursor('weibo', id, start, max_id, total)
+    succ = True
+    while not is_end and start + len(comments) < end_length:
         params = {
             "id": id,
             "is_show_bulletin": 2,
@@ -28,6 +33,10 @@ async def request_comments(id: str, cookie: str, offset: int = 0, limit: int = 2
         max_id = int(resp.get('max_id', 0))
         total = resp.get('total_number', 0)
         is_end = max_id == 0 
+        position = start + len(comments)
+        cursor_cache.put('weibo', id, position, max_id, total)
+        if position <= end_length:
+            next_cursor = '' if is_end else encode_cursor('weibo', id, position, max_id, total)
 
-    ret = {'total': total, 'comments': comments[offset:end_length]}
+    ret = {'total': total, 'comments': comments[offset - start:end_length - start], 'cursor': next_cursor}
     return ret, succ
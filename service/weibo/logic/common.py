@@ -1,5 +1,8 @@
 from lib.logger import logger
 from lib import requests
+from utils.cookie_manager import check_cookie_expired, report_auth_failure
+from utils.account_pool import AUTH_FAILURE_STATUS
+from utils.tracing import traced
 
 HOST = 'https://weibo.com'
 MOBILE_HOST = 'https://m.weibo.cn'
@@ -41,6 +44,7 @@ MOBILE_COMMON_HEADERS ={
     "User-Agent": "Mozilla/5.0 (iPhone; CPU iPhone OS 16_6 like Mac OS X) AppleWebKit/605.1.15 (KHTML, like Gecko) Version/16.6 Mobile/15E148 Safari/604.1",
 }
 
+@traced('weibo.request')
 async def mobile_common_request(uri: str, params: dict, headers: dict, doc: bool = False) -> tuple[dict, bool]:
     """
     请求 douyin
@@ -63,6 +67,8 @@ async def mobile_common_request(uri: str, params: dict, headers: dict, doc: bool
     if response.status_code != 200 or response.text == '':
         logger.error(
             f'url: {url}, params: {params}, request error, code: {response.status_code}, body: {response.text}')
+        if response.status_code in AUTH_FAILURE_STATUS:
+            await report_auth_failure('weibo', headers.get('cookie', ''))
         return '', False
     
     if doc:
@@ -71,10 +77,12 @@ async def mobile_common_request(uri: str, params: dict, headers: dict, doc: bool
     if response.json().get('ok', 0) != 1:
         logger.error(
             f'url: {url}, params: {params}, request error, code: {response.status_code}, body: {response.text}')
+        await check_cookie_expired(response.json(), 'weibo', cookie=headers.get('cookie', ''))
         return response.json(), False
 
     return response.json(), True
 
+@traced('weibo.request')
 async def common_request(uri: str, params: dict, headers: dict) -> tuple[dict, bool]:
     """
     请求 douyin
@@ -96,11 +104,14 @@ async def common_request(uri: str, params: dict, headers: dict) -> tuple[dict, b
     if response.status_code != 200 or response.text == '':
         logger.error(
             f'url: {url}, params: {params}, request error, code: {response.status_code}, body: {response.text}')
+        if response.status_code in AUTH_FAILURE_STATUS:
+            await report_auth_failure('weibo', headers.get('cookie', ''))
         return '', False
 
     if response.json().get('ok', 0) != 1:
         logger.error(
             f'url: {url}, params: {params}, request error, code: {response.status_code}, body: {response.text}')
+        await check_cookie_expired(response.json(), 'weibo', cookie=headers.get('cookie', ''))
         return response.json(), False
 
     return response.json(), True
\ No newline at end of file
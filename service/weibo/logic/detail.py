@@ -2,6 +2,8 @@ from .common import mobile_common_request
 import re
 import json
 from bs4 import BeautifulSoup
+from utils.tracing import span
+from utils.executor import run_blocking, HTML
 
 async def request_detail(id: str) -> tuple[dict, bool]:
     """
@@ -13,8 +15,18 @@ async def request_detail(id: str) -> tuple[dict, bool]:
     match = re.search(r'var \$render_data = (\[.*?\])\[0\]', resp, re.DOTALL)
     if match:
         text = match.group(1)
-        data = json.loads(text)
-        detail = data[0].get("status", {})
-        detail['text'] = BeautifulSoup(detail.get('text', ''), 'html.parser').text
+        with span('weibo.parse'):
+            detail = await run_blocking(HTML, parse_render_data, text, size=len(text))
         return detail, True
-    return {}, False
\ No newline at end of file
+    return {}, False
+
+def parse_render_data(text: str) -> dict:
+    """
+    解析详情页中的 $render_data，正文转为纯文本
+    :param text: $render_data 的 JSON 字符串
+    :return: 微博信息
+    """
+    data = json.loads(text)
+    detail = data[0].get("status", {})
+    detail['text'] = BeautifulSoup(detail.get('text', ''), 'html.parser').text
+    return detail
\ No newline at end of file
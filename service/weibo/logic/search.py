@@ -1,4 +1,5 @@
 from .common import mobile_common_request
+from utils.page_cache import page_cache, account_key, is_full_page
 import asyncio
 
 async def request_search(keyword: str, cookie: str, offset: int = 0, limit: int = 10) -> dict:
@@ -10,15 +11,22 @@ async def request_search(keyword: str, cookie: str, offset: int = 0, limit: int
     page_size = 10
     start_page = int( offset / page_size ) + 1
     end_page = int((offset + limit - 1) / page_size) + 1
-    tasks = [request_page(page, keyword, cookie) for page in range(start_page, end_page + 1)]
+    account = account_key(cookie)
+    tasks = [page_cache.get(('weibo', account, keyword, page), lambda page=page: request_page(page, keyword, cookie), _has_cards)
+             for page in range(start_page, end_page + 1)]
     pages = await asyncio.gather(*tasks)
     for data in pages:
         total = data.get('cardlistInfo', {}).get('total') if data.get('cardlistInfo', {}).get('total') else total
         results.extend(data.get('cards', []))
+    if is_full_page(len(pages[-1].get('cards', [])), page_size, end_page * page_size, total):
+        page_cache.prefetch(('weibo', account, keyword, end_page + 1), lambda: request_page(end_page + 1, keyword, cookie), _has_cards)
 
     ret = {'total': total, 'results': results[(offset % page_size):(offset % page_size + limit)]}
     return ret
 
+def _has_cards(data: dict) -> bool:
+    return len(data.get('cards', [])) > 0
+
 async def request_page(page: int, keyword: str, cookie: str) -> dict:
     headers = {"Cookie": cookie}
     params = {
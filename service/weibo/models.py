@@ -1,3 +1,4 @@
 from data.driver import CommonAccount
+from utils.account_pool import AccountPool
 
-accounts = CommonAccount("data/weibo/weibo.db")
+accounts = AccountPool('weibo', CommonAccount("data/weibo/weibo.db"))
@@ -5,7 +5,7 @@ from lib.logger import logger
 from ..logic import request_comments
 import random
 
-async def comments(id: str, offset: int = 0, limit: int = 20):
+async def comments(id: str, offset: int = 0, limit: int = 20, cursor: str = ''):
     """
     获取微博评论
     """
@@ -15,7 +15,7 @@ async def comments(id: str, offset: int = 0, limit: int = 20):
         if account.get('expired', 0) == 1:
             continue
         account_id = account.get('id', '')
-        res, succ = await request_comments(id, account.get('cookie', ''), offset, limit)
+        res, succ = await request_comments(id, account.get('cookie', ''), offset, limit, cursor)
         if not succ:
             await accounts.expire(account.get('id', ''))
         if res == {} or not succ:
@@ -1,18 +1,22 @@
 from .common import common_request
+from utils.cursor_cache import cursor_cache, resume_point, encode_cursor
 
-async def request_comments(id: str, cookie: str, offset: int, limit: int) -> tuple[dict, bool]:
+async def request_comments(id: str, cookie: str, offset: int, limit: int, cursor: str = '') -> tuple[dict, bool]:
     """
     请求小红书获取评论信息
+    :param cursor: 上一页返回的续页令牌，为空时使用服务端游标缓存
     """
-    cursor = ''
+    start, state, _ = resume_point('xhs', id, offset, cursor, {'cursor': '', 'has_more': True})
+    page_cursor, has_more = state.get('cursor', ''), state.get('has_more', True)
     headers = {"cookie": cookie}
     end_length = offset + limit
+    next_cursor = encode_cursor('xhs', id, start, state) if has_more else ''
     comments = []
-    has_more = True
-    while has_more and len(comments) < end_length:
+    succ = True
+    while has_more and start + len(comments) < end_length:
         data = {
             "note_id": id,
-            "cursor": cursor,
+            "cursor": page_cursor,
             "top_comment_id": '',
             "image_formats": ["jpg", "webp", "avif"]
         }
@@ -21,7 +25,12 @@ async def request_comments(id: str, cookie: str, offset: int, limit: int) -> tup
             return {}, succ
         has_more = resp.get('data', {}).get('has_more', False)
         comments.extend(resp.get('data', {}).get('comments', []))
-        cursor = resp.get('data', {}).get('cursor', '')
+        page_cursor = resp.get('data', {}).get('cursor', '')
+        state = {'cursor': page_cursor, 'has_more': has_more}
+        position = start + len(comments)
+        cursor_cache.put('xhs', id, position, state)
+        if position <= end_length:
+            next_cursor = encode_cursor('xhs', id, position, state) if has_more else ''
 
-    ret = {"comments": comments[offset:end_length]}
+    ret = {"comments": comments[offset - start:end_length - start], "cursor": next_cursor}
     return ret, succ
@@ -1,6 +1,11 @@
 from typing import Optional
 from lib.logger import logger
 from lib import requests
+from utils.cookie_manager import check_cookie_expired, report_auth_failure
+from utils.account_pool import AUTH_FAILURE_STATUS
+from utils.metrics import sign_duration
+from utils.tracing import span, traced
+from utils.executor import run_blocking, JS
 import execjs
 import json
 
@@ -31,6 +36,7 @@ with open('lib/js/xhs.js', encoding='utf-8') as f:
     xhs_sign_obj = execjs.compile(f.read())
 
 
+@traced('xhs.request')
 async def common_request(uri: str, params: dict, headers: dict, need_sign: bool = True, post: bool = True) -> tuple[
     dict, bool]:
     """
@@ -43,7 +49,8 @@ async def common_request(uri: str, params: dict, headers: dict, need_sign: bool
     url = f'{API_HOST}{uri}'
     headers.update(COMMON_HEADERS)
     if post:
-        sign_request(uri, params, headers, need_sign)
+        with sign_duration.time('xhs'), span('xhs.sign'):
+            await sign_request(uri, params, headers, need_sign)
         logger.info(f'url: {url}, request {url}, params={params}, headers={headers}')
         body = json.dumps(params, separators=(',', ':'), ensure_ascii=False)
         response = await requests.post(url, data=body, headers=headers)
@@ -54,7 +61,8 @@ async def common_request(uri: str, params: dict, headers: dict, need_sign: bool
         uri = f'{uri}?{params_str}'
         url = f'{url}?{params_str}'
 
-        sign_request(uri, None, headers, need_sign)
+        with sign_duration.time('xhs'), span('xhs.sign'):
+            await sign_request(uri, None, headers, need_sign)
         logger.info(f'url: {url}, request {url}, params={params}, headers={headers}')
         response = await requests.get(url, headers=headers)
 
@@ -64,17 +72,20 @@ async def common_request(uri: str, params: dict, headers: dict, need_sign: bool
     if response.status_code != 200:
         logger.error(
             f'url: {url}, params: {params}, request error, code: {response.status_code}, body: {response.text}')
+        if response.status_code in AUTH_FAILURE_STATUS:
+            await report_auth_failure('xhs', headers.get('cookie', ''))
         return {}, False
 
     if response.json().get('code', 0) != 0:
         logger.error(
             f'url: {url}, params: {params}, request error, code: {response.status_code}, body: {response.text}')
+        await check_cookie_expired(response.json(), 'xhs', cookie=headers.get('cookie', ''))
         return response.json(), False
 
     return response.json(), True
 
 
-def sign_request(uri: str, params: Optional[dict], headers: dict, need_sign: bool) -> None:
+async def sign_request(uri: str, params: Optional[dict], headers: dict, need_sign: bool) -> None:
     """
     为请求添加签名
     :param uri:
@@ -84,5 +95,5 @@ def sign_request(uri: str, params: Optional[dict], headers: dict, need_sign: boo
     :return:
     """
     if need_sign:
-        sign_header = xhs_sign_obj.call('sign', uri, params, headers.get('cookie', ''))
+        sign_header = await run_blocking(JS, xhs_sign_obj.call, 'sign', uri, params, headers.get('cookie', ''))
         headers.update(sign_header)
@@ -2,6 +2,8 @@ from .common import common_request, COMMON_HEADERS
 from lib import requests
 from lib import logger
 from bs4 import BeautifulSoup
+from utils.tracing import span
+from utils.executor import run_blocking, HTML
 import re
 import json
 
@@ -19,13 +21,23 @@ async def request_detail(id: str, cookie: str) -> tuple[dict, bool]:
     if resp.status_code != 200 or resp.text == '':
         return {}, False
     try:
-        soup = BeautifulSoup(resp.text, 'html.parser')
-        pattern = re.compile('window\\.__INITIAL_STATE__={.*}')
-        text = soup.body.find(
-            'script', text=pattern).text.replace('window.__INITIAL_STATE__=', '').replace('undefined', '""')
-        target = json.loads(text)
+        with span('xhs.parse'):
+            target = await run_blocking(HTML, parse_note_html, resp.text, size=len(resp.text))
         detail_data = target.get('note', {}).get('noteDetailMap', {}).get(id, {})
     except Exception as e:
         logger.error(f"failed to get detail: {id}, err: {e}")
         return {}, False
     return detail_data, True
+
+
+def parse_note_html(document: str) -> dict:
+    """
+    解析笔记详情页中的 __INITIAL_STATE__
+    :param document: 详情页 html
+    :return: 页面数据
+    """
+    soup = BeautifulSoup(document, 'html.parser')
+    pattern = re.compile('window\\.__INITIAL_STATE__={.*}')
+    text = soup.body.find(
+        'script', text=pattern).text.replace('window.__INITIAL_STATE__=', '').replace('undefined', '""')
+    return json.loads(text)
@@ -2,6 +2,8 @@ from .common import common_request, WEB_HOST
 from bs4 import BeautifulSoup
 from lib import requests
 from lib.logger import logger
+from utils.tracing import span
+from utils.executor import run_blocking, HTML
 import re
 import json
 import asyncio
@@ -25,11 +27,20 @@ async def request_user_detail(id: str) -> dict:
     if response.status_code != 200 or response.text == '':
         logger.error(f'failed get xhs user detail，id: {id}, code：{response.status_code}， body: {response.text}')
         return {}
-    soup = BeautifulSoup(response.text, 'html.parser')
+    with span('xhs.parse'):
+        data = await run_blocking(HTML, parse_user_html, response.text, size=len(response.text))
+    return data
+
+def parse_user_html(document: str) -> dict:
+    """
+    解析用户主页中的 __INITIAL_STATE__
+    :param document: 用户主页 html
+    :return: 页面数据
+    """
+    soup = BeautifulSoup(document, 'html.parser')
     pattern = re.compile('window\\.__INITIAL_STATE__=')
     target = soup.find('script', text = pattern).text.replace('window.__INITIAL_STATE__=', '').replace('undefined', 'null')
-    data = json.loads(target)
-    return data
+    return json.loads(target)
 
 # 获取作品
 async def request_user_notes(id: str, cookie: str, offset: int = 0, limit: int = 20) -> list:
@@ -1,3 +1,4 @@
 from data.driver import CommonAccount
+from utils.account_pool import AccountPool
 
-accounts = CommonAccount("data/xhs/xhs.db")
\ No newline at end of file
+accounts = AccountPool('xhs', CommonAccount("data/xhs/xhs.db"))
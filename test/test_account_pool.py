@@ -0,0 +1,93 @@
+import unittest
+import asyncio
+import time
+from unittest import mock
+from utils.account_pool import AccountPool, get_account_pool
+
+
+class FakeAccountStore:
+    def __init__(self):
+        self.accounts = [{'id': 'a', 'cookie': 'c1', 'expired': 0}, {'id': 'b', 'cookie': 'c2', 'expired': 0}]
+
+    async def load(self):
+        return [dict(account) for account in self.accounts]
+
+    async def save(self, id, cookie, expired):
+        for account in self.accounts:
+            if account['id'] == id:
+                account.update(cookie=cookie, expired=expired)
+
+    async def expire(self, id):
+        for account in self.accounts:
+            if account['id'] == id:
+                account['expired'] = 1
+
+
+class TestAccountPool(unittest.TestCase):
+    def setUp(self):
+        self.store = FakeAccountStore()
+        self.pool = AccountPool('test_pool', self.store)
+        self.pool.configure({'failure_threshold': 3, 'failure_window_minutes': 10, 'quarantine_minutes': 30})
+
+    def expired(self, accounts):
+        return {account['id']: account['expired'] for account in accounts}
+
+    def test_quarantine_at_threshold(self):
+        async def run():
+            for _ in range(2):
+                await self.pool.report_failure(cookie='c1')
+            before = await self.pool.load()
+            self.assertEqual(await self.pool.report_failure(cookie='c1'), 'a')
+            return before, await self.pool.load()
+
+        before, after = asyncio.run(run())
+        self.assertEqual(self.expired(before), {'a': 0, 'b': 0})
+        self.assertEqual(self.expired(after), {'a': 1, 'b': 0})
+        self.assertGreater(after[0]['quarantined_until'], time.time() + 29 * 60)
+        # 隔离不修改存储中的账号
+        self.assertEqual(self.store.accounts[0]['expired'], 0)
+        self.assertIn('a', self.pool.get_status()['quarantined'])
+
+    def test_failures_outside_window(self):
+        async def run():
+            now = time.time()
+            with mock.patch('utils.account_pool.time.time', return_value=now - 11 * 60):
+                await self.pool.report_failure(id='a')
+                await self.pool.report_failure(id='a')
+            await self.pool.report_failure(id='a')
+            return await self.pool.load()
+
+        self.assertEqual(self.expired(asyncio.run(run())), {'a': 0, 'b': 0})
+
+    def test_quarantine_expires(self):
+        async def run():
+            for _ in range(3):
+                await self.pool.report_failure(cookie='c2')
+            with mock.patch('utils.account_pool.time.time', return_value=time.time() + 31 * 60):
+                return await self.pool.load()
+
+        self.assertEqual(self.expired(asyncio.run(run())), {'a': 0, 'b': 0})
+
+    def test_save_clears_quarantine(self):
+        async def run():
+            for _ in range(3):
+                await self.pool.report_failure(cookie='c1')
+            await self.pool.save('a', 'c3', 0)
+            return await self.pool.load()
+
+        accounts = asyncio.run(run())
+        self.assertEqual(self.expired(accounts), {'a': 0, 'b': 0})
+        self.assertNotIn('quarantined_until', accounts[0])
+
+    def test_report_expired(self):
+        async def run():
+            self.assertIsNone(await self.pool.report_failure(cookie='unknown'))
+            self.assertEqual(await self.pool.report_expired(cookie='c2'), 'b')
+            return await self.pool.load()
+
+        self.assertEqual(self.expired(asyncio.run(run())), {'a': 0, 'b': 1})
+        self.assertIs(get_account_pool('test_pool'), self.pool)
+
+
+if __name__ == '__main__':
+    unittest.main()
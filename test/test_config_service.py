@@ -0,0 +1,142 @@
+import unittest
+import asyncio
+import os
+import tempfile
+from unittest import mock
+import yaml
+from utils.config_service import ConfigService
+
+
+class TestConfigService(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmpdir.name, 'config.yaml')
+        with open(self.path, 'w', encoding='utf-8') as f:
+            yaml.dump({'monitor': {'enabled': False, 'users': [{'id': 1}]}, 'other': 1}, f)
+        self.service = ConfigService(self.path, debounce_seconds=0.05)
+        self.service.load()
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def read_file(self):
+        with open(self.path, encoding='utf-8') as f:
+            return yaml.safe_load(f)
+
+    def test_copy_on_write(self):
+        async def run():
+            old = self.service.snapshot
+            await self.service.update(lambda config: config['monitor']['users'].append({'id': 2}))
+            await self.service.flush()
+            return old
+
+        old = asyncio.run(run())
+        # 修改前取得的快照不受影响
+        self.assertEqual(old['monitor']['users'], [{'id': 1}])
+        self.assertEqual(self.service.get('monitor.users'), [{'id': 1}, {'id': 2}])
+        self.assertEqual(self.service.get('monitor.missing', 'default'), 'default')
+
+    def test_validator_rejects(self):
+        def validator(config):
+            if not isinstance(config['monitor']['enabled'], bool):
+                raise ValueError('enabled 必须是布尔值')
+
+        self.service.add_validator(validator)
+
+        async def run():
+            with self.assertRaises(ValueError):
+                await self.service.update(lambda config: config['monitor'].update(enabled='yes'))
+
+        before = self.service.snapshot
+        asyncio.run(run())
+        self.assertIs(self.service.snapshot, before)
+        self.assertFalse(self.service.get('monitor.enabled'))
+
+    def test_debounce(self):
+        async def run():
+            with mock.patch('utils.config_service._write_file') as write:
+                for value in range(5):
+                    await self.service.update(lambda config, value=value: config.update(other=value))
+                await asyncio.sleep(0.2)
+                return write.call_count, yaml.safe_load(write.call_args[0][1])
+
+        calls, written = asyncio.run(run())
+        self.assertEqual(calls, 1)
+        self.assertEqual(written['other'], 4)
+
+    def test_flush(self):
+        async def run():
+            self.service.debounce_seconds = 60
+            await self.service.update(lambda config: config.update(other=2))
+            self.assertEqual(self.read_file()['other'], 1)
+            await self.service.flush()
+
+        asyncio.run(run())
+        self.assertEqual(self.read_file()['other'], 2)
+
+    def test_reload(self):
+        async def run():
+            await self.service.update(lambda config: config.update(other=2))
+            await self.service.flush()
+            # 自身写入的内容不重新加载
+            ignored = await self.service.reload()
+            with open(self.path, 'w', encoding='utf-8') as f:
+                yaml.dump({'monitor': {'enabled': True}, 'other': 3}, f)
+            return ignored, await self.service.reload()
+
+        self.assertEqual(asyncio.run(run()), (False, True))
+        self.assertEqual(self.service.get('other'), 3)
+
+    def test_publish_changed_paths(self):
+        changes = []
+
+        def subscriber(name):
+            async def callback(old, new):
+                changes.append((name, old, new))
+            return callback
+
+        self.service.subscribe('monitor.enabled', subscriber('enabled'))
+        self.service.subscribe('other', subscriber('other'))
+
+        async def run():
+            await self.service.update(lambda config: config['monitor'].update(enabled=True))
+            await self.service.update(lambda config: config['monitor'].update(enabled=True))
+            await self.service.flush()
+
+        asyncio.run(run())
+        self.assertEqual(changes, [('enabled', False, True)])
+
+
+class TestConfigServiceMultiprocess(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmpdir.name, 'config.yaml')
+        with open(self.path, 'w', encoding='utf-8') as f:
+            yaml.dump({'a': 1, 'b': 1}, f)
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def test_keep_other_process_changes(self):
+        # 两个实例模拟两个进程，各自持有加载时的快照
+        async def run():
+            first, second = ConfigService(self.path), ConfigService(self.path)
+            for service in (first, second):
+                service.multiprocess = True
+                service.load()
+            await first.update(lambda config: config.update(a=2))
+            new = await second.update(lambda config: config.update(b=2))
+            # 自身写入的内容不会触发重新加载
+            self.assertFalse(await second.reload())
+            self.assertTrue(await first.reload())
+            return new, first.snapshot
+
+        new, reloaded = asyncio.run(run())
+        self.assertEqual(new, {'a': 2, 'b': 2})
+        self.assertEqual(reloaded, {'a': 2, 'b': 2})
+        with open(self.path, encoding='utf-8') as f:
+            self.assertEqual(yaml.safe_load(f), {'a': 2, 'b': 2})
+
+
+if __name__ == '__main__':
+    unittest.main()
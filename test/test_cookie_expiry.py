@@ -0,0 +1,59 @@
+import unittest
+from utils.cookie_manager import ExpiryRule, DEFAULT_RULE, PLATFORM_RULES, get_expiry_rule
+
+
+class TestExpiryRule(unittest.TestCase):
+    def assertExpired(self, platform, response, expected=True):
+        self.assertEqual(get_expiry_rule(platform).match(response), expected, f'{platform}: {response}')
+
+    def test_bilibili(self):
+        self.assertExpired('bilibili', {'code': -101, 'message': '账号未登录'})
+        self.assertExpired('bilibili', {'code': 0, 'message': '未登录'})
+        self.assertExpired('bilibili', {'code': 0, 'message': '0', 'data': {'title': 'cookie 登录教程'}}, False)
+        self.assertExpired('bilibili', {'code': -404, 'message': '啥都木有'}, False)
+
+    def test_xhs(self):
+        self.assertExpired('xhs', {'code': -100, 'msg': ''})
+        self.assertExpired('xhs', {'code': 0, 'msg': '登录已过期'})
+        self.assertExpired('xhs', {'code': 0, 'success': True, 'data': {'desc': 'login 过期 cookie'}}, False)
+
+    def test_weibo(self):
+        self.assertExpired('weibo', {'ok': -100, 'msg': ''})
+        self.assertExpired('weibo', {'ok': 0, 'msg': '请先登录'})
+        self.assertExpired('weibo', {'ok': 1, 'data': {'cards': [{'text': '如何清除 cookie 重新 login'}]}}, False)
+
+    def test_douyin(self):
+        self.assertExpired('douyin', {'status_code': 8, 'status_msg': ''})
+        self.assertExpired('douyin', {'status_code': 0, 'status_msg': '用户未登录'})
+        self.assertExpired('douyin', {'status_code': 0, 'aweme_detail': {'desc': '登录失效怎么办 cookie'}}, False)
+
+    def test_taobao(self):
+        # ret 为列表
+        self.assertExpired('taobao', {'ret': ['FAIL_SYS_SESSION_EXPIRED::Session过期']})
+        self.assertExpired('taobao', {'ret': ['FAIL_SYS_TOKEN_EXOIRED::令牌过期']})
+        # ret 为字符串
+        self.assertExpired('taobao', {'ret': 'FAIL_SYS_TOKEN_EXPIRED::令牌过期'})
+        self.assertExpired('taobao', {'ret': ['SUCCESS::调用成功'], 'data': {'title': 'login cookie 过期'}}, False)
+        self.assertExpired('taobao', {'ret': ['FAIL_SYS_USER_VALIDATE::哎哟喂'], 'data': {}}, False)
+
+    def test_default_rule(self):
+        self.assertExpired('unknown', {'code': 401})
+        self.assertExpired('unknown', {'status': 403})
+        self.assertExpired('unknown', {'msg': 'Login required'})
+        # 只检查声明的字段，其他字段中的关键词不算
+        self.assertExpired('unknown', {'code': 0, 'data': {'text': 'cookie login'}}, False)
+        self.assertIs(get_expiry_rule('unknown'), DEFAULT_RULE)
+
+    def test_nested_paths(self):
+        rule = ExpiryRule(['data.code'], [1], ['data.messages'], ['过期'])
+        self.assertTrue(rule.match({'data': {'code': 1}}))
+        self.assertTrue(rule.match({'data': {'messages': ['正常', '会话过期']}}))
+        self.assertFalse(rule.match({'data': '过期'}))
+        self.assertFalse(rule.match(['过期']))
+
+    def test_all_platforms_declared(self):
+        self.assertEqual(set(PLATFORM_RULES), {'bilibili', 'xhs', 'weibo', 'douyin', 'taobao'})
+
+
+if __name__ == '__main__':
+    unittest.main()
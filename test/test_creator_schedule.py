@@ -0,0 +1,69 @@
+import unittest
+import asyncio
+import os
+import tempfile
+from utils.creator_schedule import AdaptivePolicy, CreatorScheduleStore
+
+NOW = 1_700_000_000
+
+
+def video(age_seconds, digg_count=0):
+    return {'create_time': NOW - age_seconds, 'statistics': {'digg_count': digg_count}}
+
+
+class TestAdaptivePolicy(unittest.TestCase):
+    def setUp(self):
+        self.policy = AdaptivePolicy(base_seconds=3600, min_seconds=600, max_seconds=86400, recent_hours=24)
+
+    def test_rising_video(self):
+        # 每小时 8000 赞，距离阈值还差 2000 赞，预计 15 分钟后超过
+        state = self.policy.update({'sec_user_id': 'u'}, [video(3600, 8000)], 10000, NOW)
+        self.assertEqual(state['interval_seconds'], 900)
+        self.assertEqual(state['likes_per_hour'], 8000)
+        self.assertTrue(NOW + 900 * 0.9 <= state['next_check_at'] <= NOW + 900 * 1.1)
+
+    def test_slow_video_uses_base(self):
+        state = self.policy.update({'sec_user_id': 'u'}, [video(3600, 100)], 10000, NOW)
+        self.assertEqual(state['interval_seconds'], 3600)
+
+    def test_frequent_poster(self):
+        # 每 2000 秒发布一次，两次发布之间检查两次
+        state = self.policy.update({'sec_user_id': 'u'}, [video(100), video(2100), video(4100)], 10000, NOW)
+        self.assertEqual(state['post_gap_seconds'], 2000)
+        self.assertEqual(state['interval_seconds'], 1000)
+
+    def test_silent_creator(self):
+        state = self.policy.update({'sec_user_id': 'u'}, [video(48 * 3600)], 10000, NOW)
+        self.assertEqual(state['interval_seconds'], 7200)
+        # 放宽后不超过最大间隔
+        state = self.policy.update({'sec_user_id': 'u'}, [video(30 * 86400)], 10000, NOW)
+        self.assertEqual(state['interval_seconds'], 86400)
+
+    def test_smoothing(self):
+        state = {'sec_user_id': 'u', 'post_gap_seconds': 4000, 'likes_per_hour': 1000, 'last_post_at': NOW - 50}
+        state = self.policy.update(state, [video(100, 2000), video(2100)], 100000, NOW)
+        self.assertAlmostEqual(state['post_gap_seconds'], 3400)
+        self.assertAlmostEqual(state['likes_per_hour'], 1000 + 0.3 * (8000 - 1000))
+        # 作品列表中的发布时间早于记录的最新发布时间时保留记录的值
+        self.assertEqual(state['last_post_at'], NOW - 50)
+
+
+class TestCreatorScheduleStore(unittest.TestCase):
+    def test_save_load(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            async def run():
+                store = CreatorScheduleStore(os.path.join(tmpdir, 'monitor.db'))
+                policy = AdaptivePolicy(3600, 600, 86400, 24)
+                state = policy.update({'sec_user_id': 'u'}, [video(3600, 100)], 10000, NOW)
+                await store.save(state)
+                await store.save({**state, 'interval_seconds': 1800})
+                loaded = await store.load()
+                await store.close()
+                return state, loaded
+
+            state, loaded = asyncio.run(run())
+        self.assertEqual(loaded, {'u': {**state, 'interval_seconds': 1800}})
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,89 @@
+import unittest
+import os
+import tempfile
+from unittest import mock
+from utils import cursor_cache as module
+from utils.cursor_cache import CursorCache, encode_cursor, decode_cursor, resume_point
+
+
+class TestCursorCache(unittest.TestCase):
+    def test_nearest(self):
+        cache = CursorCache()
+        cache.put('weibo', '1', 20, 'c20', 100)
+        cache.put('weibo', '1', 40, 'c40')
+        self.assertIsNone(cache.nearest('weibo', '1', 10))
+        self.assertEqual(cache.nearest('weibo', '1', 30), (20, 'c20', 100))
+        self.assertEqual(cache.nearest('weibo', '1', 40), (40, 'c40', 100))
+        self.assertIsNone(cache.nearest('weibo', '2', 40))
+
+    def test_expired(self):
+        cache = CursorCache(ttl_seconds=60)
+        cache.put('weibo', '1', 20, 'c20')
+        with mock.patch('utils.cursor_cache.time.time', return_value=module.time.time() + 61):
+            self.assertIsNone(cache.nearest('weibo', '1', 20))
+        self.assertIsNone(cache.nearest('weibo', '1', 20))
+
+    def test_max_items(self):
+        cache = CursorCache(max_items=2)
+        cache.put('weibo', '1', 20, 'a')
+        cache.put('weibo', '2', 20, 'b')
+        # 最近写入的组保留，最早的组被淘汰
+        cache.put('weibo', '1', 40, 'c')
+        cache.put('weibo', '3', 20, 'd')
+        self.assertIsNone(cache.nearest('weibo', '2', 20))
+        self.assertEqual(cache.nearest('weibo', '1', 40)[1], 'c')
+
+
+class TestCursorToken(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.patches = [
+            mock.patch.object(module, 'SECRET_FILE', os.path.join(self.tmpdir.name, 'cursor.key')),
+            mock.patch.object(module, '_secret', None),
+            mock.patch.object(module, 'cursor_cache', CursorCache()),
+        ]
+        for patch in self.patches:
+            patch.start()
+
+    def tearDown(self):
+        for patch in self.patches:
+            patch.stop()
+        self.tmpdir.cleanup()
+
+    def test_roundtrip(self):
+        token = encode_cursor('bilibili', 'BV1', 20, {'oid': 1, 'pagination': 'p'}, 300)
+        self.assertEqual(decode_cursor(token, 'bilibili', 'BV1'), (20, {'oid': 1, 'pagination': 'p'}, 300))
+        token = encode_cursor('xhs', 'n1', 10, {'cursor': 'x'})
+        self.assertEqual(decode_cursor(token, 'xhs', 'n1'), (10, {'cursor': 'x'}, None))
+
+    def test_tampered_token(self):
+        token = encode_cursor('bilibili', 'BV1', 20, {'oid': 1})
+        encoded, signature = token.split('.')
+        forged = encode_cursor('bilibili', 'BV1', 20, {'oid': 2}).split('.')[0]
+        self.assertIsNone(decode_cursor(forged + '.' + signature, 'bilibili', 'BV1'))
+        self.assertIsNone(decode_cursor(encoded, 'bilibili', 'BV1'))
+        self.assertIsNone(decode_cursor('not-a-token', 'bilibili', 'BV1'))
+
+    def test_mismatch(self):
+        token = encode_cursor('bilibili', 'BV1', 20, {'oid': 1})
+        self.assertIsNone(decode_cursor(token, 'bilibili', 'BV2'))
+        self.assertIsNone(decode_cursor(token, 'weibo', 'BV1'))
+
+    def test_secret_persisted(self):
+        token = encode_cursor('weibo', '1', 20, 5)
+        # 其他进程读取同一个密钥文件
+        with mock.patch.object(module, '_secret', None):
+            self.assertEqual(decode_cursor(token, 'weibo', '1'), (20, 5, None))
+
+    def test_resume_point(self):
+        self.assertEqual(resume_point('weibo', '1', 40, '', 0), (0, 0, None))
+        module.cursor_cache.put('weibo', '1', 20, 'cached', 100)
+        self.assertEqual(resume_point('weibo', '1', 40, '', 0), (20, 'cached', 100))
+        token = encode_cursor('weibo', '1', 40, 'token', 120)
+        self.assertEqual(resume_point('weibo', '1', 40, token, 0), (40, 'token', 120))
+        # 令牌超过请求的偏移量时不使用
+        self.assertEqual(resume_point('weibo', '1', 30, token, 0), (20, 'cached', 100))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,53 @@
+import unittest
+import asyncio
+import os
+import tempfile
+from utils.dedup_store import DedupStore
+
+
+class TestDedupStore(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmpdir.name, 'monitor.db')
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def test_add_and_clean(self):
+        async def run():
+            store = DedupStore(self.path)
+            await store.add('a', 100)
+            await store.add('b', 200)
+            # 重复记录只更新通知时间
+            await store.add('a', 300)
+            self.assertEqual(store.size, 2)
+            self.assertTrue(await store.contains('a'))
+            self.assertFalse(await store.contains('c'))
+            self.assertEqual(await store.filter_notified(['a', 'b', 'c']), {'a', 'b'})
+            self.assertEqual(await store.clean_expired(250), 1)
+            self.assertEqual(await store.filter_notified(['a', 'b']), {'a'})
+            await store.close()
+
+            # 重新打开后记录仍然有效
+            reopened = DedupStore(self.path)
+            found = await reopened.contains('a')
+            size = reopened.size
+            await reopened.close()
+            return found, size
+
+        self.assertEqual(asyncio.run(run()), (True, 1))
+
+    def test_filter_notified_batches(self):
+        async def run():
+            store = DedupStore(self.path)
+            for index in range(0, 1200, 2):
+                await store.add(str(index), 100)
+            found = await store.filter_notified(str(index) for index in range(1200))
+            await store.close()
+            return found
+
+        self.assertEqual(len(asyncio.run(run())), 600)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,125 @@
+import unittest
+import asyncio
+import os
+import tempfile
+from service.jobs.logic.store import JobStore
+from service.jobs.logic.engine import JobEngine
+
+
+class TestJobStore(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmpdir.name, 'jobs.db')
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def run_with_store(self, test):
+        async def run():
+            store = JobStore(self.path)
+            try:
+                await test(store)
+            finally:
+                await store.close()
+
+        asyncio.run(run())
+
+    def test_claim_in_order(self):
+        async def test(store):
+            job_id = await store.create('bilibili', 'comments', ['a', 'b'], 10)
+            first = await store.claim()
+            second = await store.claim()
+            self.assertEqual([first['target'], second['target']], ['a', 'b'])
+            self.assertEqual(first['spec']['op'], 'comments')
+            self.assertIsNone(await store.claim())
+            self.assertEqual((await store.get(job_id))['status'], 'running')
+
+        self.run_with_store(test)
+
+    def test_recover_running_tasks(self):
+        async def test(store):
+            await store.create('bilibili', 'comments', ['a'], 10)
+            task = await store.claim()
+            await store.checkpoint(task['id'], task['job_id'], 'a', [{'id': 1}], 20, 'next')
+            self.assertIsNone(await store.claim())
+            # 模拟进程重启
+            self.assertEqual(await store.recover(), 1)
+            recovered = await store.claim()
+            self.assertEqual(recovered['id'], task['id'])
+            self.assertEqual((recovered['offset'], recovered['cursor'], recovered['fetched']), (20, 'next', 1))
+
+        self.run_with_store(test)
+
+    def test_cancelled_job_not_claimed(self):
+        async def test(store):
+            job_id = await store.create('bilibili', 'comments', ['a', 'b'], 10)
+            task = await store.claim()
+            self.assertTrue(await store.cancel(job_id))
+            self.assertIsNone(await store.claim())
+            # 取消时执行中的队列项在重启后恢复为待执行，也不能再被领取
+            await store.recover()
+            self.assertIsNone(await store.claim())
+            await store.finish_task(task['id'], job_id, 'cancelled')
+            job = await store.get(job_id)
+            self.assertEqual(job['status'], 'cancelled')
+            self.assertEqual(job['progress'].get('cancelled'), 2)
+
+        self.run_with_store(test)
+
+    def test_retry_delay(self):
+        async def test(store):
+            await store.create('bilibili', 'comments', ['a'], 10)
+            task = await store.claim()
+            await store.retry_task(task['id'], 'err', 60)
+            self.assertIsNone(await store.claim())
+            await store.retry_task(task['id'], 'err', 0)
+            self.assertEqual((await store.claim())['attempts'], 2)
+
+        self.run_with_store(test)
+
+
+class TestJobEngine(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmpdir.name, 'jobs.db')
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def test_cancelled_task_finished(self):
+        async def run():
+            store = JobStore(self.path)
+            engine = JobEngine(store, {})
+            job_id = await store.create('bilibili', 'comments', ['a'], 10)
+            task = await store.claim()
+            await store.cancel(job_id)
+            await engine._run_task(task)
+            job = await store.get(job_id)
+            await store.close()
+            return job
+
+        job = asyncio.run(run())
+        self.assertEqual(job['status'], 'cancelled')
+        self.assertEqual(job['tasks'][0]['status'], 'cancelled')
+
+    def test_failure_backoff(self):
+        async def run():
+            store = JobStore(self.path)
+            engine = JobEngine(store, {'max_attempts': 3, 'retry_base_seconds': 30, 'retry_max_seconds': 40})
+            job_id = await store.create('bilibili', 'comments', ['a'], 10)
+            task = await store.claim()
+            await engine._fail(task, 'err')
+            first = await store.claim()
+            task['attempts'] = 2
+            await engine._fail(task, 'err')
+            job = await store.get(job_id)
+            await store.close()
+            return first, job
+
+        first, job = asyncio.run(run())
+        self.assertIsNone(first)
+        self.assertEqual(job['status'], 'failed')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,95 @@
+import unittest
+import asyncio
+import os
+import tempfile
+from unittest import mock
+import yaml
+from utils.config_service import ConfigService
+from utils.monitored_creators import MonitoredCreatorStore, migrate_config_users
+
+
+class TestMonitoredCreatorStore(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmpdir.name, 'monitor.db')
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def run_with_store(self, test):
+        async def run():
+            store = MonitoredCreatorStore(self.path)
+            try:
+                await test(store)
+            finally:
+                await store.close()
+
+        asyncio.run(run())
+
+    def test_bulk_upsert(self):
+        async def test(store):
+            await store.add({'sec_user_id': 'a', 'nickname': '博主A', 'like_threshold': 100})
+            added, updated = await store.bulk_upsert([
+                {'sec_user_id': 'a', 'nickname': '新昵称', 'like_threshold': 200},
+                {'sec_user_id': 'b', 'nickname': '博主B', 'like_threshold': 300},
+            ])
+            self.assertEqual((added, updated), (1, 0))
+            self.assertEqual([(c['sec_user_id'], c['nickname']) for c in await store.load_all()],
+                             [('a', '博主A'), ('b', '博主B')])
+
+        self.run_with_store(test)
+
+    def test_overwrite_keeps_unsupplied_fields(self):
+        async def test(store):
+            velocity = {'min_likes_per_hour': 500}
+            await store.add({'sec_user_id': 'a', 'profile_url': 'https://www.douyin.com/user/a',
+                             'nickname': '博主A', 'like_threshold': 100, 'velocity': velocity})
+            # 批量导入的条目不带速度规则，昵称获取失败时为空
+            added, updated = await store.bulk_upsert(
+                [{'sec_user_id': 'a', 'nickname': '', 'like_threshold': 200, 'enabled': False}], overwrite=True)
+            self.assertEqual((added, updated), (0, 1))
+            creator = (await store.load_all())[0]
+            self.assertEqual((creator['nickname'], creator['profile_url'], creator['velocity']),
+                             ('博主A', 'https://www.douyin.com/user/a', velocity))
+            self.assertEqual((creator['like_threshold'], creator['enabled']), (200, False))
+
+        self.run_with_store(test)
+
+
+class TestMigrateConfigUsers(unittest.TestCase):
+    def test_migrate(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            config_path = os.path.join(tmpdir, 'config.yaml')
+            with open(config_path, 'w', encoding='utf-8') as f:
+                yaml.dump({'douyin_monitor': {'enabled': True, 'users': [
+                    {'sec_user_id': 'a', 'nickname': '博主A', 'like_threshold': 100},
+                    {'sec_user_id': 'b', 'nickname': '配置中的B', 'like_threshold': 200},
+                    {'nickname': '缺少ID'},
+                ]}}, f, allow_unicode=True)
+            service = ConfigService(config_path, debounce_seconds=0)
+            service.load()
+
+            async def run():
+                store = MonitoredCreatorStore(os.path.join(tmpdir, 'monitor.db'))
+                try:
+                    await store.add({'sec_user_id': 'b', 'nickname': '数据库中的B', 'like_threshold': 300})
+                    with mock.patch('utils.config_service.config_service', service):
+                        added = await migrate_config_users(store)
+                        # 迁移后配置中不再有博主列表，再次启动不会重复迁移
+                        again = await migrate_config_users(store)
+                    await service.flush()
+                    return added, again, await store.load_all()
+                finally:
+                    await store.close()
+
+            added, again, creators = asyncio.run(run())
+            with open(config_path, encoding='utf-8') as f:
+                saved = yaml.safe_load(f)
+        self.assertEqual((added, again), (1, 0))
+        # 数据库中已有的博主不被配置文件覆盖
+        self.assertEqual([(c['sec_user_id'], c['nickname']) for c in creators], [('b', '数据库中的B'), ('a', '博主A')])
+        self.assertEqual(saved, {'douyin_monitor': {'enabled': True}})
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,128 @@
+import unittest
+import asyncio
+import os
+import tempfile
+import time
+from unittest import mock
+from utils import outbox as outbox_module
+from utils import feishu_notification
+from utils.outbox import OutboxStore, OutboxWorker, on_delivered
+from utils.feishu_notification import notified_aweme_ids
+
+
+class FakeNotifier:
+    send_concurrency = 2
+
+    def __init__(self, success: bool):
+        self.success = success
+        self.sent = []
+
+    async def deliver(self, message):
+        self.sent.append(message)
+        return (True, '') if self.success else (False, f"error {message['id']}")
+
+
+class TestOutbox(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmpdir.name, 'monitor.db')
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def run_with_store(self, test):
+        async def run():
+            store = OutboxStore(self.path)
+            try:
+                await test(store)
+            finally:
+                await store.close()
+
+        asyncio.run(run())
+
+    async def deliver(self, worker, notifier):
+        with mock.patch.object(feishu_notification, '_feishu_notifier', notifier):
+            return await worker._deliver_due()
+
+    def test_add_idempotent(self):
+        async def test(store):
+            self.assertTrue(await store.add('cookie:xhs:a', 'cookie_expired', {'id': 1}, 3600))
+            # 未投递的通知不会被覆盖
+            self.assertFalse(await store.add('cookie:xhs:a', 'cookie_expired', {'id': 2}, 0))
+            row = (await store.claim_due(10))[0]
+            self.assertEqual(row['payload'], {'id': 1})
+            await store.mark_sent(row['id'])
+            # 投递成功后在间隔内不再写入，超过间隔后重新投递
+            self.assertFalse(await store.add('cookie:xhs:a', 'cookie_expired', {'id': 3}, 3600))
+            self.assertFalse(await store.add('cookie:xhs:a', 'cookie_expired', {'id': 3}))
+            self.assertTrue(await store.add('cookie:xhs:a', 'cookie_expired', {'id': 4}, 0))
+            row = (await store.claim_due(10))[0]
+            self.assertEqual((row['payload'], row['attempts']), ({'id': 4}, 0))
+
+        self.run_with_store(test)
+
+    def test_backoff_and_dead_letter(self):
+        async def test(store):
+            worker = OutboxWorker(store, {'max_attempts': 3, 'retry_base_seconds': 30, 'retry_max_seconds': 40})
+            notifier = FakeNotifier(False)
+            await store.add('video:1', 'video', {'id': 1})
+            delays = []
+            for _ in range(2):
+                self.assertEqual(await self.deliver(worker, notifier), 1)
+                row = (await store.list())[0]
+                delays.append(round(row['next_attempt_at'] - time.time()))
+                self.assertEqual((row['status'], row['last_error']), ('pending', 'error 1'))
+                # 未到重试时间时不会再次领取
+                self.assertEqual(await store.claim_due(10), [])
+                await (await store.connect()).execute('UPDATE outbox SET next_attempt_at = 0')
+            self.assertEqual(delays, [30, 40])
+            await self.deliver(worker, notifier)
+            row = (await store.list())[0]
+            self.assertEqual((row['status'], row['attempts']), ('dead', 3))
+            self.assertEqual(await store.count_by_status(), {'dead': 1})
+
+            self.assertEqual(await store.replay(), 1)
+            self.assertEqual(await store.replay(), 0)
+            row = (await store.claim_due(10))[0]
+            self.assertEqual(row['attempts'], 0)
+
+        self.run_with_store(test)
+
+    def test_delivered_handlers(self):
+        async def test(store):
+            delivered = []
+
+            async def handler(key, message):
+                delivered.extend(notified_aweme_ids(key))
+
+            with mock.patch.dict(outbox_module._delivered_handlers, {}, clear=True):
+                on_delivered('video', handler)
+                on_delivered('digest', handler)
+                await store.add('video:1', 'video', {'id': 1})
+                await store.add('digest:2,3', 'digest', {'id': 2})
+                await store.add('cookie:xhs:a', 'cookie_expired', {'id': 3})
+                worker = OutboxWorker(store, {})
+                self.assertEqual(await self.deliver(worker, FakeNotifier(True)), 3)
+            self.assertEqual(sorted(delivered), ['1', '2', '3'])
+            self.assertEqual(await store.count_by_status(), {'sent': 3})
+
+        self.run_with_store(test)
+
+    def test_failed_delivery_not_dispatched(self):
+        async def test(store):
+            delivered = []
+
+            async def handler(key, message):
+                delivered.append(key)
+
+            with mock.patch.dict(outbox_module._delivered_handlers, {}, clear=True):
+                on_delivered('video', handler)
+                await store.add('video:1', 'video', {'id': 1})
+                await self.deliver(OutboxWorker(store, {}), FakeNotifier(False))
+            self.assertEqual(delivered, [])
+
+        self.run_with_store(test)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,41 @@
+import unittest
+import asyncio
+from utils.page_cache import PageCache, account_key, is_full_page
+
+
+class TestPageCache(unittest.TestCase):
+    def test_account_isolated(self):
+        async def run():
+            cache = PageCache()
+            first = await cache.get(('weibo', account_key('c1'), 'kw', 1), lambda: _value(['a']))
+            second = await cache.get(('weibo', account_key('c2'), 'kw', 1), lambda: _value(['b']))
+            cached = await cache.get(('weibo', account_key('c1'), 'kw', 1), lambda: _value(['c']))
+            return first, second, cached
+
+        self.assertEqual(asyncio.run(run()), (['a'], ['b'], ['a']))
+        self.assertNotIn('c1', account_key('c1'))
+
+    def test_failed_page_not_cached(self):
+        async def run():
+            cache = PageCache()
+            first = await cache.get(('weibo', 'a', 'kw', 1), lambda: _value([]))
+            second = await cache.get(('weibo', 'a', 'kw', 1), lambda: _value(['a']))
+            return first, second
+
+        self.assertEqual(asyncio.run(run()), ([], ['a']))
+
+    def test_is_full_page(self):
+        self.assertTrue(is_full_page(20, 20))
+        self.assertTrue(is_full_page(30, 30, 60, 100))
+        # 请求失败、不满页或已经读到总数时不预取
+        self.assertFalse(is_full_page(0, 20))
+        self.assertFalse(is_full_page(12, 20))
+        self.assertFalse(is_full_page(30, 30, 90, 90))
+
+
+async def _value(value):
+    return value
+
+
+if __name__ == '__main__':
+    unittest.main()
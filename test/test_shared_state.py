@@ -0,0 +1,124 @@
+import unittest
+import asyncio
+import os
+import tempfile
+from unittest import mock
+from utils.shared_state import SharedStateStore, is_multiprocess
+from utils.leader import LeaderElection
+from utils.account_pool import AccountPool
+
+
+class TestSharedState(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmpdir.name, 'state.db')
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def test_get_set(self):
+        async def run():
+            store = SharedStateStore(self.path)
+            self.assertEqual(await store.get('missing', {}), {})
+            await store.set('monitor.last_sweep', {'running': True})
+            value = await store.get('monitor.last_sweep')
+            await store.close()
+            return value
+
+        self.assertEqual(asyncio.run(run()), {'running': True})
+
+    def test_concurrent_update(self):
+        # 两个连接模拟两个进程同时修改同一个键
+        async def run():
+            stores = [SharedStateStore(self.path), SharedStateStore(self.path)]
+
+            async def increment(store):
+                for _ in range(20):
+                    await store.update('counter', lambda value: value + 1, 0)
+
+            await asyncio.gather(*[increment(store) for store in stores])
+            value = await stores[0].get('counter')
+            for store in stores:
+                await store.close()
+            return value
+
+        self.assertEqual(asyncio.run(run()), 40)
+
+    def test_is_multiprocess(self):
+        with mock.patch.dict(os.environ, {'WEB_CONCURRENCY': '', 'SERVER_SOFTWARE': ''}):
+            self.assertFalse(is_multiprocess({}))
+            self.assertTrue(is_multiprocess({'count': 2}))
+        with mock.patch.dict(os.environ, {'WEB_CONCURRENCY': '4'}):
+            self.assertTrue(is_multiprocess({}))
+        with mock.patch.dict(os.environ, {'WEB_CONCURRENCY': '', 'SERVER_SOFTWARE': 'gunicorn/21.2.0'}):
+            self.assertTrue(is_multiprocess({}))
+
+
+class TestLeaderElection(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.lock_file = os.path.join(self.tmpdir.name, 'leader.lock')
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def test_single_leader_and_takeover(self):
+        async def run():
+            elected = []
+
+            def on_elected(name):
+                async def callback():
+                    elected.append(name)
+                return callback
+
+            # 文件锁按打开的文件区分，同一进程内的两个选举也互斥
+            first = LeaderElection(self.lock_file, retry_seconds=0.05)
+            second = LeaderElection(self.lock_file, retry_seconds=0.05)
+            await first.start(on_elected('first'))
+            await second.start(on_elected('second'))
+            await asyncio.sleep(0.2)
+            before = (list(elected), first.is_leader, second.is_leader)
+            # 主进程退出后另一个进程接管
+            await first.stop()
+            await asyncio.sleep(0.2)
+            after = (list(elected), first.is_leader, second.is_leader)
+            await second.stop()
+            return before, after
+
+        before, after = asyncio.run(run())
+        self.assertEqual(before, (['first'], True, False))
+        self.assertEqual(after, (['first', 'second'], False, True))
+
+
+class FakeAccountStore:
+    def __init__(self):
+        self.accounts = [{'id': 'a', 'cookie': 'c1', 'expired': 0}]
+        self.loads = 0
+
+    async def load(self):
+        self.loads += 1
+        return self.accounts
+
+
+class TestAccountPoolRefresh(unittest.TestCase):
+    def test_snapshot_expires(self):
+        async def run():
+            store = FakeAccountStore()
+            pool = AccountPool('test_refresh', store)
+            pool.configure({'refresh_seconds': 60})
+            await pool.load()
+            # 其他进程修改了账号
+            store.accounts = [{'id': 'a', 'cookie': 'c2', 'expired': 0}]
+            cached = await pool.load()
+            pool._refreshed_at -= 61
+            refreshed = await pool.load()
+            return cached, refreshed, store.loads
+
+        cached, refreshed, loads = asyncio.run(run())
+        self.assertEqual(cached[0]['cookie'], 'c1')
+        self.assertEqual(refreshed[0]['cookie'], 'c2')
+        self.assertEqual(loads, 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
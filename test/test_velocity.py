@@ -0,0 +1,84 @@
+import unittest
+import asyncio
+import os
+import tempfile
+from utils.video_stats import VideoStatsStore
+from utils.velocity import VelocityRule, detect_hot_videos
+
+
+def video(aweme_id, create_time, digg_count):
+    return {'aweme_id': aweme_id, 'create_time': create_time, 'statistics': {'digg_count': digg_count}}
+
+
+class TestVelocitySnapshot(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmpdir.name, 'stats.db')
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def snapshot(self):
+        async def run():
+            store = VideoStatsStore(self.path)
+            try:
+                # 每个作品三个数据点，间隔一小时
+                for ts, a_likes, b_likes in ((3600, 100, 50), (7200, 1100, 150), (10800, 3100, 250)):
+                    await store.record('u1', [video('a', 0, a_likes), video('b', 0, b_likes)], ts)
+                # 只有一个数据点的作品按发布以来的平均增速估算
+                await store.record('u1', [video('c', 9000, 900)], 10800)
+                await store.record('u2', [video('d', 0, 10)], 10800)
+                # 发布时间早于统计范围的作品不参与计算
+                await store.record('u1', [video('old', -100, 99999)], 10800)
+                return {row['aweme_id']: row for row in await store.velocity_snapshot(0)}
+            finally:
+                await store.close()
+
+        return asyncio.run(run())
+
+    def test_velocity_snapshot(self):
+        rows = self.snapshot()
+        self.assertEqual(set(rows), {'a', 'b', 'c', 'd'})
+        self.assertEqual((rows['a']['ts'], rows['a']['digg_count']), (10800, 3100))
+        self.assertAlmostEqual(rows['a']['likes_per_hour'], 2000)
+        self.assertAlmostEqual(rows['a']['acceleration'], 1000)
+        self.assertAlmostEqual(rows['b']['likes_per_hour'], 100)
+        self.assertAlmostEqual(rows['b']['acceleration'], 0)
+        self.assertAlmostEqual(rows['c']['likes_per_hour'], 1800)
+        self.assertIsNone(rows['c']['acceleration'])
+        # 分位在同一博主的作品中计算
+        self.assertEqual([rows[id]['percentile'] for id in 'bca'], [0.0, 0.5, 1.0])
+        self.assertEqual((rows['a']['baseline_size'], rows['d']['baseline_size']), (3, 1))
+        self.assertEqual(rows['d']['percentile'], 0.0)
+
+    def test_detect_hot_videos(self):
+        rows = list(self.snapshot().values())
+        rules = {'u1': VelocityRule({'likes_per_hour': 1000}), 'u2': VelocityRule({'likes_per_hour': 0})}
+        hits = detect_hot_videos(rows, rules, 0, 1)
+        # d 的点赞数低于 min_likes
+        self.assertEqual([hit['aweme_id'] for hit in hits], ['a', 'c'])
+        self.assertGreater(hits[0]['predicted_heat'], hits[1]['predicted_heat'])
+        # 加速度下限排除只有一个数据点的作品，观察时间之前的作品不检测
+        rules['u1'] = VelocityRule({'likes_per_hour': 1000, 'min_acceleration': 500})
+        self.assertEqual([hit['aweme_id'] for hit in detect_hot_videos(rows, rules, 0, 1)], ['a'])
+        self.assertEqual(detect_hot_videos(rows, rules, 10801, 1), [])
+        # 作品数达到 min_baseline 时按分位判断
+        rules['u1'] = VelocityRule({'likes_per_hour': 1000, 'min_baseline': 3, 'min_percentile': 0.9})
+        self.assertEqual([hit['aweme_id'] for hit in detect_hot_videos(rows, rules, 0, 1)], ['a'])
+
+
+class TestVelocityRule(unittest.TestCase):
+    def test_for_user(self):
+        defaults = {'enabled': False, 'likes_per_hour': 500, 'min_likes': 50}
+        self.assertIsNone(VelocityRule.for_user(defaults, {}))
+        # 博主规则覆盖全局默认值，未覆盖的字段使用默认值
+        rule = VelocityRule.for_user(defaults, {'velocity': {'likes_per_hour': 2000}})
+        self.assertEqual((rule.likes_per_hour, rule.min_likes), (2000, 50))
+
+        defaults['enabled'] = True
+        self.assertEqual(VelocityRule.for_user(defaults, {}).likes_per_hour, 500)
+        self.assertIsNone(VelocityRule.for_user(defaults, {'velocity': {'enabled': False}}))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,54 @@
+import unittest
+import asyncio
+import os
+import tempfile
+from utils.video_stats import VideoStatsStore
+
+# 整点时间，按小时分桶时桶的边界与数据点对齐
+BASE = 1_699_999_200
+
+
+class TestVideoStatsHistory(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmpdir.name, 'stats.db')
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def history(self, **kwargs):
+        async def run():
+            store = VideoStatsStore(self.path)
+            try:
+                # 每 10 分钟一个数据点，共 2 小时
+                for index in range(12):
+                    await store.record('u1', [{'aweme_id': 'a', 'create_time': 0,
+                                               'statistics': {'digg_count': index, 'comment_count': index * 2}}],
+                                       BASE + index * 600)
+                await store.record('u1', [{'aweme_id': 'b', 'statistics': {'digg_count': 99}}], BASE)
+                return await store.history('a', **kwargs)
+            finally:
+                await store.close()
+
+        return asyncio.run(run())
+
+    def test_raw_points(self):
+        points = self.history()
+        self.assertEqual([point['ts'] - BASE for point in points], [index * 600 for index in range(12)])
+        self.assertEqual((points[3]['digg_count'], points[3]['comment_count']), (3, 6))
+
+    def test_range_and_limit(self):
+        self.assertEqual([point['ts'] for point in self.history(start=BASE + 1200, end=BASE + 3000)],
+                         [BASE + 1200, BASE + 1800, BASE + 2400, BASE + 3000])
+        # 超出条数时返回最近的数据点，仍按时间升序
+        self.assertEqual([point['ts'] - BASE for point in self.history(limit=2)], [6000, 6600])
+
+    def test_bucket(self):
+        # 每小时一个桶，取桶内最后一个数据点
+        points = self.history(bucket=3600)
+        self.assertEqual([(point['ts'] - BASE, point['digg_count']) for point in points], [(3000, 5), (6600, 11)])
+        self.assertEqual([point['ts'] - BASE for point in self.history(bucket=3600, limit=1)], [6600])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,51 @@
+import unittest
+import asyncio
+import os
+import tempfile
+from utils.watermark_store import WatermarkStore
+from utils.video_stats import VideoStatsStore
+
+
+class TestWatermarkStore(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmpdir.name, 'monitor.db')
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def test_update(self):
+        async def run():
+            store = WatermarkStore(self.path)
+            try:
+                self.assertEqual(await store.get('u1'), {'newest_create_time': 0, 'tracked': {}})
+                await store.update('u1', 300, {'a': 100, 'b': 200, 'c': 300}, 150)
+                await store.update('u2', 500, {'d': 500}, 0)
+                first = await store.get('u1')
+                # 再次更新时替换跟踪的作品，窗口外的作品不再跟踪
+                await store.update('u1', 400, {'c': 300, 'e': 400}, 350)
+                return first, await store.get('u1'), await store.get('u2')
+            finally:
+                await store.close()
+
+        first, second, other = asyncio.run(run())
+        self.assertEqual(first, {'newest_create_time': 300, 'tracked': {'b': 200, 'c': 300}})
+        self.assertEqual(second, {'newest_create_time': 400, 'tracked': {'e': 400}})
+        self.assertEqual(other, {'newest_create_time': 500, 'tracked': {'d': 500}})
+
+    def test_latest_digg_counts(self):
+        async def run():
+            store = VideoStatsStore(self.path)
+            try:
+                await store.record('u1', [{'aweme_id': 'a', 'statistics': {'digg_count': 10}}], 100)
+                await store.record('u1', [{'aweme_id': 'a', 'statistics': {'digg_count': 30}},
+                                          {'aweme_id': 'b', 'statistics': {'digg_count': 5}}], 200)
+                return await store.latest_digg_counts(['a', 'b', 'c'])
+            finally:
+                await store.close()
+
+        self.assertEqual(asyncio.run(run()), {'a': 30, 'b': 5})
+
+
+if __name__ == '__main__':
+    unittest.main()
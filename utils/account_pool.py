@@ -0,0 +1,258 @@
+"""
+账号池
+包装各平台的账号存储，在内存中缓存账号快照；请求检测到 Cookie 过期时自动标记账号过期，
+短时间内多次鉴权失败时临时隔离账号，后续请求不再优先尝试失效的账号；
+多进程部署时账号变更版本和隔离状态保存在共享状态中，各进程定期同步
+"""
+import asyncio
+import time
+from typing import Any, Dict, List, Optional
+from lib.logger import logger
+from utils.metrics import registry
+from utils.tracing import traced
+from utils.shared_state import shared_state
+
+# 视为鉴权失败的 HTTP 状态码
+AUTH_FAILURE_STATUS = (401, 403)
+
+_pools: Dict[str, 'AccountPool'] = {}
+_config: Dict[str, Any] = {}
+
+
+class AccountPool:
+    """账号池"""
+
+    def __init__(self, platform: str, store: Any):
+        """
+        :param platform: 平台名称
+        :param store: 账号存储，提供 load、save、expire
+        """
+        self.platform = platform
+        self.store = store
+        self.configure(_config)
+        # 账号快照整体替换，读取方拿到的列表不会被修改
+        self._snapshot: Optional[List[Dict[str, Any]]] = None
+        self._by_cookie: Dict[str, str] = {}
+        self._refresh_lock = asyncio.Lock()
+        self._failures: Dict[str, List[float]] = {}
+        self._quarantine: Dict[str, float] = {}
+        self._version = 0
+        self._synced_at = 0.0
+        self._refreshed_at = 0.0
+        _pools[platform] = self
+
+    def configure(self, config: Dict[str, Any]) -> None:
+        """
+        :param config: account_pool 配置
+        """
+        self.failure_threshold = config.get('failure_threshold', 3)
+        self.failure_window_seconds = config.get('failure_window_minutes', 10) * 60
+        self.quarantine_seconds = config.get('quarantine_minutes', 30) * 60
+        self.sync_seconds = config.get('sync_seconds', 2)
+        # 账号快照的有效期，过期后重新从存储加载，未启用共享状态时也能读到其他进程或外部修改的账号
+        self.refresh_seconds = config.get('refresh_seconds', 60)
+
+    def __getattr__(self, name: str) -> Any:
+        # 其他方法直接交给账号存储
+        return getattr(self.store, name)
+
+    async def _refresh(self) -> List[Dict[str, Any]]:
+        async with self._refresh_lock:
+            snapshot = [dict(account) for account in await self.store.load()]
+            self._by_cookie = {account.get('cookie', ''): account.get('id', '') for account in snapshot}
+            self._snapshot = snapshot
+            self._refreshed_at = time.time()
+        return snapshot
+
+    @property
+    def _state_key(self) -> str:
+        return f'accounts:{self.platform}'
+
+    async def _sync(self) -> None:
+        """多进程部署时，按间隔同步其他进程的账号变更和隔离状态"""
+        if not shared_state.enabled or time.time() - self._synced_at < self.sync_seconds:
+            return
+        self._synced_at = time.time()
+        state = await shared_state.get(self._state_key, {})
+        self._quarantine = state.get('quarantine', {})
+        if state.get('version', 0) != self._version:
+            self._version = state.get('version', 0)
+            if self._snapshot is not None:
+                await self._refresh()
+
+    async def _update_shared(self, mutator) -> None:
+        """
+        修改共享状态并同步到本进程
+        :param mutator: 参数和返回值为 version、failures、quarantine 组成的状态
+        """
+        if not shared_state.enabled:
+            return
+        state = await shared_state.update(self._state_key, mutator, {})
+        self._version = state.get('version', 0)
+        self._quarantine = state.get('quarantine', {})
+        self._synced_at = time.time()
+
+    def _changed(self, id: str):
+        """账号被修改：版本加一，清除该账号的失败记录和隔离"""
+        def mutate(state: Dict[str, Any]) -> Dict[str, Any]:
+            state['version'] = state.get('version', 0) + 1
+            state.setdefault('failures', {}).pop(id, None)
+            state.setdefault('quarantine', {}).pop(id, None)
+            return state
+        return mutate
+
+    @traced('accounts.load')
+    async def load(self) -> List[Dict[str, Any]]:
+        """
+        获取账号列表，隔离中的账号 expired 为 1 并带有 quarantined_until
+        :return: 账号列表的副本
+        """
+        await self._sync()
+        snapshot = self._snapshot
+        if snapshot is None or 0 < self.refresh_seconds <= time.time() - self._refreshed_at:
+            snapshot = await self._refresh()
+        now = time.time()
+        result = []
+        for account in snapshot:
+            account = dict(account)
+            until = self._quarantine.get(account.get('id', ''), 0)
+            if until > now and account.get('expired', 0) != 1:
+                account['expired'] = 1
+                account['quarantined_until'] = int(until)
+            result.append(account)
+        return result
+
+    async def save(self, id: str, cookie: str, expired: int) -> None:
+        await self.store.save(id, cookie, expired)
+        self._quarantine.pop(id, None)
+        self._failures.pop(id, None)
+        await self._update_shared(self._changed(id))
+        await self._refresh()
+
+    async def expire(self, id: str) -> None:
+        await self.store.expire(id)
+        await self._update_shared(self._changed(id))
+        await self._refresh()
+
+    async def _resolve(self, id: str = '', cookie: str = '') -> Optional[str]:
+        if self._snapshot is None:
+            await self._refresh()
+        if cookie and cookie in self._by_cookie:
+            return self._by_cookie[cookie]
+        if id and any(account.get('id') == id for account in self._snapshot):
+            return id
+        return None
+
+    async def report_expired(self, id: str = '', cookie: str = '') -> Optional[str]:
+        """
+        请求检测到 Cookie 过期，标记账号过期
+        :param id: 账号ID
+        :param cookie: 请求使用的 Cookie，优先按 Cookie 查找账号
+        :return: 标记过期的账号ID，找不到账号时返回 None
+        """
+        account_id = await self._resolve(id, cookie)
+        if account_id is None:
+            return None
+        if any(account.get('id') == account_id and account.get('expired', 0) == 1 for account in self._snapshot):
+            return account_id
+        await self.expire(account_id)
+        self._quarantine.pop(account_id, None)
+        self._failures.pop(account_id, None)
+        logger.warning(f'{self.platform} 账号 {account_id} Cookie已过期，已自动标记为过期')
+        return account_id
+
+    async def report_failure(self, id: str = '', cookie: str = '') -> Optional[str]:
+        """
+        请求鉴权失败，窗口内失败次数达到阈值时临时隔离账号
+        :param id: 账号ID
+        :param cookie: 请求使用的 Cookie，优先按 Cookie 查找账号
+        :return: 账号ID，找不到账号时返回 None
+        """
+        account_id = await self._resolve(id, cookie)
+        if account_id is None:
+            return None
+        now = time.time()
+        if shared_state.enabled:
+            # 各进程的失败次数累计在一起
+            result: Dict[str, Any] = {}
+
+            def mutate(state: Dict[str, Any]) -> Dict[str, Any]:
+                failures = state.get('failures', {})
+                quarantine = {id: until for id, until in state.get('quarantine', {}).items() if until > now}
+                result['failures'] = self._count_failure(failures, quarantine, account_id, now)
+                state.update(failures=failures, quarantine=quarantine)
+                return state
+            await self._update_shared(mutate)
+            failures = result['failures']
+        else:
+            failures = self._count_failure(self._failures, self._quarantine, account_id, now)
+        if failures is None:
+            return account_id
+        logger.warning(f'{self.platform} 账号 {account_id} {self.failure_window_seconds // 60} 分钟内鉴权失败 '
+                       f'{len(failures)} 次，隔离 {self.quarantine_seconds // 60} 分钟')
+        return account_id
+
+    def _count_failure(self, failures: Dict[str, List[float]], quarantine: Dict[str, float], account_id: str,
+                       now: float) -> Optional[List[float]]:
+        """
+        记录一次鉴权失败
+        :return: 窗口内失败次数达到阈值时隔离账号并返回失败时间，否则返回 None
+        """
+        recent = [ts for ts in failures.get(account_id, []) if ts > now - self.failure_window_seconds]
+        recent.append(now)
+        if len(recent) < self.failure_threshold:
+            failures[account_id] = recent
+            return None
+        failures.pop(account_id, None)
+        quarantine[account_id] = now + self.quarantine_seconds
+        return recent
+
+    def get_status(self) -> Dict[str, Any]:
+        """账号池状态：隔离中的账号及解除时间"""
+        now = time.time()
+        return {
+            'platform': self.platform,
+            'accounts': len(self._snapshot or []),
+            'quarantined': {id: int(until) for id, until in self._quarantine.items() if until > now},
+        }
+
+
+def get_account_pool(platform: str) -> Optional[AccountPool]:
+    """
+    获取平台的账号池
+    :param platform: 平台名称
+    """
+    return _pools.get(platform)
+
+
+def account_id_of(platform: str, cookie: str) -> str:
+    """
+    按 Cookie 查找账号ID，只查内存快照，不访问存储
+    :param platform: 平台名称
+    :param cookie: 请求使用的 Cookie
+    :return: 账号ID，找不到时返回空字符串
+    """
+    pool = _pools.get(platform)
+    if pool is None or not cookie:
+        return ''
+    return pool._by_cookie.get(cookie, '')
+
+
+def configure_account_pools(config: Dict[str, Any]) -> None:
+    """
+    设置所有账号池
+    :param config: account_pool 配置
+    """
+    global _config
+    _config = config
+    for pool in _pools.values():
+        pool.configure(config)
+
+
+def _quarantined_samples():
+    now = time.time()
+    for platform, pool in _pools.items():
+        yield (platform,), sum(1 for until in pool._quarantine.values() if until > now)
+
+
+registry.callback('account_quarantined', '隔离中的账号数', 'gauge', ('platform',), _quarantined_samples)
@@ -0,0 +1,256 @@
+"""
+配置服务
+在内存中保存校验过的配置快照，修改时复制后整体替换，异步防抖写回文件；
+配置文件被外部修改时重新加载，并把变化的配置项通知给订阅者。
+多进程部署时各进程的快照互不可见，修改在文件锁内重新读取文件后立即写回，不使用防抖，避免覆盖其他进程的修改
+"""
+import asyncio
+import copy
+import fcntl
+import os
+import time
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+import yaml
+from lib.logger import logger
+
+Subscriber = Callable[[Any, Any], Awaitable[None]]
+
+
+class ConfigService:
+    """配置服务"""
+
+    def __init__(self, path: str = '', debounce_seconds: float = 1.0):
+        """
+        :param path: 配置文件路径，为空时使用环境变量 FILE 或 config/config.yaml
+        :param debounce_seconds: 写回文件的防抖时间，期间的多次修改只写一次
+        """
+        self.path = path or os.getenv("FILE", 'config/config.yaml')
+        self.debounce_seconds = debounce_seconds
+        # 快照只整体替换，不在原地修改，读取方拿到的配置不会被并发修改
+        self._snapshot: Optional[Dict[str, Any]] = None
+        self._lock = asyncio.Lock()
+        self._subscribers: List[Tuple[Tuple[str, ...], Subscriber]] = []
+        self._validators: List[Callable[[Dict[str, Any]], None]] = []
+        self._dirty_at = 0.0
+        self._persist_task: Optional[asyncio.Task] = None
+        self._flush_event = asyncio.Event()
+        self._watch_task: Optional[asyncio.Task] = None
+        self._stop_event: Optional[asyncio.Event] = None
+        # 最近一次写入的文件内容，用于忽略自身写入触发的文件变化
+        self._last_written: Optional[str] = None
+        # 多进程部署时为 True
+        self.multiprocess = False
+
+    def load(self, path: str = '') -> Dict[str, Any]:
+        """
+        从文件加载配置，不通知订阅者，用于启动时初始化
+        :param path: 配置文件路径，为空时使用当前路径
+        :return: 配置快照
+        """
+        if path:
+            self.path = path
+        with open(self.path, 'r', encoding='utf-8') as f:
+            content = f.read()
+        config = yaml.safe_load(content) or {}
+        self.validate(config)
+        self._snapshot = config
+        self._last_written = content
+        return config
+
+    @property
+    def snapshot(self) -> Dict[str, Any]:
+        """当前配置快照，只读"""
+        if self._snapshot is None:
+            self.load()
+        return self._snapshot
+
+    def get(self, path: str, default: Any = None) -> Any:
+        """
+        按路径读取配置项
+        :param path: 配置项路径，多级用 . 分隔
+        :param default: 配置项不存在时的默认值
+        """
+        value = _get_path(self.snapshot, tuple(path.split('.')))
+        return default if value is None else value
+
+    def add_validator(self, validator: Callable[[Dict[str, Any]], None]) -> None:
+        """
+        注册配置校验函数，校验失败时抛出 ValueError
+        :param validator: 校验函数
+        """
+        self._validators.append(validator)
+
+    def validate(self, config: Any) -> None:
+        if not isinstance(config, dict):
+            raise ValueError('配置文件内容必须是字典')
+        for validator in self._validators:
+            validator(config)
+
+    def subscribe(self, path: str, callback: Subscriber) -> None:
+        """
+        订阅配置项的变化
+        :param path: 配置项路径，多级用 . 分隔
+        :param callback: 回调函数，参数为变化前后的配置项
+        """
+        self._subscribers.append((tuple(path.split('.')), callback))
+
+    async def update(self, mutator: Callable[[Dict[str, Any]], None]) -> Dict[str, Any]:
+        """
+        修改配置：复制当前快照交给 mutator 修改，校验通过后替换快照、通知订阅者并稍后写回文件
+        :param mutator: 修改函数，可抛出 ValueError 拒绝修改
+        :return: 新的配置快照
+        """
+        async with self._lock:
+            old = self.snapshot
+            if self.multiprocess:
+                new, content = await asyncio.to_thread(self._update_file, mutator)
+                self._snapshot = new
+                self._last_written = content
+            else:
+                new = copy.deepcopy(old)
+                mutator(new)
+                self.validate(new)
+                self._snapshot = new
+                self._schedule_persist()
+        await self._publish(old, new)
+        return new
+
+    def _update_file(self, mutator: Callable[[Dict[str, Any]], None]) -> Tuple[Dict[str, Any], str]:
+        """
+        在文件锁内读取配置文件、修改并写回，其他进程的修改不会被覆盖
+        :param mutator: 修改函数
+        :return: (新的配置, 写入的文件内容)
+        """
+        with open(self.path + '.lock', 'a') as lock_file:
+            fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX)
+            config = yaml.safe_load(_read_file(self.path)) or {}
+            mutator(config)
+            self.validate(config)
+            content = yaml.dump(config, default_flow_style=False, allow_unicode=True)
+            _write_file(self.path, content)
+        logger.info('配置文件已保存')
+        return config, content
+
+    async def _publish(self, old: Dict[str, Any], new: Dict[str, Any]) -> None:
+        for path, callback in self._subscribers:
+            old_value, new_value = _get_path(old, path), _get_path(new, path)
+            if old_value == new_value:
+                continue
+            try:
+                await callback(old_value, new_value)
+            except Exception as e:
+                logger.error(f"处理配置项 {'.'.join(path)} 的变化时发生异常: {e}")
+
+    def _schedule_persist(self) -> None:
+        self._dirty_at = time.monotonic()
+        if self._persist_task is None or self._persist_task.done():
+            self._persist_task = asyncio.create_task(self._persist_later())
+
+    async def _persist_later(self) -> None:
+        while True:
+            delay = self._dirty_at + self.debounce_seconds - time.monotonic()
+            if delay > 0 and not self._flush_event.is_set():
+                try:
+                    await asyncio.wait_for(self._flush_event.wait(), timeout=delay)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+            snapshot = self._snapshot
+            await self._write(snapshot)
+            # 写入期间有新的修改时继续等待防抖后写入
+            if self._snapshot is snapshot:
+                return
+
+    async def _write(self, config: Dict[str, Any]) -> None:
+        content = yaml.dump(config, default_flow_style=False, allow_unicode=True)
+        self._last_written = content
+        try:
+            await asyncio.to_thread(_write_file, self.path, content)
+            logger.info('配置文件已保存')
+        except Exception as e:
+            logger.error(f'保存配置文件失败: {e}')
+
+    async def flush(self) -> None:
+        """立即写回尚未保存的修改"""
+        task = self._persist_task
+        if task is not None and not task.done():
+            self._flush_event.set()
+            await task
+        self._flush_event.clear()
+
+    def start(self) -> None:
+        """开始监听配置文件的外部修改"""
+        if self._watch_task is None:
+            self._stop_event = asyncio.Event()
+            self._watch_task = asyncio.create_task(self._watch())
+
+    async def stop(self) -> None:
+        """停止监听并写回尚未保存的修改"""
+        if self._watch_task is not None:
+            self._stop_event.set()
+            self._watch_task.cancel()
+            await asyncio.gather(self._watch_task, return_exceptions=True)
+            self._watch_task = None
+        await self.flush()
+
+    async def _watch(self) -> None:
+        from watchfiles import awatch
+        path = os.path.abspath(self.path)
+        # 写回文件时会替换文件，因此监听所在目录
+        async for _ in awatch(os.path.dirname(path), stop_event=self._stop_event,
+                              watch_filter=lambda change, changed_path: os.path.abspath(changed_path) == path):
+            try:
+                await self.reload()
+            except Exception as e:
+                logger.error(f'重新加载配置文件失败，继续使用当前配置: {e}')
+
+    async def reload(self) -> bool:
+        """
+        从文件重新加载配置，内容与最近一次写入相同时忽略
+        :return: 配置是否变化
+        """
+        content = await asyncio.to_thread(_read_file, self.path)
+        if content == self._last_written:
+            return False
+        config = yaml.safe_load(content) or {}
+        self.validate(config)
+        async with self._lock:
+            old = self.snapshot
+            self._snapshot = config
+            self._last_written = content
+        logger.info('配置文件已被外部修改，重新加载')
+        await self._publish(old, config)
+        return True
+
+
+def _get_path(data: Any, path: Tuple[str, ...]) -> Any:
+    for key in path:
+        if not isinstance(data, dict):
+            return None
+        data = data.get(key)
+    return data
+
+
+def _read_file(path: str) -> str:
+    with open(path, 'r', encoding='utf-8') as f:
+        return f.read()
+
+
+def _write_file(path: str, content: str) -> None:
+    # 先写入临时文件，然后原子性替换
+    temp_path = path + '.tmp'
+    try:
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+            f.write(content)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temp_path, path)
+    except Exception:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        raise
+
+
+# 全局配置服务
+config_service = ConfigService()
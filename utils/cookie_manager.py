@@ -3,24 +3,124 @@ Cookie管理模块
 用于处理Cookie过期检测和通知
 """
 
-from typing import Optional, Dict, Any, Tuple
+import re
+from typing import Optional, Dict, Any, Iterable, Tuple
 from lib.logger import logger
+from utils.account_pool import get_account_pool
 from utils.feishu_notification import send_cookie_expired_notification
-import json
-import re
+
+
+class ExpiryRule:
+    """
+    平台的 Cookie 过期判定规则
+    只检查声明的错误码字段和错误信息字段，关键词预编译为一个正则，一次扫描完成匹配
+    """
+
+    def __init__(self, code_paths: Iterable[str], codes: Iterable[Any],
+                 message_paths: Iterable[str], keywords: Iterable[str]):
+        """
+        :param code_paths: 错误码字段路径，多级字段用 . 分隔
+        :param codes: 表示登录失效的错误码
+        :param message_paths: 错误信息字段路径，字段为列表时拼接后匹配
+        :param keywords: 表示登录失效的关键词，不区分大小写
+        """
+        self.code_paths = [tuple(path.split('.')) for path in code_paths]
+        self.codes = set(codes)
+        self.message_paths = [tuple(path.split('.')) for path in message_paths]
+        keywords = list(keywords)
+        self.pattern = re.compile('|'.join(re.escape(keyword) for keyword in keywords), re.IGNORECASE) \
+            if keywords else None
+
+    def match(self, response: Any) -> bool:
+        """
+        判断响应是否表示 Cookie 过期
+        :param response: API响应数据
+        """
+        if not isinstance(response, dict):
+            return False
+        for path in self.code_paths:
+            if _get_path(response, path) in self.codes:
+                return True
+        if self.pattern is None:
+            return False
+        for path in self.message_paths:
+            value = _get_path(response, path)
+            if value is None:
+                continue
+            if isinstance(value, list):
+                value = ' '.join(str(item) for item in value)
+            if self.pattern.search(str(value)):
+                return True
+        return False
+
+
+def _get_path(data: Dict[str, Any], path: Tuple[str, ...]) -> Any:
+    value: Any = data
+    for key in path:
+        if not isinstance(value, dict):
+            return None
+        value = value.get(key)
+    return value
+
+
+# 未声明规则的平台使用的通用规则
+DEFAULT_RULE = ExpiryRule(
+    code_paths=['code', 'status', 'errcode'],
+    codes=[401, 403, 2100, -101, 10010],  # 常见的未授权/登录错误码
+    message_paths=['message', 'msg', 'error'],
+    keywords=['登录', 'login', 'cookie', 'expired', '过期', '失效', 'unauthorized', '未授权', 'authentication', '认证'],
+)
+
+PLATFORM_RULES: Dict[str, ExpiryRule] = {
+    # -101: 账号未登录
+    'bilibili': ExpiryRule(['code'], [-101], ['message'], ['未登录']),
+    # -100: 登录已过期
+    'xhs': ExpiryRule(['code'], [-100], ['msg'], ['登录已过期', '未登录']),
+    # ok=-100: 需要登录
+    'weibo': ExpiryRule(['ok'], [-100], ['msg'], ['请先登录', '未登录']),
+    # status_code=8: 用户未登录
+    'douyin': ExpiryRule(['status_code'], [8], ['status_msg'], ['未登录', '登录过期']),
+    # ret: ["FAIL_SYS_SESSION_EXPIRED::Session过期"]
+    'taobao': ExpiryRule([], [], ['ret'], ['SESSION_EXPIRED', 'TOKEN_EXOIRED', 'TOKEN_EXPIRED', '令牌过期']),
+}
+
+
+def get_expiry_rule(platform: str) -> ExpiryRule:
+    """
+    获取平台的过期判定规则
+    :param platform: 平台名称
+    :return: 规则，未声明时返回通用规则
+    """
+    return PLATFORM_RULES.get(platform, DEFAULT_RULE)
+
+
+# 同一账号的过期提醒间隔，避免每次请求失败都发送通知，由通知的幂等键 cookie:{platform}:{account_id} 保证
+_alert_cooldown_seconds = 3600
+
+
+def configure_cookie_alert(config: Dict[str, Any]) -> None:
+    """
+    设置过期提醒配置
+    :param config: cookie_alert 配置，cooldown_minutes 为同一账号的提醒间隔
+    """
+    global _alert_cooldown_seconds
+    _alert_cooldown_seconds = config.get('cooldown_minutes', 60) * 60
+
 
 async def check_cookie_expired(
     response: Dict[str, Any],
     platform: str,
-    account_id: str,
-    custom_expired_check: Optional[callable] = None
+    account_id: str = '',
+    custom_expired_check: Optional[callable] = None,
+    cookie: str = ''
 ) -> Tuple[bool, bool]:
     """
-    检查Cookie是否过期并发送通知
+    检查Cookie是否过期，过期时标记账号过期并发送通知
     :param response: API响应数据
     :param platform: 平台名称
     :param account_id: 账号ID
     :param custom_expired_check: 自定义过期检查函数
+    :param cookie: 请求使用的Cookie，用于在账号池中查找账号
     :return: (是否过期, 是否发送通知成功)
     """
     is_expired = False
@@ -31,12 +131,15 @@ async def check_cookie_expired(
         if custom_expired_check:
             is_expired = custom_expired_check(response)
         else:
-            # 默认过期检查逻辑
-            is_expired = _default_cookie_expired_check(response)
+            is_expired = get_expiry_rule(platform).match(response)
 
         if is_expired:
-            # 发送飞书通知
-            notification_sent = await send_cookie_expired_notification(platform, account_id)
+            pool = get_account_pool(platform)
+            if pool is not None:
+                account_id = await pool.report_expired(account_id, cookie) or account_id
+            account_id = account_id or 'unknown'
+            # 发送飞书通知，提醒间隔内重复的通知在写入时跳过
+            notification_sent = await send_cookie_expired_notification(platform, account_id, _alert_cooldown_seconds)
             if notification_sent:
                 logger.info(f"{platform} 账号 {account_id} Cookie过期通知发送成功")
             else:
@@ -49,33 +152,26 @@ async def check_cookie_expired(
 
     return is_expired, notification_sent
 
+
+async def report_auth_failure(platform: str, cookie: str) -> None:
+    """
+    请求鉴权失败（HTTP 401/403），记入账号池的失败次数
+    :param platform: 平台名称
+    :param cookie: 请求使用的Cookie
+    """
+    pool = get_account_pool(platform)
+    if pool is None or not cookie:
+        return
+    try:
+        await pool.report_failure(cookie=cookie)
+    except Exception as e:
+        logger.error(f"记录 {platform} 账号鉴权失败时发生错误: {str(e)}")
+
+
 def _default_cookie_expired_check(response: Dict[str, Any]) -> bool:
     """
     默认的Cookie过期检查逻辑
     :param response: API响应数据
     :return: 是否过期
     """
-    # 转换响应为字符串以进行通用检查
-    response_str = str(response).lower()
-    
-    # 常见的过期关键词
-    expired_keywords = [
-        'login', '登录', 'cookie', 'expired', '过期',
-        'invalid', '失效', 'unauthorized', '未授权',
-        'authentication', '认证', 'validate', '验证'
-    ]
-    
-    # 检查状态码
-    if isinstance(response, dict):
-        # 检查常见的错误码
-        code = response.get('code', response.get('status', response.get('errcode', None)))
-        if code in [401, 403, 2100, -101, 10010]:  # 常见的未授权/登录错误码
-            return True
-            
-        # 检查错误信息
-        message = str(response.get('message', response.get('msg', response.get('error', ''))))
-        if any(keyword in message.lower() for keyword in expired_keywords):
-            return True
-            
-    # 通用文本检查
-    return any(keyword in response_str for keyword in expired_keywords)
\ No newline at end of file
+    return DEFAULT_RULE.match(response)
@@ -0,0 +1,128 @@
+"""
+博主自适应轮询
+根据每个博主的发布频率和作品点赞增速调整检查间隔，活跃或有作品快速上涨的博主检查更频繁，长期不更新的博主检查更少
+"""
+import random
+import time
+from statistics import median
+from typing import Any, Dict, List
+from utils.sqlite_store import SqliteStore
+
+
+class CreatorScheduleStore(SqliteStore):
+    """博主轮询状态存储"""
+
+    SCHEMA = '''
+    CREATE TABLE IF NOT EXISTS creator_schedule (
+        sec_user_id TEXT PRIMARY KEY,
+        interval_seconds REAL NOT NULL,
+        next_check_at REAL NOT NULL,
+        last_checked_at REAL NOT NULL,
+        last_post_at REAL NOT NULL DEFAULT 0,
+        post_gap_seconds REAL NOT NULL DEFAULT 0,
+        likes_per_hour REAL NOT NULL DEFAULT 0
+    );
+    '''
+
+    async def load(self) -> Dict[str, Dict[str, Any]]:
+        """
+        加载所有博主的轮询状态
+        :return: sec_user_id 到状态的映射
+        """
+        db = await self.connect()
+        async with db.execute('SELECT * FROM creator_schedule') as cursor:
+            return {row['sec_user_id']: dict(row) for row in await cursor.fetchall()}
+
+    async def save(self, state: Dict[str, Any]) -> None:
+        """
+        保存博主的轮询状态
+        :param state: 轮询状态，包含 sec_user_id
+        """
+        db = await self.connect()
+        async with self.lock:
+            await db.execute(
+                '''INSERT OR REPLACE INTO creator_schedule
+                   (sec_user_id, interval_seconds, next_check_at, last_checked_at, last_post_at, post_gap_seconds,
+                    likes_per_hour) VALUES (?, ?, ?, ?, ?, ?, ?)''',
+                (state['sec_user_id'], state['interval_seconds'], state['next_check_at'], state['last_checked_at'],
+                 state['last_post_at'], state['post_gap_seconds'], state['likes_per_hour']))
+            await db.commit()
+
+
+class AdaptivePolicy:
+    """根据作品列表计算博主的下次检查间隔"""
+
+    # 发布间隔和点赞增速的平滑系数
+    SMOOTHING = 0.3
+
+    def __init__(self, base_seconds: float, min_seconds: float, max_seconds: float, recent_hours: float):
+        """
+        :param base_seconds: 默认检查间隔
+        :param min_seconds: 最小检查间隔
+        :param max_seconds: 最大检查间隔
+        :param recent_hours: 只关注最近N小时内发布的作品
+        """
+        self.base_seconds = base_seconds
+        self.min_seconds = min(min_seconds, base_seconds)
+        self.max_seconds = max(max_seconds, base_seconds)
+        self.recent_seconds = max(recent_hours, 1) * 3600
+
+    def update(self, state: Dict[str, Any], aweme_list: List[Dict], threshold: int,
+               now: float = None) -> Dict[str, Any]:
+        """
+        根据本次获取的作品列表更新轮询状态
+        :param state: 上次的轮询状态，首次检查时只包含 sec_user_id
+        :param aweme_list: 本次获取的作品列表
+        :param threshold: 点赞阈值
+        :param now: 当前时间
+        :return: 新的轮询状态
+        """
+        now = now or time.time()
+        create_times = sorted((video.get('create_time', 0) for video in aweme_list if video.get('create_time')),
+                              reverse=True)
+        last_post_at = max(create_times[0] if create_times else 0, state.get('last_post_at', 0))
+
+        # 发布间隔：本次作品列表中相邻作品的中位间隔，与历史值做指数平滑
+        post_gap = state.get('post_gap_seconds', 0)
+        if len(create_times) >= 2:
+            gap = median(a - b for a, b in zip(create_times, create_times[1:]))
+            post_gap = gap if post_gap <= 0 else post_gap + self.SMOOTHING * (gap - post_gap)
+
+        # 点赞增速：最近作品中点赞数距离阈值最近的一个的每小时点赞数
+        interval = self.base_seconds
+        likes_per_hour = 0
+        for video in aweme_list:
+            age = now - video.get('create_time', 0)
+            if age > self.recent_seconds:
+                continue
+            digg_count = video.get('statistics', {}).get('digg_count', 0)
+            speed = digg_count / max(age / 3600, 0.25)
+            likes_per_hour = max(likes_per_hour, speed)
+            if digg_count < threshold and speed > 0:
+                # 按当前增速在下一个默认间隔内会超过阈值，提前到预计超过阈值的时间检查
+                eta = (threshold - digg_count) / speed * 3600
+                if eta < self.base_seconds:
+                    interval = min(interval, eta)
+        likes_per_hour = likes_per_hour if state.get('likes_per_hour', 0) <= 0 else \
+            state['likes_per_hour'] + self.SMOOTHING * (likes_per_hour - state['likes_per_hour'])
+
+        if interval == self.base_seconds:
+            since_last_post = now - last_post_at if last_post_at else self.max_seconds
+            if since_last_post > self.recent_seconds:
+                # 最近没有新作品，按沉寂时长逐步放宽
+                interval = self.base_seconds * since_last_post / self.recent_seconds
+            elif 0 < post_gap < self.base_seconds:
+                # 发布频繁的博主在两次发布之间至少检查两次
+                interval = post_gap / 2
+
+        interval = min(max(interval, self.min_seconds), self.max_seconds)
+        return {
+            'sec_user_id': state['sec_user_id'],
+            'interval_seconds': interval,
+            # 加入少量抖动，避免同一时刻到期的博主长期聚集
+            'next_check_at': now + interval * random.uniform(0.9, 1.1),
+            'last_checked_at': now,
+            'last_post_at': last_post_at,
+            'post_gap_seconds': post_gap,
+            'likes_per_hour': likes_per_hour,
+        }
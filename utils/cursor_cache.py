@@ -0,0 +1,184 @@
+"""
+评论分页游标缓存
+记录上游游标与已读取条数的对应关系，深翻页时从最近的游标继续请求
+"""
+import base64
+import bisect
+import hashlib
+import hmac
+import json
+import os
+import time
+from collections import OrderedDict
+from threading import Lock
+from typing import Any, Dict, Optional, Tuple
+
+# 续页令牌的签名密钥，多进程部署时各进程读取同一个文件
+SECRET_FILE = 'data/cursor.key'
+_secret: Optional[bytes] = None
+
+
+class CursorCache:
+    """游标缓存，按 (platform, id) 分组，组内按 offset 有序"""
+
+    def __init__(self, ttl_seconds: int = 1800, max_items: int = 2000):
+        """
+        初始化游标缓存
+        :param ttl_seconds: 游标有效期（秒）
+        :param max_items: 最多缓存的 (platform, id) 组数
+        """
+        self.ttl_seconds = ttl_seconds
+        self.max_items = max_items
+        self._lock = Lock()
+        # (platform, id) -> {'offsets': [...], 'cursors': {offset: (cursor, expire_at)}, 'total': 总数}
+        self._items: OrderedDict = OrderedDict()
+
+    def put(self, platform: str, id: str, offset: int, cursor: Any, total: Optional[int] = None) -> None:
+        """
+        记录读取 offset 条数据后的上游游标
+        :param platform: 平台名称
+        :param id: 内容ID
+        :param offset: 已读取的条数
+        :param cursor: 上游游标
+        :param total: 上游返回的总条数，不返回总数的平台为 None
+        """
+        key = (platform, id)
+        expire_at = time.time() + self.ttl_seconds
+        with self._lock:
+            item = self._items.get(key)
+            if item is None:
+                item = {'offsets': [], 'cursors': {}}
+                self._items[key] = item
+            else:
+                self._items.move_to_end(key)
+            if offset not in item['cursors']:
+                bisect.insort(item['offsets'], offset)
+            item['cursors'][offset] = (cursor, expire_at)
+            if total is not None:
+                item['total'] = total
+            while len(self._items) > self.max_items:
+                self._items.popitem(last=False)
+
+    def nearest(self, platform: str, id: str, offset: int) -> Optional[Tuple[int, Any, Optional[int]]]:
+        """
+        查找不超过 offset 的最近游标
+        :param platform: 平台名称
+        :param id: 内容ID
+        :param offset: 目标偏移量
+        :return: (游标对应的偏移量, 上游游标, 总条数)，没有可用游标时返回 None
+        """
+        key = (platform, id)
+        now = time.time()
+        with self._lock:
+            item = self._items.get(key)
+            if item is None:
+                return None
+            offsets = item['offsets']
+            index = bisect.bisect_right(offsets, offset)
+            while index > 0:
+                cached_offset = offsets[index - 1]
+                cursor, expire_at = item['cursors'][cached_offset]
+                if expire_at >= now:
+                    return cached_offset, cursor, item.get('total')
+                # 过期游标直接移除
+                del item['cursors'][cached_offset]
+                offsets.pop(index - 1)
+                index -= 1
+            if not offsets:
+                del self._items[key]
+            return None
+
+
+cursor_cache = CursorCache()
+
+
+def _get_secret() -> bytes:
+    """读取签名密钥，不存在时生成，多个进程同时生成时以先写入的为准"""
+    global _secret
+    if _secret is None:
+        directory = os.path.dirname(SECRET_FILE)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        try:
+            fd = os.open(SECRET_FILE, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600)
+        except FileExistsError:
+            # 其他进程可能刚创建文件还未写入，等待写入完成
+            for _ in range(50):
+                with open(SECRET_FILE, 'rb') as f:
+                    secret = f.read()
+                if secret:
+                    break
+                time.sleep(0.01)
+        else:
+            secret = os.urandom(32)
+            with os.fdopen(fd, 'wb') as f:
+                f.write(secret)
+        _secret = secret
+    return _secret
+
+
+def _sign(payload: bytes) -> str:
+    digest = hmac.new(_get_secret(), payload, hashlib.sha256).digest()[:16]
+    return base64.urlsafe_b64encode(digest).decode('ascii').rstrip('=')
+
+
+def encode_cursor(platform: str, id: str, offset: int, cursor: Any, total: Optional[int] = None) -> str:
+    """
+    生成返回给调用方的续页令牌，带有签名，调用方无法修改其中的上游游标
+    :param platform: 平台名称
+    :param id: 内容ID
+    :param offset: 令牌对应的偏移量
+    :param cursor: 上游游标
+    :param total: 上游返回的总条数
+    :return: 不透明的令牌字符串
+    """
+    data = {'p': platform, 'i': id, 'o': offset, 'c': cursor}
+    if total is not None:
+        data['t'] = total
+    payload = json.dumps(data, separators=(',', ':'), ensure_ascii=False).encode('utf-8')
+    return base64.urlsafe_b64encode(payload).decode('ascii').rstrip('=') + '.' + _sign(payload)
+
+
+def decode_cursor(token: str, platform: str, id: str) -> Optional[Tuple[int, Any, Optional[int]]]:
+    """
+    解析续页令牌，签名不正确或与平台、内容ID不匹配时返回 None
+    :param token: 令牌字符串
+    :param platform: 平台名称
+    :param id: 内容ID
+    :return: (偏移量, 上游游标, 总条数)
+    """
+    if not token:
+        return None
+    try:
+        encoded, signature = token.split('.', 1)
+        raw = base64.urlsafe_b64decode((encoded + '=' * (-len(encoded) % 4)).encode('ascii'))
+        if not hmac.compare_digest(signature, _sign(raw)):
+            return None
+        payload: Dict = json.loads(raw.decode('utf-8'))
+    except Exception:
+        return None
+    if payload.get('p') != platform or payload.get('i') != id:
+        return None
+    offset = payload.get('o')
+    if not isinstance(offset, int) or offset < 0:
+        return None
+    return offset, payload.get('c'), payload.get('t')
+
+
+def resume_point(platform: str, id: str, offset: int, token: str, initial: Any) -> Tuple[int, Any, Optional[int]]:
+    """
+    计算本次请求的起始位置：优先使用令牌，其次使用缓存，最后从头开始
+    :param platform: 平台名称
+    :param id: 内容ID
+    :param offset: 请求的偏移量
+    :param token: 调用方传入的续页令牌
+    :param initial: 上游初始游标
+    :return: (起始偏移量, 上游游标, 已知的总条数)，从头开始时总条数为 None
+    """
+    decoded = decode_cursor(token, platform, id)
+    if decoded and decoded[0] <= offset:
+        return decoded
+    cached = cursor_cache.nearest(platform, id, offset)
+    if cached:
+        return cached
+    return 0, initial, None
@@ -0,0 +1,89 @@
+"""
+通知去重存储
+记录已通知的视频ID和通知时间，按通知时间索引清理过期记录，进程重启后仍然有效
+"""
+import time
+from typing import Iterable, Set
+from utils.sqlite_store import SqliteStore
+
+
+class DedupStore(SqliteStore):
+    """已通知视频去重存储"""
+
+    SCHEMA = '''
+    CREATE TABLE IF NOT EXISTS notified_videos (
+        aweme_id TEXT PRIMARY KEY,
+        notified_at REAL NOT NULL
+    );
+    CREATE INDEX IF NOT EXISTS idx_notified_videos_time ON notified_videos(notified_at);
+    '''
+
+    def __init__(self, path: str):
+        super().__init__(path)
+        # 记录数，供同步的状态接口读取
+        self.size = 0
+
+    async def connect(self):
+        first = self._db is None
+        db = await super().connect()
+        if first:
+            async with db.execute('SELECT COUNT(*) FROM notified_videos') as cursor:
+                self.size = (await cursor.fetchone())[0]
+        return db
+
+    async def contains(self, aweme_id: str) -> bool:
+        """
+        视频是否已通知过
+        :param aweme_id: 视频ID
+        """
+        db = await self.connect()
+        async with db.execute('SELECT 1 FROM notified_videos WHERE aweme_id = ?', (aweme_id,)) as cursor:
+            return await cursor.fetchone() is not None
+
+    async def filter_notified(self, aweme_ids: Iterable[str]) -> Set[str]:
+        """
+        批量查询已通知过的视频
+        :param aweme_ids: 视频ID列表
+        :return: 其中已通知过的视频ID
+        """
+        db = await self.connect()
+        ids = list(aweme_ids)
+        found = set()
+        # 分批查询，避免超过 SQLite 的参数个数上限
+        for start in range(0, len(ids), 500):
+            chunk = ids[start:start + 500]
+            async with db.execute(
+                    f'SELECT aweme_id FROM notified_videos WHERE aweme_id IN ({", ".join("?" * len(chunk))})',
+                    chunk) as cursor:
+                found.update(row['aweme_id'] for row in await cursor.fetchall())
+        return found
+
+    async def add(self, aweme_id: str, notified_at: float = None) -> None:
+        """
+        记录已通知的视频
+        :param aweme_id: 视频ID
+        :param notified_at: 通知时间，默认当前时间
+        """
+        db = await self.connect()
+        notified_at = notified_at or time.time()
+        async with self.lock:
+            cursor = await db.execute(
+                'INSERT OR IGNORE INTO notified_videos (aweme_id, notified_at) VALUES (?, ?)', (aweme_id, notified_at))
+            if cursor.rowcount == 1:
+                self.size += 1
+            else:
+                await db.execute('UPDATE notified_videos SET notified_at = ? WHERE aweme_id = ?', (notified_at, aweme_id))
+            await db.commit()
+
+    async def clean_expired(self, cutoff_time: float) -> int:
+        """
+        删除通知时间早于 cutoff_time 的记录，只扫描过期部分的索引
+        :param cutoff_time: 过期时间点
+        :return: 删除的记录数
+        """
+        db = await self.connect()
+        async with self.lock:
+            cursor = await db.execute('DELETE FROM notified_videos WHERE notified_at < ?', (cutoff_time,))
+            await db.commit()
+            self.size = max(self.size - cursor.rowcount, 0)
+        return cursor.rowcount
@@ -8,8 +8,18 @@ from datetime import datetime, timedelta
 from typing import Dict, List, Optional, Set
 from lib.logger import logger
 from service.douyin.logic.user_posts import request_user_posts
+from service.douyin.logic.detail import request_detail, request_multi_detail
 from service.douyin.models import accounts
-from utils.feishu_notification import send_video_notification, init_feishu_notifier
+from service.monitor.models import notified_videos, creator_schedule, watermarks, video_stats, creators
+from utils.creator_schedule import AdaptivePolicy
+from utils.monitored_creators import migrate_config_users
+from utils.velocity import VelocityRule, detect_hot_videos
+from utils.notification_digest import DigestAggregator
+from utils.feishu_notification import enqueue_video_notification, init_feishu_notifier, get_feishu_notifier, \
+    notified_aweme_ids
+from utils.metrics import monitor_sweep_duration, monitor_user_duration, monitor_users
+from utils.shared_state import publish
+from utils.outbox import on_delivered
 import random
 
 
@@ -28,9 +38,13 @@ class DouyinMonitor:
         # 飞书配置
         feishu_config = config.get('feishu', {})
         self.feishu_webhook = feishu_config.get('webhook_url', '')
+        # 通知汇总：一轮巡检或一个时间窗口内命中的作品合并为一条消息
+        self.digest = DigestAggregator(feishu_config.get('digest', {}))
         
-        # 监控用户列表
-        self.users = config.get('users', [])
+        # 监控用户列表保存在数据库中，每轮巡检前重新加载
+        self.creators = creators
+        self.users: List[Dict] = []
+        self._users_migrated = False
         
         # 监控设置
         settings = config.get('settings', {})
@@ -38,13 +52,56 @@ class DouyinMonitor:
         self.recent_hours = settings.get('recent_hours', 24)
         self.enable_deduplication = settings.get('enable_deduplication', True)
         self.dedup_cache_hours = settings.get('dedup_cache_hours', 72)
+        # 发件箱中同一作品的幂等键在去重缓存过期后失效；不启用去重时投递成功即失效
+        self.notification_key_ttl = self.dedup_cache_hours * 3600 if self.enable_deduplication else 0
+        self.digest.key_ttl = self.notification_key_ttl
         
-        # 去重缓存：存储已通知的视频ID和时间戳
-        self.notified_videos: Dict[str, float] = {}
+        # 增量获取：记录每个博主已见过的最新发布时间和窗口内的作品，只翻页到已见过的作品或窗口边界为止
+        self.incremental = settings.get('incremental', True)
+        self.incremental_page_size = settings.get('incremental_page_size', 5)
+        self.max_pages_per_check = max(settings.get('max_pages_per_check', 3), 1)
+        self.stats_batch_size = settings.get('stats_batch_size', 20)
+        # 批量接口失败时逐个请求详情的作品数上限，为 0 时不逐个请求
+        self.detail_fallback_limit = settings.get('detail_fallback_limit', 5)
+        self.watermarks = watermarks
+        
+        # 统计数据时序：每次巡检记录作品的点赞、评论、分享等计数，保留最近若干天发布的作品
+        self.record_stats = settings.get('record_stats', True)
+        self.stats_retention_days = settings.get('stats_retention_days', 30)
+        self.video_stats = video_stats
+        
+        # 点赞增速检测：每轮巡检结束后基于统计数据时序批量计算增速，博主可在 velocity 中覆盖全局规则
+        self.velocity_defaults = settings.get('velocity', {})
+        self._sweep_videos: Dict[str, Dict] = {}
+        self._pending_notifications: Set[str] = set()
+        
+        # 巡检调度：并发上限、单账号请求间隔、启动时间分散比例和单个用户的超时时间
+        self.max_concurrency = max(settings.get('max_concurrency', 5), 1)
+        self.account_interval_seconds = settings.get('account_interval_seconds', 3)
+        self.spread_ratio = min(max(settings.get('spread_ratio', 0.5), 0), 0.9)
+        self.user_timeout_seconds = settings.get('user_timeout_seconds', 120)
+        self._account_next_time: Dict[str, float] = {}
+        self._account_lock = asyncio.Lock()
+        self.last_sweep: Dict = {}
+        
+        # 自适应轮询：按博主的发布频率和点赞增速在最小、最大间隔之间调整各自的检查间隔
+        adaptive = settings.get('adaptive', {})
+        self.adaptive_enabled = adaptive.get('enabled', False)
+        self.policy = AdaptivePolicy(
+            base_seconds=self.interval_hours * 3600,
+            min_seconds=adaptive.get('min_interval_minutes', 15) * 60,
+            max_seconds=adaptive.get('max_interval_hours', 24) * 3600,
+            recent_hours=self.recent_hours,
+        )
+        self.creator_schedule = creator_schedule
+        self.creator_states: Optional[Dict[str, Dict]] = None
+        
+        # 去重缓存：已通知的视频ID和时间戳持久化在 SQLite 中，重启或重新加载配置后不会重复通知
+        self.notified_videos = notified_videos
         
         # 初始化飞书通知器
         if self.feishu_webhook and self.feishu_webhook != "https://open.feishu.cn/open-apis/bot/v2/hook/YOUR_WEBHOOK_TOKEN":
-            init_feishu_notifier(self.feishu_webhook)
+            init_feishu_notifier(self.feishu_webhook, feishu_config)
             logger.info("抖音监控器初始化完成")
         else:
             logger.warning("飞书webhook未配置或使用默认值，请修改config.yaml中的webhook_url")
@@ -55,7 +112,7 @@ class DouyinMonitor:
             logger.info("抖音监控未启用")
             return
             
-        if not self.users:
+        if not await self.reload_users():
             logger.warning("未配置监控用户列表")
             return
             
@@ -69,7 +126,7 @@ class DouyinMonitor:
             try:
                 await self.check_all_users()
                 retry_count = 0  # 成功后重置重试计数
-                await asyncio.sleep(self.interval_hours * 3600)  # 转换为秒
+                await asyncio.sleep(self.sweep_interval_seconds)
             except Exception as e:
                 retry_count += 1
                 delay = min(base_delay * (2 ** (retry_count - 1)), 3600)  # 指数退避，最大1小时
@@ -83,12 +140,32 @@ class DouyinMonitor:
                 logger.info(f"等待{delay}秒后重试...")
                 await asyncio.sleep(delay)
     
-    async def check_all_users(self):
-        """检查所有用户的视频"""
+    async def reload_users(self) -> List[Dict]:
+        """
+        从数据库重新加载监控用户列表，首次加载时迁移配置文件中的用户
+        :return: 监控用户列表
+        """
+        if not self._users_migrated:
+            await migrate_config_users(self.creators)
+            self._users_migrated = True
+        self.users = await self.creators.load_all()
+        return self.users
+    
+    @property
+    def sweep_interval_seconds(self) -> float:
+        """巡检间隔，启用自适应轮询时按最小间隔巡检，只检查已到期的博主"""
+        return self.policy.min_seconds if self.adaptive_enabled else self.interval_hours * 3600
+    
+    async def check_all_users(self, spread: bool = True):
+        """
+        检查所有用户的视频
+        :param spread: 是否把各用户的开始时间分散到监控间隔内，手动触发时不分散
+        """
         logger.info("开始检查所有用户的视频")
         
-        # 清理过期的去重缓存
-        self._clean_expired_cache()
+        # 清理过期的去重缓存和统计数据
+        await self._clean_expired_cache()
+        await self._prune_video_stats()
         
         # 获取可用账号
         available_accounts = await self._get_available_accounts()
@@ -96,23 +173,70 @@ class DouyinMonitor:
             logger.warning("没有可用的抖音账号，跳过本次检查")
             return
         
-        # 并发检查所有用户
-        tasks = []
-        for user_config in self.users:
-            if user_config.get('enabled', True):
-                task = self.check_user_videos(user_config, available_accounts)
-                tasks.append(task)
+        users = [user_config for user_config in await self.reload_users() if user_config.get('enabled', True)]
+        skipped = 0
+        if self.adaptive_enabled and spread:
+            due_users = await self._due_users(users)
+            skipped = len(users) - len(due_users)
+            users = due_users
+        if not users:
+            logger.info(f"完成所有用户的检查，没有到期的用户，跳过 {skipped} 个")
+            return
+        
+        # 开始时间均匀分散在监控间隔的前 spread_ratio 部分，避免所有请求集中在同一时刻
+        window = self.sweep_interval_seconds * self.spread_ratio if spread else 0
+        step = window / len(users)
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+        started_at = time.time()
+        self._sweep_videos = {}
+        self._pending_notifications = set()
+        self.last_sweep = {
+            'running': True,
+            'started_at': datetime.fromtimestamp(started_at).strftime('%Y-%m-%d %H:%M:%S'),
+            'users': len(users),
+            'skipped': skipped,
+            'succeeded': 0,
+            'failed': 0,
+            'timed_out': 0,
+        }
+        await publish('monitor.last_sweep', self.last_sweep)
         
-        if tasks:
-            await asyncio.gather(*tasks, return_exceptions=True)
+        async def run(index: int, user_config: Dict):
+            if step:
+                await asyncio.sleep(index * step)
+            async with semaphore:
+                user_started_at = time.perf_counter()
+                try:
+                    succ = await asyncio.wait_for(
+                        self.check_user_videos(user_config, available_accounts), self.user_timeout_seconds)
+                except asyncio.TimeoutError:
+                    logger.error(f"检查用户 {user_config.get('nickname', '未知博主')} 超时")
+                    succ = None
+            result = 'timed_out' if succ is None else 'succeeded' if succ else 'failed'
+            self.last_sweep[result] += 1
+            monitor_users.inc(result)
+            monitor_user_duration.observe(time.perf_counter() - user_started_at, result)
         
-        logger.info("完成所有用户的检查")
+        await asyncio.gather(*[run(index, user_config) for index, user_config in enumerate(users)],
+                             return_exceptions=True)
+        await self._check_velocity(users, int(started_at))
+        if self.digest.enabled and self.digest.mode == 'sweep':
+            await self.digest.flush()
+        
+        self.last_sweep['running'] = False
+        self.last_sweep['duration_seconds'] = round(time.time() - started_at, 2)
+        monitor_sweep_duration.observe(time.time() - started_at)
+        await publish('monitor.last_sweep', self.last_sweep)
+        logger.info(f"完成所有用户的检查，耗时 {self.last_sweep['duration_seconds']} 秒，"
+                    f"成功 {self.last_sweep['succeeded']}，失败 {self.last_sweep['failed']}，"
+                    f"超时 {self.last_sweep['timed_out']}")
     
-    async def check_user_videos(self, user_config: Dict, available_accounts: List[Dict]):
+    async def check_user_videos(self, user_config: Dict, available_accounts: List[Dict]) -> bool:
         """
         检查单个用户的视频
         :param user_config: 用户配置
         :param available_accounts: 可用账号列表
+        :return: 是否检查成功
         """
         sec_user_id = user_config.get('sec_user_id')
         nickname = user_config.get('nickname', '未知博主')
@@ -120,42 +244,235 @@ class DouyinMonitor:
         
         if not sec_user_id:
             logger.warning(f"用户配置缺少sec_user_id: {user_config}")
-            return
+            return False
         
         logger.info(f"检查用户 {nickname}({sec_user_id}) 的视频，点赞阈值：{like_threshold:,}")
         
         try:
-            # 随机选择一个账号
-            account = random.choice(available_accounts)
+            # 选择最早可用的账号，并按账号请求间隔等待
+            account = await self._acquire_account(available_accounts)
             cookie = account.get('cookie', '')
             
             # 获取用户视频列表
-            response, success = await request_user_posts(
-                sec_user_id=sec_user_id,
-                max_cursor=0,
-                cookie=cookie,
-                count=self.videos_per_check
-            )
+            if self.incremental:
+                aweme_list, success = await self._fetch_videos_incremental(sec_user_id, cookie, like_threshold)
+            else:
+                response, success = await request_user_posts(
+                    sec_user_id=sec_user_id,
+                    max_cursor=0,
+                    cookie=cookie,
+                    count=self.videos_per_check
+                )
+                aweme_list = response.get('aweme_list', [])
             
             if not success:
                 logger.error(f"获取用户 {nickname} 的视频列表失败")
-                return
+                return False
             
-            aweme_list = response.get('aweme_list', [])
+            if self.record_stats and aweme_list:
+                try:
+                    await self.video_stats.record(sec_user_id, aweme_list)
+                except Exception as e:
+                    logger.error(f"记录用户 {nickname} 的作品统计数据时发生异常: {e}")
+            if self.adaptive_enabled:
+                await self._update_schedule(sec_user_id, aweme_list or [], like_threshold)
             if not aweme_list:
                 logger.info(f"用户 {nickname} 暂无视频")
-                return
+                return True
             
             # 筛选最近发布的视频
             recent_videos = self._filter_recent_videos(aweme_list)
             logger.info(f"用户 {nickname} 最近 {self.recent_hours} 小时内发布了 {len(recent_videos)} 个视频")
             
+            self._sweep_videos.update({video['aweme_id']: video for video in recent_videos if video.get('aweme_id')})
+            
             # 检查每个视频的点赞数
             for video in recent_videos:
                 await self._check_video_likes(video, nickname, like_threshold)
+            return True
                 
         except Exception as e:
             logger.error(f"检查用户 {nickname} 时发生异常: {e}")
+            return False
+    
+    async def _fetch_videos_incremental(self, sec_user_id: str, cookie: str, like_threshold: int):
+        """
+        增量获取用户的作品：从最新作品开始翻页，遇到已见过的作品或超出时间窗口即停止，
+        窗口内已跟踪但不在本次结果中、且还可能触发通知的作品通过批量详情接口刷新统计数据
+        :param sec_user_id: 用户ID
+        :param cookie: 请求cookie
+        :param like_threshold: 点赞阈值
+        :return: 作品列表和是否成功
+        """
+        watermark = await self.watermarks.get(sec_user_id)
+        newest_create_time = watermark['newest_create_time']
+        cutoff_time = int(time.time()) - self.recent_hours * 3600 if self.recent_hours > 0 else 0
+        count = self.incremental_page_size if newest_create_time else self.videos_per_check
+        
+        videos: Dict[str, Dict] = {}
+        max_cursor = 0
+        for page in range(self.max_pages_per_check):
+            response, success = await request_user_posts(sec_user_id, max_cursor, cookie, count)
+            if not success:
+                if page == 0:
+                    return [], False
+                break
+            aweme_list = response.get('aweme_list') or []
+            for video in aweme_list:
+                if video.get('aweme_id'):
+                    videos[video['aweme_id']] = video
+            # 置顶作品不按时间排序，不参与停止判断
+            create_times = [video.get('create_time', 0) for video in aweme_list if video.get('is_top', 0) != 1]
+            if (response.get('has_more', 0) != 1 or not create_times or self.recent_hours <= 0
+                    or min(create_times) <= newest_create_time or min(create_times) < cutoff_time):
+                break
+            max_cursor = response.get('max_cursor', 0)
+        
+        # 刷新窗口内已跟踪、但本次翻页未覆盖到的作品，未设置时间窗口时不跟踪
+        tracked = {}
+        if self.recent_hours > 0:
+            missing = [aweme_id for aweme_id, create_time in watermark['tracked'].items()
+                       if aweme_id not in videos and create_time >= cutoff_time]
+            missing = await self._refreshable(missing, like_threshold)
+            for video in await self._fetch_video_stats(missing, cookie):
+                videos[video['aweme_id']] = video
+            tracked = {aweme_id: create_time for aweme_id, create_time in watermark['tracked'].items()
+                       if create_time >= cutoff_time}
+            tracked.update({aweme_id: video.get('create_time', 0) for aweme_id, video in videos.items()
+                            if video.get('create_time', 0) >= cutoff_time})
+        newest_create_time = max([newest_create_time] + [video.get('create_time', 0) for video in videos.values()])
+        await self.watermarks.update(sec_user_id, newest_create_time, tracked, cutoff_time)
+        return list(videos.values()), True
+    
+    async def _refreshable(self, aweme_ids: List[str], like_threshold: int) -> List[str]:
+        """
+        筛选需要刷新统计数据的作品：已通知过的作品不会再触发通知，不启用去重时已超过阈值的作品也不再刷新
+        :param aweme_ids: 作品ID列表
+        :param like_threshold: 点赞阈值
+        :return: 需要刷新的作品ID
+        """
+        if not aweme_ids:
+            return []
+        try:
+            if self.enable_deduplication:
+                skipped = await self.notified_videos.filter_notified(aweme_ids) | self._pending_notifications
+            elif self.record_stats:
+                counts = await self.video_stats.latest_digg_counts(aweme_ids)
+                skipped = {aweme_id for aweme_id, digg_count in counts.items() if digg_count >= like_threshold}
+            else:
+                skipped = set()
+        except Exception as e:
+            logger.error(f"筛选需要刷新的作品时发生异常: {e}")
+            return aweme_ids
+        return [aweme_id for aweme_id in aweme_ids if aweme_id not in skipped]
+    
+    async def _fetch_video_stats(self, aweme_ids: List[str], cookie: str) -> List[Dict]:
+        """
+        批量获取作品的最新统计数据，批量接口失败时逐个请求详情，逐个请求的作品数不超过 detail_fallback_limit
+        :param aweme_ids: 作品ID列表
+        :param cookie: 请求cookie
+        :return: 作品列表
+        """
+        videos = []
+        fallback = self.detail_fallback_limit
+        for i in range(0, len(aweme_ids), self.stats_batch_size):
+            batch = aweme_ids[i:i + self.stats_batch_size]
+            details, success = await request_multi_detail(batch, cookie)
+            if success and details:
+                videos.extend(detail for detail in details if detail.get('aweme_id'))
+                continue
+            for aweme_id in batch[:fallback]:
+                detail, success = await request_detail(aweme_id, cookie)
+                if success and detail:
+                    videos.append(detail)
+            skipped = len(batch) - min(len(batch), fallback)
+            fallback = max(fallback - len(batch), 0)
+            if skipped:
+                logger.warning(f"批量获取作品详情失败，{skipped} 个作品本轮不刷新")
+        return videos
+    
+    async def _load_creator_states(self) -> Dict[str, Dict]:
+        if self.creator_states is None:
+            try:
+                self.creator_states = await self.creator_schedule.load()
+            except Exception as e:
+                logger.error(f"加载博主轮询状态时发生异常: {e}")
+                return {}
+        return self.creator_states
+    
+    async def _due_users(self, users: List[Dict]) -> List[Dict]:
+        """
+        筛选已到检查时间的用户，从未检查过的用户视为到期
+        :param users: 启用的用户配置
+        :return: 到期的用户配置，按到期时间排序
+        """
+        states = await self._load_creator_states()
+        # 提前半个巡检间隔内到期的也在本轮检查，避免被推迟一整轮
+        deadline = time.time() + self.sweep_interval_seconds / 2
+        due = [user_config for user_config in users
+               if states.get(user_config.get('sec_user_id'), {}).get('next_check_at', 0) <= deadline]
+        due.sort(key=lambda user_config: states.get(user_config.get('sec_user_id'), {}).get('next_check_at', 0))
+        return due
+    
+    async def _update_schedule(self, sec_user_id: str, aweme_list: List[Dict], like_threshold: int):
+        """
+        根据本次获取的作品列表更新博主的检查间隔
+        :param sec_user_id: 用户ID
+        :param aweme_list: 作品列表
+        :param like_threshold: 点赞阈值
+        """
+        states = await self._load_creator_states()
+        state = self.policy.update(states.get(sec_user_id, {'sec_user_id': sec_user_id}), aweme_list, like_threshold)
+        states[sec_user_id] = state
+        try:
+            await self.creator_schedule.save(state)
+        except Exception as e:
+            logger.error(f"保存博主轮询状态时发生异常: {e}")
+        logger.info(f"用户 {sec_user_id} 下次检查间隔：{state['interval_seconds'] / 60:.1f} 分钟")
+    
+    def get_schedule(self) -> List[Dict]:
+        """
+        获取各博主的轮询状态
+        :return: 轮询状态列表
+        """
+        states = self.creator_states or {}
+        schedule = []
+        for user_config in self.users:
+            sec_user_id = user_config.get('sec_user_id')
+            state = states.get(sec_user_id)
+            schedule.append({
+                'sec_user_id': sec_user_id,
+                'nickname': user_config.get('nickname', ''),
+                'enabled': user_config.get('enabled', True),
+                'interval_minutes': round(state['interval_seconds'] / 60, 1) if state else None,
+                'next_check_at': datetime.fromtimestamp(state['next_check_at']).strftime('%Y-%m-%d %H:%M:%S')
+                if state else None,
+                'post_gap_hours': round(state['post_gap_seconds'] / 3600, 1) if state else None,
+                'likes_per_hour': round(state['likes_per_hour'], 1) if state else None,
+            })
+        return schedule
+    
+    async def _acquire_account(self, available_accounts: List[Dict]) -> Dict:
+        """
+        选择下次可用时间最早的账号，等待到可用时间，保证同一账号的请求间隔
+        :param available_accounts: 可用账号列表
+        :return: 账号
+        """
+        async with self._account_lock:
+            candidates = list(available_accounts)
+            random.shuffle(candidates)
+            account = min(candidates, key=lambda a: self._account_next_time.get(self._account_key(a), 0))
+            key = self._account_key(account)
+            now = time.time()
+            start = max(self._account_next_time.get(key, 0), now)
+            self._account_next_time[key] = start + self.account_interval_seconds
+        if start > now:
+            await asyncio.sleep(start - now)
+        return account
+    
+    @staticmethod
+    def _account_key(account: Dict) -> str:
+        return str(account.get('id') or account.get('cookie', ''))
     
     async def _check_video_likes(self, video: Dict, author_nickname: str, threshold: int):
         """
@@ -173,24 +490,83 @@ class DouyinMonitor:
             return
         
         # 检查是否已经通知过
-        if self.enable_deduplication and aweme_id in self.notified_videos:
+        if await self._is_notified(aweme_id):
             return
         
         # 检查点赞数是否达到阈值
         if digg_count >= threshold:
             logger.info(f"发现热门视频：{author_nickname} - {desc[:50]}... (点赞数：{digg_count:,})")
             
-            # 发送通知
-            success = await send_video_notification(video)
-            
-            if success:
-                # 记录已通知
-                if self.enable_deduplication:
-                    self.notified_videos[aweme_id] = time.time()
-                
-                logger.info(f"成功发送通知：视频ID {aweme_id}，点赞数 {digg_count:,}")
+            # 放入后台发送队列或汇总缓存，由通知器负责限流和重试，投递成功后记录已通知
+            if await self._notify(video):
+                logger.info(f"通知已加入发送队列：视频ID {aweme_id}，点赞数 {digg_count:,}")
             else:
-                logger.error(f"发送通知失败：视频ID {aweme_id}")
+                logger.error(f"通知加入发送队列失败：视频ID {aweme_id}")
+    
+    async def _check_velocity(self, users: List[Dict], observed_since: int):
+        """
+        在本轮检查过的所有作品上批量执行点赞增速规则，按预测热度从高到低发送通知
+        :param users: 本轮检查的用户配置
+        :param observed_since: 本轮巡检开始时间
+        """
+        rules = {}
+        for user_config in users:
+            rule = VelocityRule.for_user(self.velocity_defaults, user_config)
+            if rule is not None and user_config.get('sec_user_id'):
+                rules[user_config['sec_user_id']] = rule
+        if not rules:
+            return
+        if not self.record_stats:
+            logger.warning("点赞增速检测需要开启 record_stats，跳过")
+            return
+        
+        baseline_since = int(time.time()) - self.velocity_defaults.get('baseline_days', 7) * 86400
+        try:
+            rows = await self.video_stats.velocity_snapshot(baseline_since)
+        except Exception as e:
+            logger.error(f"计算点赞增速时发生异常: {e}")
+            return
+        hits = detect_hot_videos(rows, rules, observed_since, self.interval_hours)
+        logger.info(f"点赞增速检测完成，作品数：{len(rows)}，命中：{len(hits)}")
+        
+        for hit in hits:
+            aweme_id = hit['aweme_id']
+            video = self._sweep_videos.get(aweme_id)
+            if video is None:
+                continue
+            if await self._is_notified(aweme_id):
+                continue
+            acceleration = f"{hit['acceleration']:,.0f}" if hit['acceleration'] is not None else '未知'
+            logger.info(f"发现点赞快速增长的视频：{aweme_id}，每小时点赞 {hit['likes_per_hour']:,.0f}，"
+                        f"加速度 {acceleration}，博主内分位 {hit['percentile']:.2f}，预测热度 {hit['predicted_heat']:,}")
+            if not await self._notify(video):
+                logger.error(f"通知加入发送队列失败：视频ID {aweme_id}")
+    
+    async def _is_notified(self, aweme_id: str) -> bool:
+        """
+        作品是否已通知过、已在本轮巡检中加入发送队列或正在等待汇总
+        :param aweme_id: 视频ID
+        """
+        if not self.enable_deduplication:
+            return False
+        if aweme_id in self._pending_notifications or self.digest.contains(aweme_id):
+            return True
+        return await self.notified_videos.contains(aweme_id)
+    
+    async def _notify(self, video: Dict) -> bool:
+        """
+        发送热门作品通知，启用汇总时先缓存
+        :param video: 视频信息
+        :return: 是否写入发件箱或汇总缓存
+        """
+        if self.digest.enabled:
+            if not self.digest.add(video):
+                return False
+        elif not await enqueue_video_notification(video, self.notification_key_ttl):
+            return False
+        # 投递成功前去重表中还没有该作品，避免同一轮中点赞阈值和增速检测重复发送
+        self._pending_notifications.add(video.get('aweme_id', ''))
+        return True
     
     def _filter_recent_videos(self, videos: List[Dict]) -> List[Dict]:
         """
@@ -212,7 +588,7 @@ class DouyinMonitor:
         
         return recent_videos
     
-    def _clean_expired_cache(self):
+    async def _clean_expired_cache(self):
         """清理过期的去重缓存"""
         if not self.enable_deduplication:
             return
@@ -220,16 +596,29 @@ class DouyinMonitor:
         current_time = time.time()
         cutoff_time = current_time - (self.dedup_cache_hours * 3600)
         
-        expired_ids = [
-            aweme_id for aweme_id, timestamp in self.notified_videos.items()
-            if timestamp < cutoff_time
-        ]
+        try:
+            expired_count = await self.notified_videos.clean_expired(cutoff_time)
+        except Exception as e:
+            logger.error(f"清理去重缓存时发生异常: {e}")
+            return
         
-        for aweme_id in expired_ids:
-            del self.notified_videos[aweme_id]
+        if expired_count:
+            logger.info(f"清理了 {expired_count} 个过期的去重缓存")
+    
+    async def _prune_video_stats(self):
+        """删除发布时间超出保留期的作品统计数据"""
+        if not self.record_stats or self.stats_retention_days <= 0:
+            return
         
-        if expired_ids:
-            logger.info(f"清理了 {len(expired_ids)} 个过期的去重缓存")
+        cutoff_time = int(time.time()) - self.stats_retention_days * 86400
+        try:
+            pruned = await self.video_stats.prune(cutoff_time)
+        except Exception as e:
+            logger.error(f"清理作品统计数据时发生异常: {e}")
+            return
+        
+        if pruned:
+            logger.info(f"清理了 {pruned} 个作品的统计数据")
     
     async def _get_available_accounts(self) -> List[Dict]:
         """
@@ -257,7 +646,16 @@ class DouyinMonitor:
             'interval_hours': self.interval_hours,
             'monitored_users': len([u for u in self.users if u.get('enabled', True)]),
             'total_users': len(self.users),
-            'notified_videos_count': len(self.notified_videos),
+            'notified_videos_count': self.notified_videos.size,
+            'max_concurrency': self.max_concurrency,
+            'adaptive_polling': {
+                'enabled': self.adaptive_enabled,
+                'min_interval_minutes': self.policy.min_seconds / 60,
+                'max_interval_hours': self.policy.max_seconds / 3600,
+            },
+            'last_sweep': self.last_sweep,
+            'notifier': get_feishu_notifier().get_metrics() if get_feishu_notifier() else None,
+            'account_pool': accounts.get_status(),
             'feishu_configured': bool(self.feishu_webhook and 
                                    self.feishu_webhook != "https://open.feishu.cn/open-apis/bot/v2/hook/YOUR_WEBHOOK_TOKEN")
         }
@@ -267,6 +665,18 @@ class DouyinMonitor:
 _monitor_instance: Optional[DouyinMonitor] = None
 
 
+async def _on_video_delivered(key: str, message: Dict) -> None:
+    """作品或汇总通知投递成功后记录已通知，投递失败的作品在下一轮巡检中重新通知"""
+    if _monitor_instance is not None and not _monitor_instance.enable_deduplication:
+        return
+    for aweme_id in notified_aweme_ids(key):
+        await notified_videos.add(aweme_id)
+
+
+on_delivered('video', _on_video_delivered)
+on_delivered('digest', _on_video_delivered)
+
+
 def init_monitor(config: Dict) -> DouyinMonitor:
     """
     初始化监控器
@@ -274,10 +684,31 @@ def init_monitor(config: Dict) -> DouyinMonitor:
     :return: 监控器实例
     """
     global _monitor_instance
+    if _monitor_instance is not None:
+        # 重新加载配置前发送旧监控器中尚未汇总发送的作品
+        _monitor_instance.digest.close()
     _monitor_instance = DouyinMonitor(config)
     return _monitor_instance
 
 
+def apply_monitor_config(old: Optional[Dict], new: Optional[Dict]) -> bool:
+    """
+    按配置差异更新监控器：只有开关变化时原地更新，其他配置变化时重新初始化，用户列表保存在数据库中，不在此处理
+    :param old: 变化前的监控配置
+    :param new: 变化后的监控配置
+    :return: 是否需要重新调度巡检任务
+    """
+    old, new = old or {}, new or {}
+    changed = {key for key in set(old) | set(new) if old.get(key) != new.get(key)} - {'users'}
+    if not changed:
+        return False
+    if _monitor_instance is None or changed != {'enabled'}:
+        init_monitor(new)
+        return True
+    _monitor_instance.enabled = new.get('enabled', False)
+    return True
+
+
 def get_monitor() -> Optional[DouyinMonitor]:
     """
     获取监控器实例
@@ -2,10 +2,20 @@
 抖音URL解析工具
 从抖音主页地址中提取sec_user_id
 """
+import asyncio
 import re
+import time
 import aiohttp
+from typing import Dict, Iterable, Optional, Tuple
 from urllib.parse import urlparse, parse_qs
 from lib.logger import logger
+from utils.metrics import cache_requests
+
+# 短链接解析复用同一个会话，解析结果缓存一段时间
+_session: Optional[aiohttp.ClientSession] = None
+_resolve_cache: Dict[str, Tuple[str, float]] = {}
+RESOLVE_CACHE_SECONDS = 86400
+RESOLVE_CACHE_SIZE = 4096
 
 
 def extract_sec_user_id_from_url(url: str) -> str:
@@ -33,22 +43,50 @@ def extract_sec_user_id_from_url(url: str) -> str:
     return ""
 
 
+def _get_session() -> aiohttp.ClientSession:
+    global _session
+    if _session is None or _session.closed:
+        _session = aiohttp.ClientSession(
+            connector=aiohttp.TCPConnector(limit=20, keepalive_timeout=60),
+            timeout=aiohttp.ClientTimeout(total=10),
+        )
+    return _session
+
+
+async def close_url_parser_session():
+    """关闭短链接解析会话"""
+    global _session
+    if _session is not None and not _session.closed:
+        await _session.close()
+    _session = None
+
+
 async def resolve_douyin_short_url(short_url: str) -> str:
     """
     解析抖音短链接，获取完整URL
     """
+    cached = _resolve_cache.get(short_url)
+    if cached and time.time() - cached[1] < RESOLVE_CACHE_SECONDS:
+        cache_requests.inc('short_url', 'hit')
+        return cached[0]
+    cache_requests.inc('short_url', 'miss')
     try:
         headers = {
             'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/126.0.0.0 Safari/537.36'
         }
         
-        async with aiohttp.ClientSession() as session:
-            async with session.get(short_url, headers=headers, allow_redirects=True) as response:
-                return str(response.url)
+        async with _get_session().get(short_url, headers=headers, allow_redirects=True) as response:
+            full_url = str(response.url)
                 
     except Exception as e:
         logger.error(f"解析短链接失败: {e}")
         return ""
+    
+    if len(_resolve_cache) >= RESOLVE_CACHE_SIZE:
+        # 淘汰最早写入的结果
+        _resolve_cache.pop(next(iter(_resolve_cache)))
+    _resolve_cache[short_url] = (full_url, time.time())
+    return full_url
 
 
 async def get_sec_user_id_from_any_url(url: str) -> str:
@@ -76,6 +114,22 @@ async def get_sec_user_id_from_any_url(url: str) -> str:
     return ""
 
 
+async def resolve_sec_user_ids(urls: Iterable[str], concurrency: int = 8) -> Dict[str, str]:
+    """
+    并发获取多个抖音URL的sec_user_id，重复的URL只解析一次
+    :param urls: 抖音URL列表
+    :param concurrency: 同时解析的短链接数
+    :return: URL到sec_user_id的映射，解析失败时为空字符串
+    """
+    semaphore = asyncio.Semaphore(concurrency)
+    
+    async def resolve(url: str) -> Tuple[str, str]:
+        async with semaphore:
+            return url, await get_sec_user_id_from_any_url(url)
+    
+    return dict(await asyncio.gather(*[resolve(url) for url in set(urls)]))
+
+
 def validate_douyin_url(url: str) -> bool:
     """
     验证是否为有效的抖音URL
@@ -0,0 +1,118 @@
+"""
+阻塞任务执行器
+签名（execjs）、HTML 解析、大段 JSON 解析等同步计算会阻塞事件循环，拖慢所有并发请求。
+按任务类型把这些调用交给线程池或进程池执行，小数据量的任务直接在事件循环中执行，
+避免线程切换的开销超过任务本身。
+"""
+import asyncio
+import contextvars
+import functools
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional
+from lib.logger import logger
+
+# 任务类型
+JS = 'js'  # execjs 签名，每次调用都会启动 JS 运行时进程，始终交给线程池
+HTML = 'html'  # BeautifulSoup 解析
+JSON = 'json'  # 大段 JSON、JSONP 解析
+HASH = 'hash'  # 签名摘要
+
+POOL_THREAD = 'thread'
+POOL_PROCESS = 'process'
+POOL_INLINE = 'inline'
+
+DEFAULT_CONFIG = {
+    'thread_workers': 8,
+    'process_workers': 2,
+    # 数据量小于该值（字节）的任务直接在事件循环中执行，为 0 时总是交给线程池或进程池
+    'inline_bytes': 32768,
+    # 各类型任务使用的执行方式：thread、process 或 inline
+    'pools': {JS: POOL_THREAD, HTML: POOL_THREAD, JSON: POOL_THREAD, HASH: POOL_INLINE},
+}
+
+
+class BlockingExecutor:
+    """按任务类型选择线程池、进程池或直接执行"""
+
+    def __init__(self, config: Optional[Dict[str, Any]] = None):
+        self._thread_pool: Optional[ThreadPoolExecutor] = None
+        self._process_pool: Optional[ProcessPoolExecutor] = None
+        self.configure(config or {})
+
+    def configure(self, config: Dict[str, Any]) -> None:
+        """
+        设置执行器，已创建的线程池和进程池会在任务完成后关闭
+        :param config: executor 配置
+        """
+        pools = dict(DEFAULT_CONFIG['pools'])
+        pools.update(config.get('pools', {}))
+        for kind, pool in pools.items():
+            if pool not in (POOL_THREAD, POOL_PROCESS, POOL_INLINE):
+                raise ValueError(f'不支持的执行方式: {kind}: {pool}')
+        # 编译后的 execjs 上下文不能跨进程传递
+        if pools.get(JS) == POOL_PROCESS:
+            pools[JS] = POOL_THREAD
+        self.pools = pools
+        self.thread_workers = max(config.get('thread_workers', DEFAULT_CONFIG['thread_workers']), 1)
+        self.process_workers = max(config.get('process_workers', DEFAULT_CONFIG['process_workers']), 1)
+        self.inline_bytes = config.get('inline_bytes', DEFAULT_CONFIG['inline_bytes'])
+        self.shutdown(wait=False)
+
+    def _pool(self, kind: str) -> Optional[Executor]:
+        pool = self.pools.get(kind, POOL_THREAD)
+        if pool == POOL_INLINE:
+            return None
+        if pool == POOL_PROCESS:
+            if self._process_pool is None:
+                self._process_pool = ProcessPoolExecutor(max_workers=self.process_workers)
+            return self._process_pool
+        if self._thread_pool is None:
+            self._thread_pool = ThreadPoolExecutor(max_workers=self.thread_workers, thread_name_prefix='blocking')
+        return self._thread_pool
+
+    async def run(self, kind: str, func: Callable, *args, size: Optional[int] = None, **kwargs) -> Any:
+        """
+        执行阻塞任务
+        :param kind: 任务类型，js、html、json、hash
+        :param func: 同步函数，使用进程池时必须是模块级函数，参数和返回值可序列化
+        :param size: 任务的数据量（字节），小于 inline_bytes 时直接执行；为 None 时按类型决定
+        :return: 函数的返回值
+        """
+        pool = self._pool(kind) if size is None or size >= self.inline_bytes else None
+        if pool is None:
+            return func(*args, **kwargs)
+        call = functools.partial(func, *args, **kwargs)
+        if isinstance(pool, ThreadPoolExecutor):
+            # 线程池中沿用当前上下文，保留请求耗时追踪
+            call = functools.partial(contextvars.copy_context().run, call)
+        return await asyncio.get_running_loop().run_in_executor(pool, call)
+
+    def shutdown(self, wait: bool = True) -> None:
+        """关闭线程池和进程池"""
+        for pool in (self._thread_pool, self._process_pool):
+            if pool is not None:
+                pool.shutdown(wait=wait, cancel_futures=not wait)
+        self._thread_pool = None
+        self._process_pool = None
+
+
+blocking_executor = BlockingExecutor()
+
+
+def configure_executor(config: Dict[str, Any]) -> None:
+    """
+    设置阻塞任务执行器
+    :param config: executor 配置
+    """
+    blocking_executor.configure(config or {})
+    logger.info(f'阻塞任务执行器: {blocking_executor.pools}，小于 {blocking_executor.inline_bytes} 字节的任务直接执行')
+
+
+async def run_blocking(kind: str, func: Callable, *args, size: Optional[int] = None, **kwargs) -> Any:
+    """
+    把阻塞任务交给全局执行器
+    :param kind: 任务类型，js、html、json、hash
+    :param func: 同步函数
+    :param size: 任务的数据量（字节），用于决定是否直接执行
+    """
+    return await blocking_executor.run(kind, func, *args, size=size, **kwargs)
@@ -0,0 +1,300 @@
+"""
+采集结果导出
+把各平台嵌套的评论、搜索、作品结果展开为类型固定的列，分块流式写入 Parquet 或压缩 JSONL 文件
+"""
+import asyncio
+import gzip
+import json
+import os
+import tempfile
+import time
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
+
+try:
+    import pyarrow
+    import pyarrow.parquet
+except ImportError:
+    pyarrow = None
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+FORMATS = {
+    'jsonl': '.jsonl',
+    'jsonl.gz': '.jsonl.gz',
+    'jsonl.zst': '.jsonl.zst',
+    'parquet': '.parquet',
+}
+
+
+class Column:
+    """导出列：列名、取值路径和类型（int、float、str、bool）"""
+
+    __slots__ = ('name', 'path', 'type')
+
+    def __init__(self, path: str, type: str = 'str', name: Optional[str] = None):
+        self.path = tuple(path.split('.'))
+        self.type = type
+        self.name = name or path.replace('.', '_')
+
+
+def _columns(*specs: Tuple[str, str]) -> List[Column]:
+    return [Column('target', 'str')] + [Column(path, type) for path, type in specs]
+
+
+_AWEME_COLUMNS = (
+    ('aweme_id', 'str'), ('desc', 'str'), ('create_time', 'int'),
+    ('statistics.digg_count', 'int'), ('statistics.comment_count', 'int'),
+    ('statistics.share_count', 'int'), ('statistics.collect_count', 'int'),
+    ('statistics.play_count', 'int'), ('author.uid', 'str'), ('author.sec_uid', 'str'),
+    ('author.nickname', 'str'),
+)
+
+SCHEMAS: Dict[Tuple[str, str], List[Column]] = {
+    ('douyin', 'comments'): _columns(
+        ('cid', 'str'), ('aweme_id', 'str'), ('text', 'str'), ('create_time', 'int'), ('digg_count', 'int'),
+        ('reply_comment_total', 'int'), ('ip_label', 'str'), ('user.uid', 'str'), ('user.sec_uid', 'str'),
+        ('user.nickname', 'str')),
+    ('kuaishou', 'comments'): _columns(
+        ('commentId', 'str'), ('content', 'str'), ('timestamp', 'int'), ('likedCount', 'int'),
+        ('subCommentCount', 'int'), ('authorId', 'str'), ('authorName', 'str')),
+    ('xhs', 'comments'): _columns(
+        ('id', 'str'), ('note_id', 'str'), ('content', 'str'), ('create_time', 'int'), ('like_count', 'int'),
+        ('sub_comment_count', 'int'), ('ip_location', 'str'), ('user_info.user_id', 'str'),
+        ('user_info.nickname', 'str')),
+    ('weibo', 'comments'): _columns(
+        ('id', 'str'), ('text_raw', 'str'), ('created_at', 'str'), ('like_counts', 'int'),
+        ('total_number', 'int'), ('source', 'str'), ('user.id', 'str'), ('user.screen_name', 'str')),
+    ('bilibili', 'comments'): _columns(
+        ('rpid', 'str'), ('oid', 'str'), ('content.message', 'str'), ('ctime', 'int'), ('like', 'int'),
+        ('rcount', 'int'), ('member.mid', 'str'), ('member.uname', 'str'),
+        ('member.level_info.current_level', 'int')),
+    ('taobao', 'comments'): _columns(
+        ('id', 'str'), ('reviewWordContent', 'str'), ('reviewDate', 'str'), ('userNick', 'str'),
+        ('skuText', 'str')),
+    ('douyin', 'search'): _columns(*[('aweme_info.' + path, type) for path, type in _AWEME_COLUMNS]),
+    ('kuaishou', 'search'): _columns(
+        ('photo.id', 'str'), ('photo.caption', 'str'), ('photo.timestamp', 'int'), ('photo.likeCount', 'int'),
+        ('photo.viewCount', 'int'), ('author.id', 'str'), ('author.name', 'str')),
+    ('xhs', 'search'): _columns(
+        ('id', 'str'), ('note_card.display_title', 'str'), ('note_card.type', 'str'),
+        ('note_card.interact_info.liked_count', 'int'), ('note_card.user.user_id', 'str'),
+        ('note_card.user.nickname', 'str')),
+    ('bilibili', 'search'): _columns(
+        ('bvid', 'str'), ('aid', 'str'), ('title', 'str'), ('pubdate', 'int'), ('play', 'int'),
+        ('like', 'int'), ('review', 'int'), ('mid', 'str'), ('author', 'str')),
+    ('weibo', 'search'): _columns(
+        ('mblog.id', 'str'), ('mblog.text', 'str'), ('mblog.created_at', 'str'), ('mblog.attitudes_count', 'int'),
+        ('mblog.comments_count', 'int'), ('mblog.reposts_count', 'int'), ('mblog.user.id', 'str'),
+        ('mblog.user.screen_name', 'str')),
+    ('taobao', 'search'): _columns(
+        ('item_id', 'str'), ('title', 'str'), ('price', 'float'), ('realSales', 'str'), ('nick', 'str'),
+        ('procity', 'str')),
+    ('jd', 'search'): _columns(
+        ('info.title', 'str'), ('info.link', 'str'), ('price', 'float'), ('tag', 'str'), ('store.title', 'str')),
+    ('douyin', 'user_posts'): _columns(*_AWEME_COLUMNS),
+}
+
+
+def get_schema(platform: str, kind: str) -> Optional[List[Column]]:
+    """
+    获取平台结果的导出列
+    :param platform: 平台名称
+    :param kind: 结果类型 comments、search、user_posts
+    :return: 导出列，不支持时返回 None
+    """
+    return SCHEMAS.get((platform, kind))
+
+
+def _to_int(value: Any) -> Optional[int]:
+    if value is None or isinstance(value, bool):
+        return None
+    if isinstance(value, (int, float)):
+        return int(value)
+    text = str(value).strip().replace(',', '').rstrip('+')
+    # 小红书、快手等平台会返回 "1.2万" 这类计数
+    for suffix, scale in (('万', 10000), ('w', 10000), ('亿', 100000000)):
+        if text.endswith(suffix):
+            try:
+                return int(float(text[:-len(suffix)]) * scale)
+            except ValueError:
+                return None
+    try:
+        return int(float(text))
+    except ValueError:
+        return None
+
+
+def _to_float(value: Any) -> Optional[float]:
+    if value is None or isinstance(value, bool):
+        return None
+    try:
+        return float(str(value).replace(',', '')) if not isinstance(value, (int, float)) else float(value)
+    except ValueError:
+        return None
+
+
+def _to_str(value: Any) -> Optional[str]:
+    if value is None:
+        return None
+    if isinstance(value, (dict, list)):
+        return json.dumps(value, ensure_ascii=False)
+    return str(value)
+
+
+def _to_bool(value: Any) -> Optional[bool]:
+    return None if value is None else bool(value)
+
+
+_CONVERTERS = {'int': _to_int, 'float': _to_float, 'str': _to_str, 'bool': _to_bool}
+
+
+def flatten(target: str, record: Dict[str, Any], schema: List[Column]) -> Dict[str, Any]:
+    """
+    按导出列展开一条记录，缺失或无法转换的字段为 None
+    :param target: 采集目标ID
+    :param record: 原始记录
+    :param schema: 导出列
+    :return: 展开后的行
+    """
+    row = {}
+    for column in schema:
+        if column.name == 'target':
+            row['target'] = target
+            continue
+        value: Any = record
+        for key in column.path:
+            if not isinstance(value, dict):
+                value = None
+                break
+            value = value.get(key)
+        row[column.name] = _CONVERTERS[column.type](value)
+    return row
+
+
+class JsonlExportWriter:
+    """JSONL 导出，支持 gzip 和 zstd 压缩"""
+
+    def __init__(self, path: str, compression: str = ''):
+        self._raw = open(path, 'wb')
+        if compression == 'gz':
+            self._file = gzip.GzipFile(fileobj=self._raw, mode='wb', compresslevel=6)
+        elif compression == 'zst':
+            if zstandard is None:
+                self._raw.close()
+                raise RuntimeError('zstd 导出需要安装 zstandard')
+            self._file = zstandard.ZstdCompressor(level=3).stream_writer(self._raw)
+        else:
+            self._file = self._raw
+
+    def write(self, rows: List[Dict[str, Any]]) -> None:
+        self._file.write(''.join(json.dumps(row, ensure_ascii=False) + '\n' for row in rows).encode('utf-8'))
+
+    def close(self) -> None:
+        if self._file is not self._raw:
+            self._file.close()
+        self._raw.close()
+
+
+class ParquetExportWriter:
+    """Parquet 导出，每个分块写为一个 row group"""
+
+    _TYPES = {'int': 'int64', 'float': 'float64', 'str': 'string', 'bool': 'bool_'}
+
+    def __init__(self, path: str, schema: List[Column]):
+        if pyarrow is None:
+            raise RuntimeError('parquet 导出需要安装 pyarrow')
+        self._schema = pyarrow.schema([(column.name, getattr(pyarrow, self._TYPES[column.type])())
+                                       for column in schema])
+        self._writer = pyarrow.parquet.ParquetWriter(path, self._schema, compression='zstd')
+
+    def write(self, rows: List[Dict[str, Any]]) -> None:
+        self._writer.write_table(pyarrow.Table.from_pylist(rows, schema=self._schema))
+
+    def close(self) -> None:
+        self._writer.close()
+
+
+def open_writer(path: str, fmt: str, schema: Optional[List[Column]]):
+    """
+    按导出格式创建写入器
+    :param path: 文件路径
+    :param fmt: jsonl、jsonl.gz、jsonl.zst、parquet
+    :param schema: 导出列，parquet 格式必须提供
+    """
+    if fmt == 'parquet':
+        if schema is None:
+            raise ValueError('parquet 导出需要结果类型对应的导出列')
+        return ParquetExportWriter(path, schema)
+    if fmt not in FORMATS:
+        raise ValueError(f'不支持的导出格式: {fmt}')
+    return JsonlExportWriter(path, fmt.split('.')[1] if '.' in fmt else '')
+
+
+async def export_records(records: AsyncIterator[Tuple[str, Dict[str, Any]]], path: str, fmt: str,
+                         schema: Optional[List[Column]], chunk_size: int = 10000) -> int:
+    """
+    流式导出记录，每积累 chunk_size 行写入一次，不在内存中构建整张表；
+    展开、编码和压缩在线程中执行，不阻塞事件循环
+    :param records: 异步迭代器，产出 (target, record)
+    :param path: 导出文件路径
+    :param fmt: 导出格式
+    :param schema: 导出列，为 None 时按原始结构导出（仅 JSONL）
+    :param chunk_size: 分块行数
+    :return: 导出行数
+    """
+    directory = os.path.dirname(path) or '.'
+    os.makedirs(directory, exist_ok=True)
+    # 临时文件名唯一，同一任务同时导出时互不覆盖
+    fd, temp_path = tempfile.mkstemp(dir=directory, prefix=os.path.basename(path) + '.', suffix='.tmp')
+    os.close(fd)
+
+    def write(writer, chunk: List[Tuple[str, Dict[str, Any]]]) -> None:
+        writer.write([flatten(target, record, schema) if schema else {'target': target, 'data': record}
+                      for target, record in chunk])
+
+    writer = None
+    count = 0
+    chunk = []
+    try:
+        writer = await asyncio.to_thread(open_writer, temp_path, fmt, schema)
+        async for target, record in records:
+            chunk.append((target, record))
+            if len(chunk) >= chunk_size:
+                await asyncio.to_thread(write, writer, chunk)
+                count += len(chunk)
+                chunk = []
+        if chunk:
+            await asyncio.to_thread(write, writer, chunk)
+            count += len(chunk)
+        await asyncio.to_thread(writer.close)
+    except BaseException:
+        if writer is not None:
+            writer.close()
+        os.remove(temp_path)
+        raise
+    os.replace(temp_path, path)
+    return count
+
+
+def remove_stale_exports(directory: str, max_age_seconds: float) -> int:
+    """
+    删除导出目录中超过 max_age_seconds 的文件，包括中断导出留下的临时文件
+    :param directory: 导出目录
+    :param max_age_seconds: 文件保留时间（秒）
+    :return: 删除的文件数
+    """
+    if not os.path.isdir(directory):
+        return 0
+    cutoff = time.time() - max_age_seconds
+    removed = 0
+    for entry in os.scandir(directory):
+        try:
+            if entry.is_file() and entry.stat().st_mtime < cutoff:
+                os.remove(entry.path)
+                removed += 1
+        except OSError:
+            pass
+    return removed
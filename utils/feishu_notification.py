@@ -4,20 +4,65 @@
 """
 
 import aiohttp
+import asyncio
 import json
+import random
+import time
+from collections import deque
+from datetime import datetime
 from lib.logger import logger
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, List, Tuple, Callable, Awaitable
+from service.monitor.models import outbox
+from utils.outbox import get_outbox_worker, outbox_delegated, notify_delivered
+
+# 飞书返回的频率限制错误码
+RATE_LIMITED_CODE = 9499
+
+# 作品数据表地址
+DATA_URL = "https://yb7ao262ru.feishu.cn/wiki/QyVqwmDZDioZmrkGZPXcYJtFn5d?table=tblzjGWgMzIbcd1p&view=vewoIQDc7P"
 
 
 class FeishuNotifier:
     """飞书通知器"""
 
-    def __init__(self, webhook_url: str):
+    def __init__(self, webhook_url: str, config: Optional[Dict[str, Any]] = None):
         """
         初始化飞书通知器
         :param webhook_url: 飞书机器人webhook地址
+        :param config: 发送配置，包含并发数、频率限制、重试次数和队列长度
         """
         self.webhook_url = webhook_url
+        self.configure(config or {})
+        # 长连接会话在首次发送时创建，复用 TLS 连接
+        self._session: Optional[aiohttp.ClientSession] = None
+        self._queue: Optional[asyncio.Queue] = None
+        self._workers: List[asyncio.Task] = []
+        self._send_times: deque = deque()
+        self._rate_lock = asyncio.Lock()
+        self.metrics = {
+            'enqueued': 0,
+            'sent': 0,
+            'failed': 0,
+            'retried': 0,
+            'dropped': 0,
+            'rate_limited': 0,
+            'last_error': '',
+            'last_sent_at': None,
+        }
+        self._latency_total = 0.0
+
+    def configure(self, config: Dict[str, Any]) -> None:
+        """
+        更新发送配置
+        :param config: 发送配置
+        """
+        self.send_concurrency = max(config.get('send_concurrency', 2), 1)
+        # 飞书自定义机器人限制为每秒 5 次、每分钟 100 次
+        self.rate_per_second = config.get('rate_per_second', 5)
+        self.rate_per_minute = config.get('rate_per_minute', 100)
+        self.max_retries = config.get('max_retries', 3)
+        self.retry_base_seconds = config.get('retry_base_seconds', 2)
+        self.queue_size = config.get('queue_size', 1000)
 
     async def send_text_message(self, content: str) -> bool:
         """
@@ -93,6 +138,14 @@ class FeishuNotifier:
         :param video_info: 视频信息字典
         :return: 是否发送成功
         """
+        return await self._send_message(self.build_card_message(video_info))
+
+    def build_card_message(self, video_info: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        构建视频卡片消息
+        :param video_info: 视频信息字典
+        :return: 消息内容
+        """
         aweme_id = video_info.get("aweme_id", "unknown")
         desc = video_info.get("desc", "无描述")
         author_info = video_info.get("author", {})
@@ -104,11 +157,9 @@ class FeishuNotifier:
 
         # 构建视频链接
         video_url = f"https://www.douyin.com/video/{aweme_id}"
-        data_url = f"https://yb7ao262ru.feishu.cn/wiki/QyVqwmDZDioZmrkGZPXcYJtFn5d?table=tblzjGWgMzIbcd1p&view=vewoIQDc7P"
+        data_url = DATA_URL
 
         # 获取视频发布时间
-        from datetime import datetime
-
         create_time = video_info.get("create_time", 0)
         if create_time:
             publish_time = datetime.fromtimestamp(create_time).strftime(
@@ -212,7 +263,93 @@ class FeishuNotifier:
                     },
                 },
             }
-        return await self._send_message(message)
+        return message
+
+    def build_digest_message(self, videos: List[Dict[str, Any]], top_n: int = 10) -> Dict[str, Any]:
+        """
+        构建汇总消息：按热度取前 top_n 个作品并按作者分组，其余作品以链接列出
+        :param videos: 视频信息列表
+        :param top_n: 详细展示的作品数
+        :return: 消息内容
+        """
+        def heat(video: Dict[str, Any]) -> int:
+            statistics = video.get("statistics", {})
+            return self._calculate_heat_score(
+                statistics.get("digg_count", 0),
+                statistics.get("comment_count", 0),
+                statistics.get("share_count", 0),
+            )
+
+        ranked = sorted(videos, key=heat, reverse=True)
+        top, overflow = ranked[:top_n], ranked[top_n:]
+        current_time = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+
+        # 按作者分组，组的顺序取组内最高热度
+        groups: Dict[str, List[Dict[str, Any]]] = {}
+        for video in top:
+            groups.setdefault(video.get("author", {}).get("nickname", "未知作者"), []).append(video)
+
+        sections = []
+        for author_name, author_videos in groups.items():
+            lines = [f"**👤 {author_name}**"]
+            for video in author_videos:
+                statistics = video.get("statistics", {})
+                # 去掉方括号，避免破坏 markdown 链接
+                desc = (video.get("desc", "") or "无描述").replace("[", "").replace("]", "")
+                lines.append(
+                    f"{self._get_hot_level(statistics.get('digg_count', 0))} "
+                    f"[{desc[:40]}{'...' if len(desc) > 40 else ''}]"
+                    f"(https://www.douyin.com/video/{video.get('aweme_id', '')})"
+                    f"  ❤️ {statistics.get('digg_count', 0):,}  🔥 {heat(video):,}"
+                )
+            sections.append("\n".join(lines))
+
+        if "/flow/api/trigger-webhook/" in self.webhook_url:
+            text = f"🔥 抖音热门作品汇总（{len(videos)} 个）\n\n" + "\n\n".join(sections)
+            if overflow:
+                text += f"\n\n还有 {len(overflow)} 个作品：\n" + "\n".join(
+                    f"https://www.douyin.com/video/{video.get('aweme_id', '')}" for video in overflow
+                )
+            text += f"\n\n🕐 检测时间：{current_time}"
+            return {"msg_type": "text", "content": {"text": text}}
+
+        elements = []
+        for section in sections:
+            elements.append({"tag": "div", "text": {"content": section, "tag": "lark_md"}})
+            elements.append({"tag": "hr"})
+        if overflow:
+            links = " ".join(
+                f"[{index}](https://www.douyin.com/video/{video.get('aweme_id', '')})"
+                for index, video in enumerate(overflow, start=len(top) + 1)
+            )
+            elements.append({
+                "tag": "div",
+                "text": {"content": f"📎 **还有 {len(overflow)} 个作品：** {links}", "tag": "lark_md"},
+            })
+        elements.append({
+            "tag": "div",
+            "text": {"content": f"🕐 **检测时间：** {current_time}", "tag": "lark_md"},
+        })
+        elements.append({
+            "actions": [{
+                "tag": "button",
+                "text": {"content": "📊 查看数据", "tag": "lark_md"},
+                "url": DATA_URL,
+                "type": "default",
+            }],
+            "tag": "action",
+        })
+        return {
+            "msg_type": "interactive",
+            "card": {
+                "config": {"wide_screen_mode": True},
+                "elements": elements,
+                "header": {
+                    "title": {"content": f"🔥 抖音热门作品汇总（{len(videos)} 个）", "tag": "plain_text"},
+                    "template": "orange",
+                },
+            },
+        }
 
     def _format_flow_message(
         self,
@@ -287,66 +424,224 @@ class FeishuNotifier:
         """
         计算综合热度值
         """
-        return digg_count + (comment_count * 2) + (share_count * 3)
+        return calculate_heat_score(digg_count, comment_count, share_count)
+
+    async def _get_session(self) -> aiohttp.ClientSession:
+        if self._session is None or self._session.closed:
+            # 跳过证书验证（开发环境），连接保持复用
+            self._session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(ssl=False, limit=self.send_concurrency, keepalive_timeout=60),
+                timeout=aiohttp.ClientTimeout(total=15),
+            )
+        return self._session
+
+    async def _wait_rate_limit(self) -> None:
+        """按每秒、每分钟的发送上限等待发送时机"""
+        async with self._rate_lock:
+            while True:
+                now = time.monotonic()
+                while self._send_times and now - self._send_times[0] >= 60:
+                    self._send_times.popleft()
+                wait = 0.0
+                if len(self._send_times) >= self.rate_per_minute:
+                    wait = self._send_times[0] + 60 - now
+                recent = [t for t in self._send_times if now - t < 1]
+                if len(recent) >= self.rate_per_second:
+                    wait = max(wait, recent[0] + 1 - now)
+                if wait <= 0:
+                    self._send_times.append(now)
+                    return
+                await asyncio.sleep(wait)
+
+    async def _post(self, message: Dict[str, Any]) -> Tuple[bool, bool, str]:
+        """
+        发送一次请求
+        :param message: 消息内容
+        :return: (是否发送成功, 失败时是否可以重试, 失败原因)
+        """
+        headers = {"Content-Type": "application/json; charset=utf-8"}
+        session = await self._get_session()
+        async with session.post(
+            self.webhook_url,
+            headers=headers,
+            data=json.dumps(message, ensure_ascii=False),
+        ) as response:
+            result = await response.json(content_type=None)
+
+            # 兼容不同类型的响应
+            if response.status == 200:
+                # 流程webhook返回格式: {"code":0,"data":{},"msg":"success"}
+                # 机器人webhook返回格式: {"code":0}
+                if (
+                    result.get("code") == 0
+                    or result.get("msg") == "success"
+                    or "success" in str(result).lower()
+                ):
+                    logger.info(f"飞书消息发送成功: {result}")
+                    return True, False, ''
+
+            error = f"status={response.status}, result={result}"
+            logger.error(f"飞书消息发送失败: {error}")
+            if response.status == 429 or result.get("code") == RATE_LIMITED_CODE:
+                self.metrics['rate_limited'] += 1
+                return False, True, error
+            return False, response.status >= 500, error
+
+    async def _send(self, message: Dict[str, Any], retries: int) -> Tuple[bool, str]:
+        """
+        发送消息到飞书，遵守频率限制，网络异常、限流和服务端错误时按指数退避重试
+        :param message: 消息内容
+        :param retries: 最多重试次数
+        :return: (是否发送成功, 最后一次失败的原因)
+        """
+        error = ''
+        for attempt in range(retries + 1):
+            await self._wait_rate_limit()
+            start = time.monotonic()
+            try:
+                success, retryable, error = await self._post(message)
+            except (aiohttp.ClientError, asyncio.TimeoutError, ValueError) as e:
+                logger.error(f"发送飞书消息时发生异常: {e}")
+                success, retryable, error = False, True, str(e)
+            except Exception as e:
+                logger.error(f"发送飞书消息时发生异常: {e}")
+                success, retryable, error = False, False, str(e)
+
+            if success:
+                self.metrics['sent'] += 1
+                self.metrics['last_sent_at'] = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+                self._latency_total += time.monotonic() - start
+                return True, ''
+            self.metrics['last_error'] = error
+            if not retryable or attempt == retries:
+                break
+            self.metrics['retried'] += 1
+            await asyncio.sleep(self.retry_base_seconds * 2 ** attempt * random.uniform(0.8, 1.2))
+
+        self.metrics['failed'] += 1
+        return False, error
 
     async def _send_message(self, message: Dict[str, Any]) -> bool:
         """
-        发送消息到飞书
+        发送消息到飞书，失败时最多重试 max_retries 次
         :param message: 消息内容
         :return: 是否发送成功
         """
+        return (await self._send(message, self.max_retries))[0]
+
+    async def deliver(self, message: Dict[str, Any]) -> Tuple[bool, str]:
+        """
+        发送一次消息，不重试，由发件箱按退避时间安排重试
+        :param message: 消息内容
+        :return: (是否发送成功, 本次发送失败的原因)
+        """
+        return await self._send(message, 0)
+
+    def enqueue(self, message: Dict[str, Any],
+                on_sent: Optional[Callable[[], Awaitable[None]]] = None) -> bool:
+        """
+        把消息放入后台发送队列，立即返回
+        :param message: 消息内容
+        :param on_sent: 发送成功后执行的回调
+        :return: 是否入队成功，队列已满时返回 False
+        """
+        if self._queue is None:
+            self._queue = asyncio.Queue(maxsize=self.queue_size)
+        if not self._workers:
+            self._workers = [asyncio.create_task(self._worker()) for _ in range(self.send_concurrency)]
         try:
-            headers = {"Content-Type": "application/json; charset=utf-8"}
-
-            # 创建SSL上下文，跳过证书验证（开发环境）
-            ssl_context = False  # 禁用SSL验证
-
-            async with aiohttp.ClientSession(
-                connector=aiohttp.TCPConnector(ssl=ssl_context)
-            ) as session:
-                async with session.post(
-                    self.webhook_url,
-                    headers=headers,
-                    data=json.dumps(message, ensure_ascii=False),
-                ) as response:
-                    result = await response.json()
-
-                    # 兼容不同类型的响应
-                    if response.status == 200:
-                        # 流程webhook返回格式: {"code":0,"data":{},"msg":"success"}
-                        # 机器人webhook返回格式: {"code":0}
-                        if (
-                            result.get("code") == 0
-                            or result.get("msg") == "success"
-                            or "success" in str(result).lower()
-                        ):
-                            logger.info(f"飞书消息发送成功: {result}")
-                            return True
-
-                    logger.error(
-                        f"飞书消息发送失败: status={response.status}, result={result}"
-                    )
-                    return False
-
-        except Exception as e:
-            logger.error(f"发送飞书消息时发生异常: {e}")
+            self._queue.put_nowait((message, on_sent))
+        except asyncio.QueueFull:
+            self.metrics['dropped'] += 1
+            logger.error("飞书发送队列已满，丢弃消息")
             return False
+        self.metrics['enqueued'] += 1
+        return True
+
+    async def _worker(self) -> None:
+        while True:
+            message, on_sent = await self._queue.get()
+            try:
+                if await self._send_message(message) and on_sent is not None:
+                    await on_sent()
+            except Exception as e:
+                logger.error(f"飞书发送队列处理消息时发生异常: {e}")
+            finally:
+                self._queue.task_done()
+
+    async def close(self, timeout: float = 10) -> None:
+        """
+        等待队列中的消息发送完成（最多 timeout 秒），然后关闭会话
+        :param timeout: 等待时间
+        """
+        if self._queue is not None and self._workers:
+            try:
+                await asyncio.wait_for(self._queue.join(), timeout)
+            except asyncio.TimeoutError:
+                logger.warning(f"飞书发送队列还有 {self._queue.qsize()} 条消息未发送")
+        for worker in self._workers:
+            worker.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+
+    def get_metrics(self) -> Dict[str, Any]:
+        """
+        获取发送指标
+        :return: 入队、成功、失败、重试、丢弃、限流次数，队列长度和平均发送耗时
+        """
+        return {
+            **self.metrics,
+            'queue_size': self._queue.qsize() if self._queue is not None else 0,
+            'avg_latency_ms': round(self._latency_total / self.metrics['sent'] * 1000, 1)
+            if self.metrics['sent'] else 0,
+        }
+
+
+def calculate_heat_score(digg_count: int, comment_count: int, share_count: int) -> int:
+    """
+    计算综合热度值
+    :param digg_count: 点赞数
+    :param comment_count: 评论数
+    :param share_count: 分享数
+    :return: 热度值
+    """
+    return digg_count + (comment_count * 2) + (share_count * 3)
 
 
 # 全局飞书通知器实例
 _feishu_notifier: Optional[FeishuNotifier] = None
 
 
-def init_feishu_notifier(webhook_url: str) -> None:
+def init_feishu_notifier(webhook_url: str, config: Optional[Dict[str, Any]] = None) -> None:
     """
-    初始化全局飞书通知器
+    初始化全局飞书通知器，webhook 不变时复用已有的会话和发送队列
     :param webhook_url: webhook地址
+    :param config: 发送配置
     """
     global _feishu_notifier
-    _feishu_notifier = FeishuNotifier(webhook_url)
+    if _feishu_notifier is not None and _feishu_notifier.webhook_url == webhook_url:
+        _feishu_notifier.configure(config or {})
+        return
+    if _feishu_notifier is not None:
+        try:
+            asyncio.get_running_loop().create_task(_feishu_notifier.close())
+        except RuntimeError:
+            pass
+    _feishu_notifier = FeishuNotifier(webhook_url, config)
     logger.info(f"飞书通知器初始化完成: {webhook_url}")
 
 
+async def close_feishu_notifier() -> None:
+    """发送完队列中的消息并关闭全局飞书通知器"""
+    global _feishu_notifier
+    if _feishu_notifier is not None:
+        await _feishu_notifier.close()
+        _feishu_notifier = None
+
+
 def get_feishu_notifier() -> Optional[FeishuNotifier]:
     """
     获取全局飞书通知器实例
@@ -367,17 +662,105 @@ async def send_video_notification(video_info: Dict[str, Any]) -> bool:
 
     return await _feishu_notifier.send_card_message(video_info)
 
-async def send_cookie_expired_notification(platform: str, account_id: str) -> bool:
+
+# 未启用发件箱时在进程内按幂等键去重，键 -> 可以再次发送的时间，投递成功后才记录
+_memory_delivered: Dict[str, float] = {}
+
+
+def _memory_key_available(key: str) -> bool:
+    now = time.time()
+    for expired in [k for k, reusable_at in _memory_delivered.items() if reusable_at <= now]:
+        del _memory_delivered[expired]
+    return key not in _memory_delivered
+
+
+async def _memory_sent(key: str, kind: str, message: Dict[str, Any], reuse_after: Optional[float]) -> None:
+    if reuse_after is not None:
+        _memory_delivered[key] = time.time() + reuse_after
+    await notify_delivered(key, kind, message)
+
+
+async def post_to_outbox(key: str, kind: str, message: Dict[str, Any],
+                         reuse_after: Optional[float] = None) -> bool:
     """
-    发送Cookie过期通知
-    :param platform: 平台名称（如：抖音、微博等）
-    :param account_id: 账号ID
-    :return: 是否发送成功
+    把通知写入发件箱，由投递协程发送，失败时按指数退避重试；未启用发件箱时放入内存发送队列
+    :param key: 幂等键，相同键的通知只投递一次
+    :param kind: 通知类型
+    :param message: 消息内容
+    :param reuse_after: 相同幂等键的通知投递成功超过该秒数后可以再次发送
+    :return: 是否已保存（包括幂等键已存在的情况）
+    """
+    worker = get_outbox_worker()
+    if worker is None and not outbox_delegated():
+        if _feishu_notifier is None:
+            return False
+        if reuse_after is not None and not _memory_key_available(key):
+            logger.info(f"通知在重复发送间隔内，跳过: {key}")
+            return True
+        return _feishu_notifier.enqueue(message, lambda: _memory_sent(key, kind, message, reuse_after))
+
+    try:
+        if await outbox.add(key, kind, message, reuse_after):
+            if worker is not None:
+                worker.notify()
+        else:
+            logger.info(f"通知已在发件箱中，跳过: {key}")
+        return True
+    except Exception as e:
+        logger.error(f"写入通知发件箱失败: {e}")
+        return False
+
+
+def notified_aweme_ids(key: str) -> List[str]:
+    """
+    从作品通知或汇总通知的幂等键中取出作品ID
+    :param key: video:{aweme_id} 或 digest:{aweme_id},{aweme_id}...
+    :return: 作品ID列表
+    """
+    return [aweme_id for aweme_id in key.split(':', 1)[-1].split(',') if aweme_id]
+
+
+async def enqueue_video_notification(video_info: Dict[str, Any], reuse_after: Optional[float] = None) -> bool:
+    """
+    把视频通知写入发件箱，不等待发送结果
+    :param video_info: 视频信息
+    :param reuse_after: 同一视频的通知投递成功超过该秒数后可以再次发送，与去重缓存时间一致
+    :return: 是否保存成功
+    """
+    if not _feishu_notifier:
+        logger.warning("飞书通知器未初始化")
+        return False
+
+    message = _feishu_notifier.build_card_message(video_info)
+    return await post_to_outbox(f"video:{video_info.get('aweme_id', '')}", "video", message, reuse_after)
+
+
+async def enqueue_digest_notification(videos: List[Dict[str, Any]], top_n: int,
+                                      reuse_after: Optional[float] = None) -> bool:
+    """
+    把热门作品汇总通知写入发件箱
+    :param videos: 视频信息列表
+    :param top_n: 详细展示的作品数
+    :param reuse_after: 相同作品的汇总投递成功超过该秒数后可以再次发送
+    :return: 是否保存成功
     """
     if not _feishu_notifier:
         logger.warning("飞书通知器未初始化")
         return False
 
+    # 幂等键包含汇总的作品ID，投递成功后据此记录已通知的作品
+    key = "digest:" + ",".join(sorted(str(video.get("aweme_id", "")) for video in videos))
+    return await post_to_outbox(key, "digest", _feishu_notifier.build_digest_message(videos, top_n), reuse_after)
+
+
+async def send_cookie_expired_notification(platform: str, account_id: str, cooldown_seconds: float = 3600) -> bool:
+    """
+    发送Cookie过期通知
+    :param platform: 平台名称（如：抖音、微博等）
+    :param account_id: 账号ID
+    :param cooldown_seconds: 同一账号的提醒间隔
+    :return: 是否已写入发件箱
+    """
     # 获取当前时间
     current_time = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
 
@@ -422,4 +805,7 @@ async def send_cookie_expired_notification(platform: str, account_id: str) -> bo
             },
         },
     }
-    return await _feishu_notifier._send_message(message)
+    # 同一账号在提醒间隔内只提醒一次，多个进程同时检测到时也只写入一次。
+    # 启用发件箱时通知器尚未初始化也会保存在发件箱中，初始化后再投递；未启用发件箱且通知器未初始化时不保存，返回 False
+    key = f"cookie:{platform}:{account_id}"
+    return await post_to_outbox(key, "cookie_expired", message, cooldown_seconds)
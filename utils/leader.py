@@ -0,0 +1,151 @@
+"""
+多进程主进程选举
+使用 uvicorn --workers 启动多个进程时，各进程竞争同一个文件锁，持有锁的进程为主进程，
+只有主进程运行定时巡检、采集任务引擎和通知投递；主进程退出后操作系统释放文件锁，其他进程接管。
+"""
+import asyncio
+import os
+from typing import Any, Awaitable, Callable, Dict, Optional
+from lib.logger import logger
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+
+class FileLock:
+    """非阻塞的进程间文件锁，进程退出时自动释放"""
+
+    def __init__(self, path: str):
+        """
+        :param path: 锁文件路径
+        """
+        self.path = path
+        self._fd: Optional[int] = None
+
+    @property
+    def locked(self) -> bool:
+        return self._fd is not None
+
+    def acquire(self) -> bool:
+        """
+        尝试获取锁，不等待
+        :return: 是否获取成功
+        """
+        if self._fd is not None:
+            return True
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o644)
+        try:
+            if fcntl is not None:
+                fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            else:
+                msvcrt.locking(fd, msvcrt.LK_NBLCK, 1)
+        except OSError:
+            os.close(fd)
+            return False
+        # 写入持有锁的进程号，便于排查
+        os.ftruncate(fd, 0)
+        os.write(fd, str(os.getpid()).encode())
+        self._fd = fd
+        return True
+
+    def release(self) -> None:
+        if self._fd is None:
+            return
+        try:
+            if fcntl is not None:
+                fcntl.flock(self._fd, fcntl.LOCK_UN)
+            else:
+                os.lseek(self._fd, 0, os.SEEK_SET)
+                msvcrt.locking(self._fd, msvcrt.LK_UNLCK, 1)
+        finally:
+            os.close(self._fd)
+            self._fd = None
+
+
+class LeaderElection:
+    """主进程选举，未选上的进程定期重试，主进程退出后接管"""
+
+    def __init__(self, lock_file: str, retry_seconds: float = 5):
+        """
+        :param lock_file: 锁文件路径
+        :param retry_seconds: 未选上时的重试间隔（秒）
+        """
+        self.lock = FileLock(lock_file)
+        self.retry_seconds = retry_seconds
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def is_leader(self) -> bool:
+        return self.lock.locked
+
+    async def start(self, on_elected: Callable[[], Awaitable[None]]) -> None:
+        """
+        参与选举，选上后执行 on_elected；未选上时在后台重试
+        :param on_elected: 成为主进程后执行的回调
+        """
+        if self.lock.acquire():
+            logger.info(f'进程 {os.getpid()} 成为主进程，运行定时任务和后台任务')
+            await on_elected()
+            return
+        logger.info(f'进程 {os.getpid()} 作为从进程运行，只处理接口请求')
+        self._task = asyncio.create_task(self._retry(on_elected))
+
+    async def _retry(self, on_elected: Callable[[], Awaitable[None]]) -> None:
+        while True:
+            await asyncio.sleep(self.retry_seconds)
+            if self.lock.acquire():
+                logger.info(f'主进程已退出，进程 {os.getpid()} 接管定时任务和后台任务')
+                try:
+                    await on_elected()
+                except Exception as e:
+                    logger.error(f'接管后台任务失败: {e}')
+                return
+
+    async def stop(self) -> None:
+        """停止重试并释放锁"""
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+        self.lock.release()
+
+
+_election: Optional[LeaderElection] = None
+
+
+async def start_leader_election(config: Dict[str, Any], on_elected: Callable[[], Awaitable[None]]) -> LeaderElection:
+    """
+    参与主进程选举
+    :param config: workers 配置，lock_file、retry_seconds
+    :param on_elected: 成为主进程后执行的回调，启动定时任务和后台任务
+    """
+    global _election
+    if _election is None:
+        _election = LeaderElection(config.get('lock_file', 'data/leader.lock'), config.get('retry_seconds', 5))
+        await _election.start(on_elected)
+    return _election
+
+
+async def stop_leader_election() -> None:
+    global _election
+    if _election is not None:
+        await _election.stop()
+        _election = None
+
+
+def is_leader() -> bool:
+    """
+    当前进程是否为主进程，未参与选举时（如脚本中直接调用）视为主进程
+    """
+    return _election is None or _election.is_leader
+
+
+def worker_status() -> Dict[str, Any]:
+    """当前进程的进程号和是否为主进程"""
+    return {'pid': os.getpid(), 'leader': is_leader()}
@@ -0,0 +1,122 @@
+"""
+事件循环阻塞监控
+事件循环中的心跳协程按固定间隔记录调度延迟；看门狗线程发现心跳超过阈值未更新时，
+抓取事件循环线程当前的调用栈，阻塞结束后把耗时和调用栈写入日志，
+用于定位 execjs 签名、BeautifulSoup 解析等阻塞事件循环的同步调用。
+"""
+import asyncio
+import sys
+import threading
+import time
+from collections import deque
+from datetime import datetime
+from typing import Any, Dict, Optional
+from lib.logger import logger
+from utils.metrics import loop_lag, loop_stalls
+from utils.profiler import stack_of
+
+
+class LoopMonitor:
+    """事件循环阻塞监控"""
+
+    def __init__(self, interval_ms: int = 100, threshold_ms: int = 200, history: int = 20):
+        """
+        :param interval_ms: 心跳间隔（毫秒）
+        :param threshold_ms: 阻塞超过该时长时记录调用栈（毫秒）
+        :param history: 保留的最近阻塞记录数
+        """
+        self.interval = interval_ms / 1000
+        self.threshold = threshold_ms / 1000
+        self.stalls: deque = deque(maxlen=history)
+        self._last_beat = time.perf_counter()
+        self._stall: Optional[Dict[str, Any]] = None
+        self._thread_id: Optional[int] = None
+        self._task: Optional[asyncio.Task] = None
+        self._stop = threading.Event()
+
+    def start(self) -> None:
+        """在事件循环线程中启动心跳协程和看门狗线程"""
+        self._thread_id = threading.get_ident()
+        self._last_beat = time.perf_counter()
+        self._stop.clear()
+        self._task = asyncio.create_task(self._beat())
+        threading.Thread(target=self._watch, name='loop-monitor', daemon=True).start()
+
+    async def stop(self) -> None:
+        self._stop.set()
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+    async def _beat(self) -> None:
+        while True:
+            await asyncio.sleep(self.interval)
+            now = time.perf_counter()
+            blocked = now - self._last_beat
+            self._last_beat = now
+            loop_lag.observe(max(blocked - self.interval, 0))
+            stall, self._stall = self._stall, None
+            if stall is not None:
+                self._finish(stall, blocked)
+
+    def _watch(self) -> None:
+        while not self._stop.wait(self.interval):
+            since = time.perf_counter() - self._last_beat
+            if since < self.interval + self.threshold or self._stall is not None:
+                continue
+            frame = sys._current_frames().get(self._thread_id)
+            if frame is None:
+                continue
+            self._stall = {
+                'started_at': datetime.fromtimestamp(time.time() - since).strftime('%Y-%m-%d %H:%M:%S'),
+                'stack': stack_of(frame),
+            }
+            del frame
+
+    def _finish(self, stall: Dict[str, Any], blocked: float) -> None:
+        stall['duration_ms'] = round((blocked - self.interval) * 1000, 1)
+        self.stalls.append(stall)
+        loop_stalls.inc()
+        logger.warning(f"事件循环阻塞 {stall['duration_ms']} ms，阻塞时的调用栈:\n  " + '\n  '.join(stall['stack']))
+
+    def get_status(self) -> Dict[str, Any]:
+        """
+        获取最近的阻塞记录
+        :return: 状态信息
+        """
+        return {
+            'interval_ms': int(self.interval * 1000),
+            'threshold_ms': int(self.threshold * 1000),
+            'running': self._task is not None and not self._task.done(),
+            'stalls': list(reversed(self.stalls)),
+        }
+
+
+_monitor: Optional[LoopMonitor] = None
+
+
+def start_loop_monitor(config: Dict[str, Any]) -> Optional[LoopMonitor]:
+    """
+    启动事件循环阻塞监控
+    :param config: loop_monitor 配置，enabled、interval_ms、threshold_ms
+    :return: 监控实例，未启用时返回 None
+    """
+    global _monitor
+    if not config.get('enabled', True) or _monitor is not None:
+        return _monitor
+    _monitor = LoopMonitor(config.get('interval_ms', 100), config.get('threshold_ms', 200))
+    _monitor.start()
+    logger.info(f'事件循环阻塞监控已启动，阈值 {_monitor.threshold * 1000:.0f} ms')
+    return _monitor
+
+
+async def stop_loop_monitor() -> None:
+    global _monitor
+    if _monitor is not None:
+        await _monitor.stop()
+        _monitor = None
+
+
+def get_loop_monitor() -> Optional[LoopMonitor]:
+    return _monitor
@@ -0,0 +1,218 @@
+"""
+运行指标
+进程内的计数器和直方图，以 Prometheus 文本格式在 /metrics 输出，不依赖第三方服务；
+记录指标只是一次字典查找和几次加法，可以在生产环境常开
+"""
+import re
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterable, List, Tuple
+
+# 上游请求耗时的默认分桶（秒）
+DEFAULT_BUCKETS = (0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+# 签名、解析等本地计算耗时的分桶（秒）
+FAST_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1)
+# 巡检耗时的分桶（秒）
+SWEEP_BUCKETS = (1, 5, 10, 30, 60, 120, 300, 600, 1800, 3600)
+
+Labels = Tuple[str, ...]
+
+
+def _escape(value: str) -> str:
+    return value.replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+
+def _format_labels(names: Iterable[str], values: Iterable[str], extra: str = '') -> str:
+    pairs = [f'{name}="{_escape(str(value))}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return '{' + ','.join(pairs) + '}' if pairs else ''
+
+
+def _format_value(value: float) -> str:
+    if value == float('inf'):
+        return '+Inf'
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Counter:
+    """计数器"""
+
+    type = 'counter'
+
+    def __init__(self, name: str, documentation: str, labelnames: Iterable[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values: Dict[Labels, float] = {}
+
+    def inc(self, *labels: str, amount: float = 1) -> None:
+        """
+        增加计数
+        :param labels: 按 labelnames 顺序的标签值
+        :param amount: 增加量
+        """
+        self._values[labels] = self._values.get(labels, 0) + amount
+
+    def samples(self) -> List[str]:
+        return [f'{self.name}{_format_labels(self.labelnames, labels)} {_format_value(value)}'
+                for labels, value in self._values.items()]
+
+
+class Histogram:
+    """直方图，只保存每个分桶的计数、总和和次数"""
+
+    type = 'histogram'
+
+    def __init__(self, name: str, documentation: str, labelnames: Iterable[str] = (),
+                 buckets: Tuple[float, ...] = DEFAULT_BUCKETS):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # 标签值到 [各分桶计数..., 总和, 次数]
+        self._values: Dict[Labels, List[float]] = {}
+
+    def observe(self, value: float, *labels: str) -> None:
+        """
+        记录一次观测值
+        :param value: 观测值
+        :param labels: 按 labelnames 顺序的标签值
+        """
+        state = self._values.get(labels)
+        if state is None:
+            state = self._values[labels] = [0] * (len(self.buckets) + 2)
+        index = bisect_left(self.buckets, value)
+        if index < len(self.buckets):
+            state[index] += 1
+        state[-2] += value
+        state[-1] += 1
+
+    @contextmanager
+    def time(self, *labels: str):
+        """记录代码块的耗时"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, *labels)
+
+    def samples(self) -> List[str]:
+        lines = []
+        for labels, state in self._values.items():
+            cumulative = 0
+            for bound, count in zip(self.buckets, state):
+                cumulative += count
+                bucket_labels = _format_labels(self.labelnames, labels, 'le="%s"' % bound)
+                lines.append(f'{self.name}_bucket{bucket_labels} {cumulative}')
+            bucket_labels = _format_labels(self.labelnames, labels, 'le="+Inf"')
+            lines.append(f'{self.name}_bucket{bucket_labels} {state[-1]}')
+            lines.append(f'{self.name}_sum{_format_labels(self.labelnames, labels)} {_format_value(state[-2])}')
+            lines.append(f'{self.name}_count{_format_labels(self.labelnames, labels)} {state[-1]}')
+        return lines
+
+
+class CallbackMetric:
+    """输出时才读取的指标，用于已有的计数，如缓存命中数、队列长度"""
+
+    def __init__(self, name: str, documentation: str, type: str, labelnames: Iterable[str],
+                 callback: Callable[[], Iterable[Tuple[Labels, float]]]):
+        self.name = name
+        self.documentation = documentation
+        self.type = type
+        self.labelnames = tuple(labelnames)
+        self.callback = callback
+
+    def samples(self) -> List[str]:
+        return [f'{self.name}{_format_labels(self.labelnames, labels)} {_format_value(value)}'
+                for labels, value in self.callback()]
+
+
+class Registry:
+    """指标注册表"""
+
+    def __init__(self):
+        self._metrics: Dict[str, object] = {}
+
+    def register(self, metric):
+        self._metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name: str, documentation: str, labelnames: Iterable[str] = ()) -> Counter:
+        return self.register(Counter(name, documentation, labelnames))
+
+    def histogram(self, name: str, documentation: str, labelnames: Iterable[str] = (),
+                  buckets: Tuple[float, ...] = DEFAULT_BUCKETS) -> Histogram:
+        return self.register(Histogram(name, documentation, labelnames, buckets))
+
+    def callback(self, name: str, documentation: str, type: str, labelnames: Iterable[str],
+                 callback: Callable[[], Iterable[Tuple[Labels, float]]]) -> CallbackMetric:
+        return self.register(CallbackMetric(name, documentation, type, labelnames, callback))
+
+    def render(self) -> str:
+        """
+        输出 Prometheus 文本格式
+        :return: 指标文本
+        """
+        lines = []
+        for metric in self._metrics.values():
+            try:
+                samples = metric.samples()
+            except Exception:
+                continue
+            lines.append(f'# HELP {metric.name} {metric.documentation}')
+            lines.append(f'# TYPE {metric.name} {metric.type}')
+            lines.extend(samples)
+        return '\n'.join(lines) + '\n'
+
+
+registry = Registry()
+
+upstream_requests = registry.counter(
+    'upstream_requests_total', '上游请求次数', ('platform', 'endpoint', 'status', 'account', 'proxy'))
+upstream_duration = registry.histogram(
+    'upstream_request_duration_seconds', '上游请求耗时', ('platform', 'endpoint'))
+sign_duration = registry.histogram(
+    'sign_duration_seconds', '请求签名耗时', ('platform',), FAST_BUCKETS)
+parse_duration = registry.histogram(
+    'parse_duration_seconds', '响应解析耗时', ('platform',), FAST_BUCKETS)
+cache_requests = registry.counter(
+    'cache_requests_total', '缓存查询次数', ('cache', 'result'))
+monitor_sweep_duration = registry.histogram(
+    'monitor_sweep_duration_seconds', '监控巡检耗时', (), SWEEP_BUCKETS)
+monitor_user_duration = registry.histogram(
+    'monitor_user_check_duration_seconds', '单个博主检查耗时', ('result',))
+monitor_users = registry.counter(
+    'monitor_user_checks_total', '博主检查次数', ('result',))
+loop_lag = registry.histogram(
+    'event_loop_lag_seconds', '事件循环调度延迟', (), FAST_BUCKETS)
+loop_stalls = registry.counter(
+    'event_loop_stalls_total', '事件循环阻塞超过阈值的次数')
+
+# 上游域名到平台名称
+PLATFORM_HOSTS = (
+    ('douyin.com', 'douyin'), ('xiaohongshu.com', 'xhs'), ('weibo.com', 'weibo'), ('weibo.cn', 'weibo'),
+    ('kuaishou.com', 'kuaishou'), ('bilibili.com', 'bilibili'), ('taobao.com', 'taobao'), ('jd.com', 'jd'),
+)
+# 路径中的作品ID、用户ID等替换为 {id}，避免标签取值无限增长
+_ID_SEGMENT = re.compile(r'/[A-Za-z0-9_-]*\d[A-Za-z0-9_-]{5,}')
+
+
+def platform_of(host: str) -> str:
+    """
+    按域名获取平台名称
+    :param host: 域名
+    """
+    for suffix, platform in PLATFORM_HOSTS:
+        if host.endswith(suffix):
+            return platform
+    return host
+
+
+def normalize_endpoint(path: str) -> str:
+    """
+    规范化请求路径，去掉查询参数并替换ID
+    :param path: 请求路径
+    """
+    return _ID_SEGMENT.sub('/{id}', path.split('?', 1)[0]) or '/'
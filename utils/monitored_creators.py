@@ -0,0 +1,204 @@
+"""
+监控博主存储
+博主列表保存在 SQLite 中，按 sec_user_id 唯一索引去重，增删改只影响单行；config.yaml 只保留全局设置
+"""
+import json
+import sqlite3
+import time
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+from lib.logger import logger
+from utils.sqlite_store import SqliteStore
+
+# 对外返回的博主字段，与原 config.yaml 中 users 的字段一致
+CREATOR_FIELDS = ('sec_user_id', 'profile_url', 'nickname', 'like_threshold', 'enabled', 'velocity')
+
+
+class MonitoredCreatorStore(SqliteStore):
+    """监控博主存储"""
+
+    SCHEMA = '''
+    CREATE TABLE IF NOT EXISTS monitored_creators (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        sec_user_id TEXT NOT NULL,
+        profile_url TEXT NOT NULL DEFAULT '',
+        nickname TEXT NOT NULL DEFAULT '',
+        like_threshold INTEGER NOT NULL,
+        enabled INTEGER NOT NULL DEFAULT 1,
+        velocity TEXT,
+        created_at REAL NOT NULL,
+        updated_at REAL NOT NULL
+    );
+    CREATE UNIQUE INDEX IF NOT EXISTS idx_monitored_creators_user ON monitored_creators(sec_user_id);
+    '''
+
+    @staticmethod
+    def _to_creator(row: Any) -> Dict[str, Any]:
+        creator = dict(row)
+        creator['enabled'] = bool(creator['enabled'])
+        creator['velocity'] = json.loads(creator['velocity']) if creator['velocity'] else None
+        return creator
+
+    @staticmethod
+    def _to_row(creator: Dict[str, Any]) -> Tuple:
+        velocity = creator.get('velocity')
+        return (creator['sec_user_id'], creator.get('profile_url') or '', creator.get('nickname') or '',
+                int(creator.get('like_threshold', 10000)), 1 if creator.get('enabled', True) else 0,
+                json.dumps(velocity, ensure_ascii=False) if velocity is not None else None)
+
+    async def count(self, keyword: str = '') -> int:
+        db = await self.connect()
+        sql, params = 'SELECT COUNT(*) FROM monitored_creators', ()
+        if keyword:
+            sql += ' WHERE nickname LIKE ? OR sec_user_id = ?'
+            params = (f'%{keyword}%', keyword)
+        async with db.execute(sql, params) as cursor:
+            return (await cursor.fetchone())[0]
+
+    async def list(self, offset: int = 0, limit: int = 20, keyword: str = '') -> List[Dict[str, Any]]:
+        """
+        分页获取博主，按添加顺序排列
+        :param offset: 偏移量
+        :param limit: 每页条数
+        :param keyword: 按昵称模糊匹配或按 sec_user_id 精确匹配，为空时不限
+        """
+        db = await self.connect()
+        sql, params = 'SELECT * FROM monitored_creators', ()
+        if keyword:
+            sql += ' WHERE nickname LIKE ? OR sec_user_id = ?'
+            params = (f'%{keyword}%', keyword)
+        async with db.execute(sql + ' ORDER BY id LIMIT ? OFFSET ?', params + (limit, offset)) as cursor:
+            return [self._to_creator(row) for row in await cursor.fetchall()]
+
+    async def load_all(self) -> List[Dict[str, Any]]:
+        """获取所有博主，用于巡检和导出"""
+        db = await self.connect()
+        async with db.execute('SELECT * FROM monitored_creators ORDER BY id') as cursor:
+            return [self._to_creator(row) for row in await cursor.fetchall()]
+
+    async def get(self, id: int) -> Optional[Dict[str, Any]]:
+        db = await self.connect()
+        async with db.execute('SELECT * FROM monitored_creators WHERE id = ?', (id,)) as cursor:
+            row = await cursor.fetchone()
+        return self._to_creator(row) if row else None
+
+    async def existing(self, sec_user_ids: Iterable[str]) -> Set[str]:
+        """
+        查询已存在的博主
+        :param sec_user_ids: 博主ID列表
+        :return: 其中已存在的博主ID
+        """
+        db = await self.connect()
+        ids = list(sec_user_ids)
+        found = set()
+        # 分批查询，避免超过 SQLite 的参数个数上限
+        for start in range(0, len(ids), 500):
+            chunk = ids[start:start + 500]
+            async with db.execute(
+                    f'SELECT sec_user_id FROM monitored_creators WHERE sec_user_id IN ({", ".join("?" * len(chunk))})',
+                    chunk) as cursor:
+                found.update(row['sec_user_id'] for row in await cursor.fetchall())
+        return found
+
+    async def add(self, creator: Dict[str, Any]) -> Optional[int]:
+        """
+        添加博主
+        :param creator: 博主信息，包含 sec_user_id
+        :return: 博主ID，sec_user_id 已存在时返回 None
+        """
+        db = await self.connect()
+        now = time.time()
+        async with self.lock:
+            try:
+                cursor = await db.execute(
+                    '''INSERT INTO monitored_creators
+                       (sec_user_id, profile_url, nickname, like_threshold, enabled, velocity, created_at, updated_at)
+                       VALUES (?, ?, ?, ?, ?, ?, ?, ?)''', self._to_row(creator) + (now, now))
+            except sqlite3.IntegrityError:
+                return None
+            await db.commit()
+        return cursor.lastrowid
+
+    async def update(self, id: int, creator: Dict[str, Any]) -> bool:
+        """
+        更新博主
+        :param id: 博主ID
+        :param creator: 博主信息
+        :return: 是否更新成功
+        :raises ValueError: sec_user_id 与其他博主重复
+        """
+        db = await self.connect()
+        async with self.lock:
+            try:
+                cursor = await db.execute(
+                    '''UPDATE monitored_creators SET sec_user_id = ?, profile_url = ?, nickname = ?, like_threshold = ?,
+                       enabled = ?, velocity = ?, updated_at = ? WHERE id = ?''',
+                    self._to_row(creator) + (time.time(), id))
+            except sqlite3.IntegrityError:
+                raise ValueError('该用户已存在')
+            await db.commit()
+        return cursor.rowcount == 1
+
+    async def delete(self, id: int) -> Optional[Dict[str, Any]]:
+        """
+        删除博主
+        :param id: 博主ID
+        :return: 被删除的博主，不存在时返回 None
+        """
+        creator = await self.get(id)
+        if creator is None:
+            return None
+        db = await self.connect()
+        async with self.lock:
+            await db.execute('DELETE FROM monitored_creators WHERE id = ?', (id,))
+            await db.commit()
+        return creator
+
+    async def bulk_upsert(self, creators: List[Dict[str, Any]], overwrite: bool = False) -> Tuple[int, int]:
+        """
+        在一个事务中批量导入博主
+        :param creators: 博主列表，每项包含 sec_user_id
+        :param overwrite: sec_user_id 已存在时是否覆盖，否则跳过；覆盖时只更新导入时提供的字段，
+            未提供的速度规则和为空的昵称、主页地址保留原值
+        :return: (新增数, 覆盖数)
+        """
+        db = await self.connect()
+        now = time.time()
+        added = updated = 0
+        async with self.lock:
+            try:
+                for creator in creators:
+                    row = self._to_row(creator)
+                    cursor = await db.execute(
+                        '''INSERT OR IGNORE INTO monitored_creators
+                           (sec_user_id, profile_url, nickname, like_threshold, enabled, velocity, created_at,
+                            updated_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?)''', row + (now, now))
+                    if cursor.rowcount == 1:
+                        added += 1
+                    elif overwrite:
+                        await db.execute(
+                            '''UPDATE monitored_creators SET profile_url = COALESCE(NULLIF(?, ''), profile_url),
+                               nickname = COALESCE(NULLIF(?, ''), nickname), like_threshold = ?, enabled = ?,
+                               velocity = COALESCE(?, velocity), updated_at = ? WHERE sec_user_id = ?''',
+                            row[1:] + (now, row[0]))
+                        updated += 1
+                await db.commit()
+            except Exception:
+                await db.rollback()
+                raise
+        return added, updated
+
+
+async def migrate_config_users(store: MonitoredCreatorStore) -> int:
+    """
+    把 config.yaml 中 douyin_monitor.users 的博主导入存储，并从配置文件中移除
+    :param store: 监控博主存储
+    :return: 导入的博主数
+    """
+    from utils.config_service import config_service
+    users = [user for user in config_service.get('douyin_monitor.users', []) if user.get('sec_user_id')]
+    if not users:
+        return 0
+    added, _ = await store.bulk_upsert(users)
+    await config_service.update(lambda config: config.get('douyin_monitor', {}).pop('users', None))
+    logger.info(f'已把配置文件中的 {len(users)} 个监控用户迁移到数据库，新增 {added} 个')
+    return added
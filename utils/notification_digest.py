@@ -0,0 +1,81 @@
+"""
+热门作品通知汇总
+一轮巡检或一个时间窗口内命中的作品先缓存，结束时合并为一条汇总消息发送，避免逐条发送触发飞书限流
+"""
+import asyncio
+from typing import Any, Dict, List, Optional
+from lib.logger import logger
+from utils.feishu_notification import get_feishu_notifier, enqueue_video_notification, enqueue_digest_notification
+
+
+class DigestAggregator:
+    """热门作品通知汇总器"""
+
+    def __init__(self, config: Dict[str, Any]):
+        """
+        :param config: feishu.digest 配置
+        """
+        self.enabled = config.get('enabled', False)
+        # sweep：每轮巡检结束时发送；window：每 window_minutes 分钟发送一次
+        self.mode = config.get('mode', 'sweep')
+        self.window_seconds = config.get('window_minutes', 10) * 60
+        self.top_n = config.get('top_n', 10)
+        # 命中作品数少于该值时仍逐条发送卡片
+        self.min_videos = config.get('min_videos', 2)
+        # 发件箱中相同作品的通知投递成功超过该秒数后可以再次发送，由监控器按去重缓存时间设置
+        self.key_ttl: Optional[float] = None
+        self._buffer: List[Dict[str, Any]] = []
+        self._timer: Optional[asyncio.Task] = None
+
+    def add(self, video: Dict[str, Any]) -> bool:
+        """
+        缓存命中的作品
+        :param video: 视频信息
+        :return: 是否缓存成功
+        """
+        if get_feishu_notifier() is None:
+            logger.warning("飞书通知器未初始化")
+            return False
+        self._buffer.append(video)
+        if self.mode == 'window' and self._timer is None:
+            self._timer = asyncio.create_task(self._flush_later())
+        return True
+
+    def contains(self, aweme_id: str) -> bool:
+        """作品是否已缓存、等待汇总发送"""
+        return any(video.get('aweme_id') == aweme_id for video in self._buffer)
+
+    async def _flush_later(self) -> None:
+        try:
+            await asyncio.sleep(self.window_seconds)
+        finally:
+            self._timer = None
+        await self.flush()
+
+    async def flush(self) -> int:
+        """
+        把缓存的作品合并为一条汇总消息写入发件箱，投递成功后由监控器记录已通知
+        :return: 汇总的作品数
+        """
+        videos, self._buffer = self._buffer, []
+        if not videos:
+            return 0
+        if len(videos) < self.min_videos:
+            for video in videos:
+                await enqueue_video_notification(video, self.key_ttl)
+        else:
+            await enqueue_digest_notification(videos, self.top_n, self.key_ttl)
+            logger.info(f"已汇总 {len(videos)} 个热门作品为一条通知")
+        return len(videos)
+
+    def close(self) -> None:
+        """取消定时发送并立即发送缓存的作品"""
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        if not self._buffer:
+            return
+        try:
+            asyncio.get_running_loop().create_task(self.flush())
+        except RuntimeError:
+            logger.warning(f"没有运行中的事件循环，丢弃 {len(self._buffer)} 个未汇总的作品")
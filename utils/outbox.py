@@ -0,0 +1,306 @@
+"""
+飞书通知发件箱
+通知先写入 SQLite 再由后台协程投递，失败按指数退避重试，超过最大次数转为死信，进程重启后继续投递未完成的通知
+"""
+import asyncio
+import json
+import time
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+from lib.logger import logger
+from utils.sqlite_store import SqliteStore
+
+
+class OutboxStore(SqliteStore):
+    """通知发件箱存储"""
+
+    SCHEMA = '''
+    CREATE TABLE IF NOT EXISTS outbox (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        key TEXT NOT NULL UNIQUE,
+        kind TEXT NOT NULL,
+        payload TEXT NOT NULL,
+        status TEXT NOT NULL,
+        attempts INTEGER NOT NULL DEFAULT 0,
+        next_attempt_at REAL NOT NULL,
+        last_error TEXT NOT NULL DEFAULT '',
+        created_at REAL NOT NULL,
+        updated_at REAL NOT NULL
+    );
+    CREATE INDEX IF NOT EXISTS idx_outbox_due ON outbox(status, next_attempt_at);
+    '''
+
+    async def add(self, key: str, kind: str, message: Dict[str, Any], reuse_after: Optional[float] = None) -> bool:
+        """
+        写入一条待投递的通知，相同幂等键的通知只写入一次
+        :param key: 幂等键，如 video:{aweme_id}、cookie:{platform}:{account_id}
+        :param kind: 通知类型
+        :param message: 飞书消息内容
+        :param reuse_after: 相同幂等键的通知投递成功超过该秒数后可以再次写入，为 None 时在清理前不再写入
+        :return: 是否为新写入的通知
+        """
+        db = await self.connect()
+        now = time.time()
+        payload = json.dumps(message, ensure_ascii=False)
+        async with self.lock:
+            if reuse_after is None:
+                cursor = await db.execute(
+                    '''INSERT OR IGNORE INTO outbox (key, kind, payload, status, next_attempt_at, created_at, updated_at)
+                       VALUES (?, ?, ?, 'pending', ?, ?, ?)''',
+                    (key, kind, payload, now, now, now))
+            else:
+                cursor = await db.execute(
+                    '''INSERT INTO outbox (key, kind, payload, status, next_attempt_at, created_at, updated_at)
+                       VALUES (?, ?, ?, 'pending', ?, ?, ?)
+                       ON CONFLICT(key) DO UPDATE SET kind = excluded.kind, payload = excluded.payload,
+                           status = 'pending', attempts = 0, next_attempt_at = excluded.next_attempt_at,
+                           last_error = '', created_at = excluded.created_at, updated_at = excluded.updated_at
+                       WHERE outbox.status = 'sent' AND outbox.updated_at <= ?''',
+                    (key, kind, payload, now, now, now, now - reuse_after))
+            await db.commit()
+        return cursor.rowcount == 1
+
+    async def claim_due(self, limit: int) -> List[Dict[str, Any]]:
+        """
+        获取已到投递时间的通知
+        :param limit: 最多获取的条数
+        """
+        db = await self.connect()
+        async with db.execute(
+                '''SELECT id, key, kind, payload, attempts FROM outbox
+                   WHERE status = 'pending' AND next_attempt_at <= ? ORDER BY next_attempt_at LIMIT ?''',
+                (time.time(), limit)) as cursor:
+            rows = [dict(row) for row in await cursor.fetchall()]
+        for row in rows:
+            row['payload'] = json.loads(row['payload'])
+        return rows
+
+    async def next_due_at(self) -> Optional[float]:
+        """最近一条待投递通知的投递时间"""
+        db = await self.connect()
+        async with db.execute("SELECT MIN(next_attempt_at) FROM outbox WHERE status = 'pending'") as cursor:
+            return (await cursor.fetchone())[0]
+
+    async def mark_sent(self, id: int) -> None:
+        db = await self.connect()
+        async with self.lock:
+            await db.execute("UPDATE outbox SET status = 'sent', attempts = attempts + 1, last_error = '', "
+                             "updated_at = ? WHERE id = ?", (time.time(), id))
+            await db.commit()
+
+    async def mark_failed(self, id: int, error: str, next_attempt_at: Optional[float]) -> None:
+        """
+        记录投递失败
+        :param next_attempt_at: 下次投递时间，为 None 时转为死信
+        """
+        db = await self.connect()
+        async with self.lock:
+            await db.execute(
+                '''UPDATE outbox SET status = ?, attempts = attempts + 1, last_error = ?, next_attempt_at = ?,
+                   updated_at = ? WHERE id = ?''',
+                ('dead' if next_attempt_at is None else 'pending', error, next_attempt_at or 0, time.time(), id))
+            await db.commit()
+
+    async def list(self, status: str = '', offset: int = 0, limit: int = 20) -> List[Dict[str, Any]]:
+        """
+        分页获取通知，按写入时间倒序
+        :param status: pending、sent、dead，为空时不限
+        """
+        db = await self.connect()
+        sql = 'SELECT id, key, kind, status, attempts, next_attempt_at, last_error, created_at, updated_at FROM outbox'
+        params: tuple = ()
+        if status:
+            sql += ' WHERE status = ?'
+            params = (status,)
+        async with db.execute(sql + ' ORDER BY id DESC LIMIT ? OFFSET ?', params + (limit, offset)) as cursor:
+            return [dict(row) for row in await cursor.fetchall()]
+
+    async def count_by_status(self) -> Dict[str, int]:
+        db = await self.connect()
+        async with db.execute('SELECT status, COUNT(*) AS count FROM outbox GROUP BY status') as cursor:
+            return {row['status']: row['count'] for row in await cursor.fetchall()}
+
+    async def replay(self, id: Optional[int] = None) -> int:
+        """
+        把死信放回投递队列
+        :param id: 通知ID，为 None 时重新投递所有死信
+        :return: 重新投递的条数
+        """
+        db = await self.connect()
+        now = time.time()
+        sql = "UPDATE outbox SET status = 'pending', attempts = 0, next_attempt_at = ?, updated_at = ? WHERE status = 'dead'"
+        params: tuple = (now, now)
+        if id is not None:
+            sql += ' AND id = ?'
+            params += (id,)
+        async with self.lock:
+            cursor = await db.execute(sql, params)
+            await db.commit()
+        return cursor.rowcount
+
+    async def prune(self, before: float) -> int:
+        """删除 before 之前已投递的通知，幂等键随之失效"""
+        db = await self.connect()
+        async with self.lock:
+            cursor = await db.execute("DELETE FROM outbox WHERE status = 'sent' AND updated_at < ?", (before,))
+            await db.commit()
+        return cursor.rowcount
+
+
+class OutboxWorker:
+    """发件箱投递协程"""
+
+    def __init__(self, store: OutboxStore, config: Dict[str, Any]):
+        """
+        :param store: 发件箱存储
+        :param config: outbox 配置
+        """
+        self.store = store
+        self.batch_size = config.get('batch_size', 20)
+        self.max_attempts = config.get('max_attempts', 8)
+        self.retry_base_seconds = config.get('retry_base_seconds', 30)
+        self.retry_max_seconds = config.get('retry_max_seconds', 3600)
+        self.poll_seconds = config.get('poll_seconds', 10)
+        self.retention_days = config.get('retention_days', 7)
+        self._wakeup = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+            logger.info('通知发件箱投递协程已启动')
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+        await self.store.close()
+
+    def notify(self) -> None:
+        """有新通知时立即唤醒投递协程"""
+        self._wakeup.set()
+
+    async def _run(self) -> None:
+        last_prune = 0.0
+        while True:
+            try:
+                if time.time() - last_prune > 3600:
+                    await self.store.prune(time.time() - self.retention_days * 86400)
+                    last_prune = time.time()
+                delivered = await self._deliver_due()
+                if delivered:
+                    continue
+                next_due = await self.store.next_due_at()
+                timeout = self.poll_seconds if next_due is None else min(max(next_due - time.time(), 0.1),
+                                                                         self.poll_seconds)
+                self._wakeup.clear()
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), timeout=timeout)
+                except asyncio.TimeoutError:
+                    pass
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f'通知发件箱投递时发生异常: {e}')
+                await asyncio.sleep(self.poll_seconds)
+
+    async def _deliver_due(self) -> int:
+        # 延迟导入，避免与通知模块循环导入
+        from utils.feishu_notification import get_feishu_notifier
+        notifier = get_feishu_notifier()
+        if notifier is None:
+            return 0
+        rows = await self.store.claim_due(self.batch_size)
+        if not rows:
+            return 0
+
+        async def deliver(row: Dict[str, Any]):
+            # 重试由发件箱按退避时间安排，发送时不再重试
+            success, error = await notifier.deliver(row['payload'])
+            if success:
+                await self.store.mark_sent(row['id'])
+                await notify_delivered(row['key'], row['kind'], row['payload'])
+                return
+            attempts = row['attempts'] + 1
+            if attempts >= self.max_attempts:
+                logger.error(f"通知投递失败次数过多，转为死信: {row['key']}")
+                await self.store.mark_failed(row['id'], error, None)
+                return
+            delay = min(self.retry_base_seconds * 2 ** (attempts - 1), self.retry_max_seconds)
+            await self.store.mark_failed(row['id'], error, time.time() + delay)
+
+        # 发送协程数与通知器一致，频率限制由通知器保证
+        semaphore = asyncio.Semaphore(notifier.send_concurrency)
+
+        async def bounded(row: Dict[str, Any]):
+            async with semaphore:
+                await deliver(row)
+
+        await asyncio.gather(*[bounded(row) for row in rows])
+        return len(rows)
+
+
+_worker: Optional[OutboxWorker] = None
+# 通知投递成功后的回调，按通知类型注册，参数为幂等键和消息内容
+_delivered_handlers: Dict[str, List[Callable[[str, Dict[str, Any]], Awaitable[None]]]] = {}
+# 多进程部署时由主进程投递，其他进程只把通知写入发件箱
+_delegated = False
+
+
+def start_outbox_worker(store: OutboxStore, config: Dict[str, Any]) -> OutboxWorker:
+    """
+    启动全局发件箱投递协程
+    :param store: 发件箱存储
+    :param config: outbox 配置
+    """
+    global _worker
+    if _worker is None:
+        _worker = OutboxWorker(store, config)
+        _worker.start()
+    return _worker
+
+
+async def stop_outbox_worker() -> None:
+    """停止全局发件箱投递协程"""
+    global _worker
+    if _worker is not None:
+        await _worker.stop()
+        _worker = None
+
+
+def get_outbox_worker() -> Optional[OutboxWorker]:
+    """获取全局发件箱投递协程"""
+    return _worker
+
+
+def delegate_outbox() -> None:
+    """启用发件箱但当前进程可能不运行投递协程时调用，通知仍写入发件箱，由主进程投递"""
+    global _delegated
+    _delegated = True
+
+
+def outbox_delegated() -> bool:
+    return _delegated
+
+
+def on_delivered(kind: str, handler: Callable[[str, Dict[str, Any]], Awaitable[None]]) -> None:
+    """
+    注册通知投递成功后的回调，如记录已通知的作品
+    :param kind: 通知类型
+    :param handler: 回调，参数为幂等键和消息内容
+    """
+    _delivered_handlers.setdefault(kind, []).append(handler)
+
+
+async def notify_delivered(key: str, kind: str, message: Dict[str, Any]) -> None:
+    """
+    通知投递成功后执行该类型的回调，发件箱和内存发送队列共用
+    :param key: 幂等键
+    :param kind: 通知类型
+    :param message: 消息内容
+    """
+    for handler in _delivered_handlers.get(kind, []):
+        try:
+            await handler(key, message)
+        except Exception as e:
+            logger.error(f'通知投递后的回调执行失败: {key}: {e}')
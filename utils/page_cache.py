@@ -0,0 +1,180 @@
+"""
+搜索分页缓存
+按 (platform, account, keyword, page) 缓存上游分页结果，第 N 页成功且满页、不是最后一页时预取第 N+1 页
+"""
+import asyncio
+import hashlib
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional, Set
+from lib.logger import logger
+from utils.metrics import cache_requests
+
+Fetcher = Callable[[], Awaitable[Any]]
+
+
+class PageCache:
+    """分页缓存，带 TTL、LRU 淘汰、并发上限和请求合并"""
+
+    def __init__(self, ttl_seconds: int = 300, max_entries: int = 1000, concurrency: int = 4, prefetch: bool = True):
+        """
+        初始化分页缓存
+        :param ttl_seconds: 缓存有效期（秒），为0时不缓存
+        :param max_entries: 最多缓存的分页数
+        :param concurrency: 同时请求上游的最大并发数
+        :param prefetch: 是否预取下一页
+        """
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.concurrency = concurrency
+        self.prefetch_enabled = prefetch
+        self.hits = 0
+        self.misses = 0
+        self._entries: OrderedDict = OrderedDict()
+        self._inflight: Dict[Hashable, asyncio.Future] = {}
+        self._background: Set[asyncio.Task] = set()
+        self._semaphore: Optional[asyncio.Semaphore] = None
+
+    def configure(self, config: Dict) -> None:
+        """
+        根据配置更新缓存参数
+        :param config: page_cache 配置
+        """
+        self.ttl_seconds = config.get('ttl_seconds', self.ttl_seconds)
+        self.max_entries = config.get('max_entries', self.max_entries)
+        self.concurrency = max(config.get('concurrency', self.concurrency), 1)
+        self.prefetch_enabled = config.get('prefetch', self.prefetch_enabled)
+        self._semaphore = None
+        self._entries.clear()
+
+    def _lookup(self, key: Hashable) -> tuple[bool, Any]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return False, None
+        value, expire_at = entry
+        if expire_at < time.time():
+            del self._entries[key]
+            return False, None
+        self._entries.move_to_end(key)
+        return True, value
+
+    def _store(self, key: Hashable, value: Any) -> None:
+        if self.ttl_seconds <= 0:
+            return
+        self._entries[key] = (value, time.time() + self.ttl_seconds)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    async def _fetch(self, key: Hashable, fetcher: Fetcher, cacheable: Callable[[Any], bool]) -> Any:
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.concurrency)
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        try:
+            async with self._semaphore:
+                value = await fetcher()
+            if cacheable(value):
+                self._store(key, value)
+            future.set_result(value)
+            return value
+        except Exception as e:
+            future.set_exception(e)
+            # 没有其他等待者时避免 "exception was never retrieved" 警告
+            future.exception()
+            raise
+        finally:
+            self._inflight.pop(key, None)
+
+    async def get(self, key: Hashable, fetcher: Fetcher, cacheable: Callable[[Any], bool] = bool) -> Any:
+        """
+        获取分页数据，命中缓存直接返回，相同分页的并发请求只请求一次上游
+        :param key: 缓存键，如 (platform, account_key(cookie), keyword, page)
+        :param fetcher: 无参数的协程函数，返回分页数据
+        :param cacheable: 判断结果是否可以缓存，默认不缓存空结果
+        :return: 分页数据
+        """
+        found, value = self._lookup(key)
+        if found:
+            self.hits += 1
+            cache_requests.inc('page', 'hit')
+            return value
+        inflight = self._inflight.get(key)
+        if inflight is not None:
+            self.hits += 1
+            cache_requests.inc('page', 'coalesced')
+            return await asyncio.shield(inflight)
+        self.misses += 1
+        cache_requests.inc('page', 'miss')
+        return await self._fetch(key, fetcher, cacheable)
+
+    def prefetch(self, key: Hashable, fetcher: Fetcher, cacheable: Callable[[Any], bool] = bool) -> None:
+        """
+        在后台预取分页数据，已缓存或正在请求时忽略
+        :param key: 缓存键
+        :param fetcher: 无参数的协程函数
+        :param cacheable: 判断结果是否可以缓存
+        """
+        if not self.prefetch_enabled or self.ttl_seconds <= 0:
+            return
+        if self._lookup(key)[0] or key in self._inflight:
+            return
+        task = asyncio.create_task(self._prefetch(key, fetcher, cacheable))
+        self._background.add(task)
+        task.add_done_callback(self._background.discard)
+
+    async def _prefetch(self, key: Hashable, fetcher: Fetcher, cacheable: Callable[[Any], bool]) -> None:
+        try:
+            await self._fetch(key, fetcher, cacheable)
+        except Exception as e:
+            logger.warning(f'prefetch page failed, key: {key}, err: {e}')
+
+    def get_status(self) -> Dict:
+        """
+        获取缓存状态
+        :return: 状态信息
+        """
+        return {
+            'entries': len(self._entries),
+            'inflight': len(self._inflight),
+            'hits': self.hits,
+            'misses': self.misses,
+            'ttl_seconds': self.ttl_seconds,
+            'concurrency': self.concurrency,
+            'prefetch': self.prefetch_enabled,
+        }
+
+
+page_cache = PageCache()
+
+
+def account_key(cookie: str) -> str:
+    """
+    生成缓存键中的账号部分，不同账号的搜索结果互不共用，缓存键中不保存原始 cookie
+    :param cookie: 请求使用的 cookie
+    :return: cookie 摘要
+    """
+    return hashlib.sha256(cookie.encode('utf-8')).hexdigest()[:16]
+
+
+def is_full_page(count: int, page_size: int, fetched: int = 0, total: int = 0) -> bool:
+    """
+    判断是否需要预取下一页：本页请求成功且满页，并且还没有读到总数
+    :param count: 本页条数，请求失败时为0
+    :param page_size: 每页条数
+    :param fetched: 读完本页后的累计条数
+    :param total: 上游返回的总条数，未知时为0
+    """
+    if count < page_size:
+        return False
+    return not total or fetched < total
+
+
+def init_page_cache(config: Dict) -> PageCache:
+    """
+    初始化分页缓存
+    :param config: page_cache 配置
+    :return: 分页缓存实例
+    """
+    page_cache.configure(config or {})
+    return page_cache
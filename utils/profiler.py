@@ -0,0 +1,125 @@
+"""
+采样性能分析
+后台线程按固定间隔读取各线程的调用栈并计数，输出 collapsed stack 格式（每行“栈;栈;栈 次数”），
+可直接交给 flamegraph.pl、speedscope 等工具生成火焰图。不依赖第三方库，只在分析期间有开销。
+"""
+import os
+import sys
+import threading
+import time
+from collections import Counter
+from typing import Dict, List, Optional
+
+# 事件循环或线程空闲等待时所在的函数，默认不计入采样
+IDLE_FUNCTIONS = {
+    ('selectors.py', 'select'), ('runners.py', 'run'), ('threading.py', 'wait'),
+    ('threading.py', '_wait_for_tstate_lock'), ('queue.py', 'get'), ('thread.py', '_worker'),
+}
+
+_cwd = os.getcwd() + os.sep
+
+
+def frame_name(frame) -> str:
+    """栈帧的显示名称：函数名和所在文件，项目内的文件使用相对路径"""
+    code = frame.f_code
+    filename = code.co_filename
+    if filename.startswith(_cwd):
+        filename = filename[len(_cwd):]
+    else:
+        filename = os.sep.join(filename.split(os.sep)[-2:])
+    return f'{code.co_name} ({filename}:{code.co_firstlineno})'
+
+
+def stack_of(frame, limit: int = 128) -> List[str]:
+    """
+    从最外层到最内层的调用栈
+    :param frame: 最内层栈帧
+    :param limit: 最多保留的层数
+    """
+    stack = []
+    while frame is not None and len(stack) < limit:
+        stack.append(frame_name(frame))
+        frame = frame.f_back
+    stack.reverse()
+    return stack
+
+
+def _is_idle(frame) -> bool:
+    return (os.path.basename(frame.f_code.co_filename), frame.f_code.co_name) in IDLE_FUNCTIONS
+
+
+class SamplingProfiler:
+    """采样性能分析器，同一时间只允许一个会话"""
+
+    def __init__(self, interval: float = 0.01, include_idle: bool = False):
+        """
+        :param interval: 采样间隔（秒）
+        :param include_idle: 是否计入空闲等待的采样
+        """
+        self.interval = interval
+        self.include_idle = include_idle
+        self.samples: Counter = Counter()
+        self.total = 0
+        self.duration = 0.0
+
+    def run(self, seconds: float) -> None:
+        """
+        在当前线程中采样其他线程，阻塞 seconds 秒
+        :param seconds: 采样时长
+        """
+        me = threading.get_ident()
+        names: Dict[int, str] = {}
+        started = time.perf_counter()
+        deadline = started + seconds
+        while time.perf_counter() < deadline:
+            frames = sys._current_frames()
+            for ident, frame in frames.items():
+                if ident == me or (not self.include_idle and _is_idle(frame)):
+                    continue
+                name = names.get(ident)
+                if name is None:
+                    thread = threading._active.get(ident)
+                    name = names[ident] = thread.name if thread else f'thread-{ident}'
+                self.samples[(name,) + tuple(stack_of(frame))] += 1
+                self.total += 1
+            del frames
+            time.sleep(self.interval)
+        self.duration = time.perf_counter() - started
+
+    def collapsed(self) -> str:
+        """collapsed stack 格式的结果"""
+        return ''.join(f"{';'.join(stack)} {count}\n" for stack, count in self.samples.most_common())
+
+    def top(self, limit: int = 30) -> List[Dict]:
+        """
+        按自身采样数排序的函数
+        :param limit: 返回的函数个数
+        """
+        own: Counter = Counter()
+        inclusive: Counter = Counter()
+        for stack, count in self.samples.items():
+            own[stack[-1]] += count
+            for name in set(stack[1:]):
+                inclusive[name] += count
+        return [{'function': name, 'self': count, 'self_percent': round(count * 100 / max(self.total, 1), 2),
+                 'total': inclusive[name]} for name, count in own.most_common(limit)]
+
+
+_lock = threading.Lock()
+
+
+def run_profile(seconds: float, interval: float, include_idle: bool) -> Optional[SamplingProfiler]:
+    """
+    运行一次采样分析，已有分析在运行时返回 None
+    :param seconds: 采样时长
+    :param interval: 采样间隔
+    :param include_idle: 是否计入空闲等待
+    """
+    if not _lock.acquire(blocking=False):
+        return None
+    try:
+        profiler = SamplingProfiler(interval, include_idle)
+        profiler.run(seconds)
+        return profiler
+    finally:
+        _lock.release()
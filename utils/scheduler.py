@@ -3,11 +3,17 @@
 用于管理抖音监控等定时任务
 """
 import asyncio
+import time
 from typing import Optional
 from apscheduler.schedulers.asyncio import AsyncIOScheduler
 from apscheduler.triggers.interval import IntervalTrigger
 from lib.logger import logger
 from utils.douyin_monitor import start_monitor_task, get_monitor
+from utils.leader import is_leader
+from utils.shared_state import publish, shared_state
+
+# 从进程收到手动触发请求时写入共享状态，由主进程定期读取后执行
+RUN_REQUEST_KEY = 'monitor.run_request'
 
 
 class TaskScheduler:
@@ -17,6 +23,10 @@ class TaskScheduler:
         """初始化调度器"""
         self.scheduler: Optional[AsyncIOScheduler] = None
         self.monitor_task_id = "douyin_monitor_task"
+        self.run_request_task_id = "monitor_run_request_task"
+        self.run_request_poll_seconds = 5
+        # 定时巡检和手动触发的巡检共用，同一时间只执行一次巡检
+        self._sweep_lock = asyncio.Lock()
     
     def start(self):
         """启动调度器"""
@@ -29,6 +39,17 @@ class TaskScheduler:
         # 添加监控任务
         self._add_monitor_task()
         
+        # 多进程部署时读取从进程转交的手动触发请求
+        if shared_state.enabled:
+            self.scheduler.add_job(
+                func=self._poll_run_request,
+                trigger=IntervalTrigger(seconds=self.run_request_poll_seconds),
+                id=self.run_request_task_id,
+                name="手动触发监控请求",
+                replace_existing=True,
+                max_instances=1
+            )
+        
         # 启动调度器
         self.scheduler.start()
         logger.info("定时任务调度器启动成功")
@@ -54,25 +75,52 @@ class TaskScheduler:
         # 添加定时任务
         self.scheduler.add_job(
             func=self._run_monitor_task,
-            trigger=IntervalTrigger(hours=monitor.interval_hours),
+            trigger=IntervalTrigger(seconds=monitor.sweep_interval_seconds),
             id=self.monitor_task_id,
             name="抖音博主监控任务",
             replace_existing=True,
             max_instances=1  # 防止任务重叠执行
         )
         
-        logger.info(f"已添加抖音监控任务，间隔：{monitor.interval_hours}小时")
+        logger.info(f"已添加抖音监控任务，间隔：{monitor.sweep_interval_seconds / 60:.0f}分钟")
     
-    async def _run_monitor_task(self):
-        """运行监控任务"""
+    async def _run_monitor_task(self, spread: bool = True) -> bool:
+        """
+        运行监控任务，已有巡检在执行时跳过
+        :param spread: 是否把各用户的检查分散到监控间隔内
+        :return: 是否执行了巡检
+        """
+        if self._sweep_lock.locked():
+            logger.info("上一次巡检尚未完成，跳过本次监控任务")
+            return False
+        async with self._sweep_lock:
+            try:
+                logger.info("开始执行抖音监控任务")
+                monitor = get_monitor()
+                if monitor:
+                    await monitor.check_all_users(spread)
+                logger.info("抖音监控任务执行完成")
+                await self.publish_status()
+            except Exception as e:
+                logger.error(f"执行抖音监控任务时发生异常: {e}")
+        return True
+    
+    async def _poll_run_request(self):
+        """取出从进程转交的手动触发请求并执行，巡检正在执行时请求直接丢弃"""
+        requests = []
+        
+        def take(value):
+            requests.append(value)
+            return None
+        
         try:
-            logger.info("开始执行抖音监控任务")
-            monitor = get_monitor()
-            if monitor:
-                await monitor.check_all_users()
-            logger.info("抖音监控任务执行完成")
+            await shared_state.update(RUN_REQUEST_KEY, take)
         except Exception as e:
-            logger.error(f"执行抖音监控任务时发生异常: {e}")
+            logger.error(f"读取手动触发请求失败: {e}")
+            return
+        if requests[0]:
+            logger.info("执行从进程转交的手动触发监控请求")
+            await self._run_monitor_task(spread=False)
     
     def update_monitor_task(self):
         """更新监控任务"""
@@ -108,9 +156,16 @@ class TaskScheduler:
             "jobs": jobs
         }
     
-    async def run_monitor_once(self):
-        """立即执行一次监控任务"""
-        await self._run_monitor_task()
+    async def publish_status(self):
+        """多进程部署时把任务状态写入共享状态，供其他进程的状态接口读取"""
+        await publish('scheduler.status', self.get_job_status())
+
+    async def run_monitor_once(self) -> bool:
+        """
+        立即执行一次监控任务
+        :return: 是否执行了巡检，已有巡检在执行时为 False
+        """
+        return await self._run_monitor_task(spread=False)
 
 
 # 全局调度器实例
@@ -137,7 +192,13 @@ def stop_scheduler():
     scheduler.stop()
 
 
-async def run_monitor_immediately():
-    """立即运行一次监控任务"""
+async def run_monitor_immediately() -> str:
+    """
+    立即运行一次监控任务，巡检只在主进程执行，从进程把请求转交给主进程
+    :return: done 已执行完成，busy 已有巡检在执行，queued 已转交给主进程
+    """
+    if not is_leader():
+        await shared_state.set(RUN_REQUEST_KEY, time.time())
+        return 'queued'
     scheduler = get_scheduler()
-    await scheduler.run_monitor_once()
\ No newline at end of file
+    return 'done' if await scheduler.run_monitor_once() else 'busy'
\ No newline at end of file
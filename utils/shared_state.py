@@ -0,0 +1,123 @@
+"""
+进程间共享状态
+多进程部署时各进程的内存互不可见，账号隔离、账号变更版本、主进程的巡检状态等需要各进程读取的状态
+以 JSON 形式保存在本机 SQLite 中。单进程部署时不启用，相关读写直接跳过。
+"""
+import json
+import multiprocessing
+import os
+import time
+from typing import Any, Callable, Dict, Optional
+from utils.sqlite_store import SqliteStore
+
+
+class SharedStateStore(SqliteStore):
+    """进程间共享的键值存储"""
+
+    SCHEMA = '''
+    CREATE TABLE IF NOT EXISTS shared_state (
+        key TEXT PRIMARY KEY,
+        value TEXT NOT NULL,
+        updated_at REAL NOT NULL
+    );
+    '''
+
+    def __init__(self, path: str):
+        super().__init__(path)
+        self.enabled = False
+
+    async def get(self, key: str, default: Any = None) -> Any:
+        """
+        读取状态
+        :param key: 键
+        :param default: 不存在时的默认值
+        """
+        db = await self.connect()
+        async with db.execute('SELECT value FROM shared_state WHERE key = ?', (key,)) as cursor:
+            row = await cursor.fetchone()
+        return json.loads(row['value']) if row else default
+
+    async def set(self, key: str, value: Any) -> None:
+        """
+        写入状态
+        :param key: 键
+        :param value: 可 JSON 序列化的值
+        """
+        db = await self.connect()
+        async with self.lock:
+            await db.execute(
+                'INSERT INTO shared_state (key, value, updated_at) VALUES (?, ?, ?) '
+                'ON CONFLICT(key) DO UPDATE SET value = excluded.value, updated_at = excluded.updated_at',
+                (key, json.dumps(value, ensure_ascii=False), time.time()))
+            await db.commit()
+
+    async def update(self, key: str, mutator: Callable[[Any], Any], default: Any = None) -> Any:
+        """
+        在写事务中读取、修改并写回状态，其他进程同时修改同一个键时依次执行
+        :param key: 键
+        :param mutator: 参数为当前值，返回新值
+        :param default: 不存在时传给 mutator 的值
+        :return: 新值
+        """
+        db = await self.connect()
+        async with self.lock:
+            await db.execute('BEGIN IMMEDIATE')
+            try:
+                async with db.execute('SELECT value FROM shared_state WHERE key = ?', (key,)) as cursor:
+                    row = await cursor.fetchone()
+                value = mutator(json.loads(row['value']) if row else default)
+                await db.execute(
+                    'INSERT INTO shared_state (key, value, updated_at) VALUES (?, ?, ?) '
+                    'ON CONFLICT(key) DO UPDATE SET value = excluded.value, updated_at = excluded.updated_at',
+                    (key, json.dumps(value, ensure_ascii=False), time.time()))
+                await db.commit()
+            except BaseException:
+                await db.rollback()
+                raise
+        return value
+
+
+shared_state = SharedStateStore('data/shared/state.db')
+
+
+def is_multiprocess(config: Dict[str, Any]) -> bool:
+    """
+    是否以多进程方式部署
+    :param config: workers 配置
+    """
+    if config.get('count', 1) > 1:
+        return True
+    # uvicorn --workers 未指定时读取 WEB_CONCURRENCY
+    if os.getenv('WEB_CONCURRENCY', '').isdigit() and int(os.getenv('WEB_CONCURRENCY')) > 1:
+        return True
+    # uvicorn --workers 启动的工作进程由 multiprocessing 创建，gunicorn 会设置 SERVER_SOFTWARE
+    return multiprocessing.parent_process() is not None or 'gunicorn' in os.getenv('SERVER_SOFTWARE', '')
+
+
+def configure_shared_state(config: Dict[str, Any]) -> None:
+    """
+    多进程部署时启用共享状态，直接使用 uvicorn --workers 启动而未设置进程数时也能识别
+    :param config: workers 配置
+    """
+    shared_state.enabled = is_multiprocess(config)
+
+
+async def publish(key: str, value: Any) -> None:
+    """
+    多进程部署时写入共享状态，单进程时忽略
+    :param key: 键
+    :param value: 可 JSON 序列化的值
+    """
+    if shared_state.enabled:
+        await shared_state.set(key, value)
+
+
+async def read(key: str, default: Optional[Any] = None) -> Any:
+    """
+    读取共享状态，单进程时返回默认值
+    :param key: 键
+    :param default: 不存在或未启用时的默认值
+    """
+    if not shared_state.enabled:
+        return default
+    return await shared_state.get(key, default)
@@ -0,0 +1,65 @@
+"""
+SQLite 存储基类
+统一处理数据库目录创建、连接复用、WAL 模式和建表
+"""
+import asyncio
+import os
+import weakref
+from typing import Optional
+import aiosqlite
+
+# 已创建的存储，退出时统一关闭连接。aiosqlite 的连接线程不是守护线程，未关闭时进程无法退出
+_stores: 'weakref.WeakSet[SqliteStore]' = weakref.WeakSet()
+
+
+class SqliteStore:
+    """基于 aiosqlite 的存储基类，子类通过 SCHEMA 声明表结构"""
+
+    SCHEMA = ''
+
+    def __init__(self, path: str):
+        """
+        初始化存储
+        :param path: 数据库文件路径
+        """
+        self.path = path
+        self._db: Optional[aiosqlite.Connection] = None
+        self._connect_lock = asyncio.Lock()
+        # 多条语句组成的事务需要持有该锁，避免与其他协程交叉执行
+        self.lock = asyncio.Lock()
+        _stores.add(self)
+
+    async def connect(self) -> aiosqlite.Connection:
+        """
+        获取数据库连接，首次调用时建表
+        :return: 数据库连接
+        """
+        if self._db is not None:
+            return self._db
+        async with self._connect_lock:
+            if self._db is None:
+                directory = os.path.dirname(self.path)
+                if directory:
+                    os.makedirs(directory, exist_ok=True)
+                db = await aiosqlite.connect(self.path)
+                db.row_factory = aiosqlite.Row
+                await db.execute('PRAGMA journal_mode=WAL')
+                await db.execute('PRAGMA synchronous=NORMAL')
+                # 多进程部署时其他进程可能正在写入，等待而不是立即报 database is locked
+                await db.execute('PRAGMA busy_timeout=5000')
+                await db.executescript(self.SCHEMA)
+                await db.commit()
+                self._db = db
+        return self._db
+
+    async def close(self) -> None:
+        """关闭数据库连接"""
+        if self._db is not None:
+            await self._db.close()
+            self._db = None
+
+
+async def close_all_stores() -> None:
+    """关闭所有已打开的存储连接"""
+    for store in list(_stores):
+        await store.close()
@@ -0,0 +1,175 @@
+"""
+请求耗时追踪
+用 contextvar 记录当前 API 请求内各阶段（账号加载、签名、上游请求、解析等）的耗时，
+在响应中输出 Server-Timing 头，并可按采样比例把耗时明细写入本地 JSONL 文件；
+不在追踪中的调用（如后台巡检）记录耗时时只有一次 contextvar 读取
+"""
+import asyncio
+import functools
+import json
+import os
+import random
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Dict, List, Optional
+from lib.logger import logger
+
+# 不追踪的路径前缀：静态文件、指标和诊断接口
+SKIP_PREFIXES = ('/assets', '/static', '/metrics', '/debug')
+# 单个请求最多记录的阶段数，避免手动触发巡检等长请求占用过多内存
+MAX_SPANS = 1000
+
+_config: Dict[str, Any] = {
+    'enabled': True,
+    'sample_rate': 1.0,
+    'server_timing': True,
+    'output': '',
+}
+_current: ContextVar[Optional['Trace']] = ContextVar('trace', default=None)
+_write_lock = threading.Lock()
+
+
+class Trace:
+    """一次 API 请求的耗时记录"""
+
+    def __init__(self, name: str):
+        self.name = name
+        self.started_at = time.time()
+        self._start = time.perf_counter()
+        # (阶段名称, 相对请求开始的偏移, 耗时)，单位秒
+        self.spans: List[tuple] = []
+        self.dropped = 0
+
+    def add(self, name: str, start: float, duration: float) -> None:
+        if len(self.spans) >= MAX_SPANS:
+            self.dropped += 1
+            return
+        self.spans.append((name, start - self._start, duration))
+
+    @property
+    def elapsed(self) -> float:
+        return time.perf_counter() - self._start
+
+    def server_timing(self, total: float) -> str:
+        """
+        按阶段名称汇总耗时，生成 Server-Timing 头
+        :param total: 请求总耗时（秒）
+        """
+        summary: Dict[str, List[float]] = {}
+        for name, _, duration in self.spans:
+            item = summary.setdefault(name, [0.0, 0])
+            item[0] += duration
+            item[1] += 1
+        entries = [f'{name};dur={duration * 1000:.1f}' + (f';desc="x{count}"' if count > 1 else '')
+                   for name, (duration, count) in summary.items()]
+        entries.append(f'total;dur={total * 1000:.1f}')
+        return ', '.join(entries)
+
+    def to_record(self, total: float, status: int) -> Dict[str, Any]:
+        return {
+            'name': self.name,
+            'started_at': round(self.started_at, 3),
+            'status': status,
+            'duration_ms': round(total * 1000, 2),
+            'dropped': self.dropped,
+            'spans': [{'name': name, 'offset_ms': round(offset * 1000, 2), 'duration_ms': round(duration * 1000, 2)}
+                      for name, offset, duration in self.spans],
+        }
+
+
+def configure_tracing(config: Dict[str, Any]) -> None:
+    """
+    设置请求耗时追踪
+    :param config: tracing 配置，enabled、sample_rate、server_timing、output
+    """
+    _config.update(config or {})
+    output = _config.get('output')
+    if output:
+        os.makedirs(os.path.dirname(output) or '.', exist_ok=True)
+
+
+def current_trace() -> Optional[Trace]:
+    """当前请求的耗时记录，未在追踪中时返回 None"""
+    return _current.get()
+
+
+@contextmanager
+def span(name: str):
+    """
+    记录代码块的耗时，未在追踪中时不记录
+    :param name: 阶段名称，用作 Server-Timing 的指标名，如 douyin.sign
+    """
+    trace = _current.get()
+    if trace is None:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        trace.add(name, start, time.perf_counter() - start)
+
+
+def traced(name: str):
+    """
+    记录函数耗时的装饰器，支持普通函数和协程函数
+    :param name: 阶段名称
+    """
+    def decorator(func):
+        if asyncio.iscoroutinefunction(func):
+            @functools.wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                with span(name):
+                    return await func(*args, **kwargs)
+            return async_wrapper
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with span(name):
+                return func(*args, **kwargs)
+        return wrapper
+
+    return decorator
+
+
+def _append(path: str, line: str) -> None:
+    with _write_lock:
+        with open(path, 'a', encoding='utf-8') as f:
+            f.write(line + '\n')
+
+
+def _write(trace: Trace, total: float, status: int) -> None:
+    path = _config.get('output')
+    line = json.dumps(trace.to_record(total, status), ensure_ascii=False)
+    future = asyncio.get_running_loop().run_in_executor(None, _append, path, line)
+    future.add_done_callback(_log_write_error)
+
+
+def _log_write_error(future: asyncio.Future) -> None:
+    if not future.cancelled() and future.exception() is not None:
+        logger.error(f'写入请求耗时记录失败: {future.exception()}')
+
+
+async def tracing_middleware(request, call_next):
+    """
+    API 请求耗时追踪中间件，按采样比例开启追踪
+    """
+    path = request.url.path
+    if (not _config.get('enabled', True) or path.startswith(SKIP_PREFIXES) or path == '/'
+            or random.random() >= _config.get('sample_rate', 1.0)):
+        return await call_next(request)
+
+    trace = Trace(f'{request.method} {path}')
+    token = _current.set(trace)
+    try:
+        response = await call_next(request)
+    finally:
+        _current.reset(token)
+    total = trace.elapsed
+    if _config.get('server_timing', True):
+        response.headers['Server-Timing'] = trace.server_timing(total)
+    if _config.get('output'):
+        _write(trace, total, response.status_code)
+    return response
@@ -0,0 +1,86 @@
+"""
+点赞增速检测
+基于作品统计数据时序，按博主配置的规则找出点赞增速异常的作品，并按预测热度排序
+"""
+from typing import Any, Dict, List, Optional
+from utils.feishu_notification import calculate_heat_score
+
+
+class VelocityRule:
+    """点赞增速规则，全局默认值可被每个博主的 velocity 配置覆盖"""
+
+    def __init__(self, config: Dict[str, Any]):
+        """
+        :param config: 规则配置
+        """
+        self.enabled = config.get('enabled', True)
+        # 每小时点赞增量下限
+        self.likes_per_hour = config.get('likes_per_hour', 1000)
+        # 点赞增速的加速度下限（每小时²），为 None 时不判断
+        self.min_acceleration = config.get('min_acceleration')
+        # 增速在该博主作品中的分位下限，博主作品数少于 min_baseline 时不判断
+        self.min_percentile = config.get('min_percentile', 0.9)
+        self.min_baseline = config.get('min_baseline', 5)
+        # 最少点赞数，避免新作品的小样本误报
+        self.min_likes = config.get('min_likes', 100)
+
+    @classmethod
+    def for_user(cls, defaults: Dict[str, Any], user_config: Dict[str, Any]) -> Optional['VelocityRule']:
+        """
+        合并全局默认规则和博主规则
+        :param defaults: settings.velocity 配置
+        :param user_config: 博主配置
+        :return: 规则，未启用时返回 None
+        """
+        override = user_config.get('velocity')
+        if override is None and not defaults.get('enabled', False):
+            return None
+        rule = cls({**defaults, 'enabled': True, **(override or {})})
+        return rule if rule.enabled else None
+
+    def match(self, row: Dict[str, Any]) -> bool:
+        """
+        判断作品是否满足规则
+        :param row: VideoStatsStore.velocity_snapshot 的一行
+        """
+        if row['digg_count'] < self.min_likes or row['likes_per_hour'] < self.likes_per_hour:
+            return False
+        if self.min_acceleration is not None and (row['acceleration'] is None
+                                                  or row['acceleration'] < self.min_acceleration):
+            return False
+        if row['baseline_size'] >= self.min_baseline and row['percentile'] < self.min_percentile:
+            return False
+        return True
+
+
+def predict_heat(row: Dict[str, Any], horizon_hours: float) -> int:
+    """
+    按当前增速和加速度预测 horizon_hours 小时后的热度值
+    :param row: VideoStatsStore.velocity_snapshot 的一行
+    :param horizon_hours: 预测时长
+    """
+    growth = row['likes_per_hour'] * horizon_hours
+    if row['acceleration'] is not None:
+        # 加速度只用于放大增长，减速时至少按当前增速的一半外推
+        growth = max(growth + 0.5 * row['acceleration'] * horizon_hours ** 2, growth / 2)
+    return calculate_heat_score(int(row['digg_count'] + growth), row['comment_count'], row['share_count'])
+
+
+def detect_hot_videos(rows: List[Dict[str, Any]], rules: Dict[str, VelocityRule], observed_since: int,
+                      horizon_hours: float) -> List[Dict[str, Any]]:
+    """
+    在所有作品的增速快照上批量执行规则
+    :param rows: VideoStatsStore.velocity_snapshot 的结果
+    :param rules: sec_user_id 到规则的映射
+    :param observed_since: 只检测该时间之后有新数据点的作品，即本轮巡检检查过的作品
+    :param horizon_hours: 预测热度的时长
+    :return: 命中的作品，按预测热度降序
+    """
+    hits = []
+    for row in rows:
+        rule = rules.get(row['sec_user_id'])
+        if rule is None or row['ts'] < observed_since or not rule.match(row):
+            continue
+        hits.append({**row, 'predicted_heat': predict_heat(row, horizon_hours)})
+    hits.sort(key=lambda hit: hit['predicted_heat'], reverse=True)
+    return hits
@@ -0,0 +1,169 @@
+"""
+作品统计数据时序存储
+每次巡检把作品的点赞、评论、分享等计数追加为一个数据点，按 (aweme_id, ts) 聚簇存储，按时间范围查询只需一次索引定位
+"""
+import time
+from typing import Any, Dict, List, Optional
+from utils.sqlite_store import SqliteStore
+
+STAT_FIELDS = ('digg_count', 'comment_count', 'share_count', 'collect_count', 'play_count')
+
+
+class VideoStatsStore(SqliteStore):
+    """作品统计数据时序存储"""
+
+    SCHEMA = '''
+    CREATE TABLE IF NOT EXISTS video_meta (
+        aweme_id TEXT PRIMARY KEY,
+        sec_user_id TEXT NOT NULL,
+        create_time INTEGER NOT NULL,
+        description TEXT NOT NULL DEFAULT ''
+    ) WITHOUT ROWID;
+    CREATE INDEX IF NOT EXISTS idx_video_meta_user ON video_meta(sec_user_id, create_time);
+    CREATE INDEX IF NOT EXISTS idx_video_meta_time ON video_meta(create_time);
+    CREATE TABLE IF NOT EXISTS video_stats (
+        aweme_id TEXT NOT NULL,
+        ts INTEGER NOT NULL,
+        digg_count INTEGER NOT NULL,
+        comment_count INTEGER NOT NULL,
+        share_count INTEGER NOT NULL,
+        collect_count INTEGER NOT NULL,
+        play_count INTEGER NOT NULL,
+        PRIMARY KEY (aweme_id, ts)
+    ) WITHOUT ROWID;
+    '''
+
+    async def record(self, sec_user_id: str, videos: List[Dict], ts: Optional[int] = None) -> int:
+        """
+        追加一批作品的统计数据点
+        :param sec_user_id: 作者ID
+        :param videos: 作品列表，包含 aweme_id、create_time、statistics
+        :param ts: 采集时间，默认当前时间
+        :return: 写入的数据点数
+        """
+        ts = ts or int(time.time())
+        meta, points = [], []
+        for video in videos:
+            aweme_id = video.get('aweme_id')
+            if not aweme_id:
+                continue
+            statistics = video.get('statistics') or {}
+            meta.append((aweme_id, sec_user_id, video.get('create_time', 0), (video.get('desc') or '')[:200]))
+            points.append((aweme_id, ts) + tuple(int(statistics.get(field) or 0) for field in STAT_FIELDS))
+        if not points:
+            return 0
+        db = await self.connect()
+        async with self.lock:
+            await db.executemany(
+                'INSERT OR REPLACE INTO video_meta (aweme_id, sec_user_id, create_time, description) VALUES (?, ?, ?, ?)',
+                meta)
+            await db.executemany(
+                f'INSERT OR REPLACE INTO video_stats (aweme_id, ts, {", ".join(STAT_FIELDS)}) '
+                f'VALUES (?, ?, {", ".join("?" * len(STAT_FIELDS))})', points)
+            await db.commit()
+        return len(points)
+
+    async def get_meta(self, aweme_id: str) -> Optional[Dict[str, Any]]:
+        """
+        获取作品的作者和发布时间
+        :param aweme_id: 作品ID
+        """
+        db = await self.connect()
+        async with db.execute('SELECT * FROM video_meta WHERE aweme_id = ?', (aweme_id,)) as cursor:
+            row = await cursor.fetchone()
+        return dict(row) if row else None
+
+    async def history(self, aweme_id: str, start: int = 0, end: int = 0, bucket: int = 0,
+                      limit: int = 1000) -> List[Dict[str, Any]]:
+        """
+        按时间范围查询作品的统计数据点
+        :param aweme_id: 作品ID
+        :param start: 开始时间戳，0 表示不限
+        :param end: 结束时间戳，0 表示不限
+        :param bucket: 降采样的时间桶（秒），每个桶取最后一个数据点，0 表示不降采样
+        :param limit: 最多返回的数据点数，超出时返回最近的数据点
+        :return: 按时间升序的数据点
+        """
+        db = await self.connect()
+        end = end or 2 ** 62
+        columns = ', '.join(STAT_FIELDS)
+        if bucket > 0:
+            # SQLite 中与 MAX() 一起查询的其他列取自最大值所在的行，即每个桶的最后一个数据点
+            sql = f'''SELECT MAX(ts) AS ts, {columns} FROM video_stats
+                      WHERE aweme_id = ? AND ts BETWEEN ? AND ?
+                      GROUP BY ts / ? ORDER BY ts DESC LIMIT ?'''
+            params = (aweme_id, start, end, bucket, limit)
+        else:
+            sql = f'''SELECT ts, {columns} FROM video_stats
+                      WHERE aweme_id = ? AND ts BETWEEN ? AND ? ORDER BY ts DESC LIMIT ?'''
+            params = (aweme_id, start, end, limit)
+        async with db.execute(sql, params) as cursor:
+            rows = await cursor.fetchall()
+        return [dict(row) for row in reversed(rows)]
+
+    async def latest_digg_counts(self, aweme_ids: List[str]) -> Dict[str, int]:
+        """
+        批量获取作品最近一个数据点的点赞数
+        :param aweme_ids: 作品ID列表
+        :return: 作品ID到点赞数的映射，没有数据点的作品不在结果中
+        """
+        db = await self.connect()
+        counts = {}
+        for start in range(0, len(aweme_ids), 500):
+            chunk = aweme_ids[start:start + 500]
+            # 与 MAX() 一起查询的其他列取自最大值所在的行
+            async with db.execute(
+                    f'''SELECT aweme_id, MAX(ts) AS ts, digg_count FROM video_stats
+                        WHERE aweme_id IN ({", ".join("?" * len(chunk))}) GROUP BY aweme_id''', chunk) as cursor:
+                counts.update({row['aweme_id']: row['digg_count'] for row in await cursor.fetchall()})
+        return counts
+
+    async def velocity_snapshot(self, since_create_time: int) -> List[Dict[str, Any]]:
+        """
+        用窗口函数一次性计算所有作品最近的点赞增速、加速度，以及增速在同一博主作品中的分位
+        :param since_create_time: 只统计该时间之后发布的作品，同时作为博主基线的范围
+        :return: 每个作品一行，包含最新数据点、likes_per_hour、acceleration（每小时²，数据点不足时为 None）、percentile
+        """
+        db = await self.connect()
+        sql = '''
+        WITH points AS (
+            SELECT s.aweme_id, m.sec_user_id, m.create_time, s.ts, s.digg_count, s.comment_count, s.share_count,
+                   ROW_NUMBER() OVER w AS rn,
+                   LEAD(s.ts, 1) OVER w AS ts1, LEAD(s.digg_count, 1) OVER w AS digg1,
+                   LEAD(s.ts, 2) OVER w AS ts2, LEAD(s.digg_count, 2) OVER w AS digg2
+            FROM video_meta m JOIN video_stats s ON s.aweme_id = m.aweme_id
+            WHERE m.create_time >= ?
+            WINDOW w AS (PARTITION BY s.aweme_id ORDER BY s.ts DESC)
+        ),
+        latest AS (
+            SELECT aweme_id, sec_user_id, create_time, ts, digg_count, comment_count, share_count,
+                   -- 只有一个数据点时按发布以来的平均增速估算，发布不足 15 分钟按 15 分钟计
+                   CASE WHEN ts1 IS NULL THEN digg_count * 3600.0 / MAX(ts - create_time, 900)
+                        ELSE (digg_count - digg1) * 3600.0 / MAX(ts - ts1, 1) END AS likes_per_hour,
+                   CASE WHEN ts2 IS NULL THEN NULL
+                        ELSE ((digg_count - digg1) * 3600.0 / MAX(ts - ts1, 1)
+                              - (digg1 - digg2) * 3600.0 / MAX(ts1 - ts2, 1)) * 7200.0 / MAX(ts - ts2, 1)
+                   END AS acceleration,
+                   COUNT(*) OVER (PARTITION BY sec_user_id) AS baseline_size
+            FROM points WHERE rn = 1
+        )
+        SELECT *, PERCENT_RANK() OVER (PARTITION BY sec_user_id ORDER BY likes_per_hour) AS percentile
+        FROM latest
+        '''
+        async with db.execute(sql, (since_create_time,)) as cursor:
+            return [dict(row) for row in await cursor.fetchall()]
+
+    async def prune(self, cutoff_time: int) -> int:
+        """
+        删除发布时间早于 cutoff_time 的作品及其数据点
+        :param cutoff_time: 发布时间下限
+        :return: 删除的作品数
+        """
+        db = await self.connect()
+        async with self.lock:
+            await db.execute(
+                'DELETE FROM video_stats WHERE aweme_id IN (SELECT aweme_id FROM video_meta WHERE create_time < ?)',
+                (cutoff_time,))
+            cursor = await db.execute('DELETE FROM video_meta WHERE create_time < ?', (cutoff_time,))
+            await db.commit()
+        return cursor.rowcount
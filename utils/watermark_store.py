@@ -0,0 +1,58 @@
+"""
+博主作品水位存储
+记录每个博主已见过的最新作品发布时间，以及仍在监控时间窗口内的作品，用于增量获取作品列表
+"""
+from typing import Dict
+from utils.sqlite_store import SqliteStore
+
+
+class WatermarkStore(SqliteStore):
+    """博主作品水位存储"""
+
+    SCHEMA = '''
+    CREATE TABLE IF NOT EXISTS creator_watermarks (
+        sec_user_id TEXT PRIMARY KEY,
+        newest_create_time INTEGER NOT NULL
+    );
+    CREATE TABLE IF NOT EXISTS tracked_videos (
+        aweme_id TEXT PRIMARY KEY,
+        sec_user_id TEXT NOT NULL,
+        create_time INTEGER NOT NULL
+    );
+    CREATE INDEX IF NOT EXISTS idx_tracked_videos_user ON tracked_videos(sec_user_id, create_time);
+    '''
+
+    async def get(self, sec_user_id: str) -> Dict:
+        """
+        获取博主的水位
+        :param sec_user_id: 用户ID
+        :return: newest_create_time 和 tracked（作品ID到发布时间的映射），从未检查过时均为空
+        """
+        db = await self.connect()
+        async with db.execute('SELECT newest_create_time FROM creator_watermarks WHERE sec_user_id = ?',
+                              (sec_user_id,)) as cursor:
+            row = await cursor.fetchone()
+        async with db.execute('SELECT aweme_id, create_time FROM tracked_videos WHERE sec_user_id = ?',
+                              (sec_user_id,)) as cursor:
+            tracked = {item['aweme_id']: item['create_time'] for item in await cursor.fetchall()}
+        return {'newest_create_time': row['newest_create_time'] if row else 0, 'tracked': tracked}
+
+    async def update(self, sec_user_id: str, newest_create_time: int, tracked: Dict[str, int],
+                     cutoff_time: int) -> None:
+        """
+        在同一事务中更新博主的水位和跟踪的作品，并删除窗口外的作品
+        :param sec_user_id: 用户ID
+        :param newest_create_time: 已见过的最新作品发布时间
+        :param tracked: 需要继续跟踪的作品ID到发布时间的映射
+        :param cutoff_time: 时间窗口起点，早于该时间发布的作品不再跟踪
+        """
+        db = await self.connect()
+        async with self.lock:
+            await db.execute('INSERT OR REPLACE INTO creator_watermarks (sec_user_id, newest_create_time) VALUES (?, ?)',
+                             (sec_user_id, newest_create_time))
+            await db.execute('DELETE FROM tracked_videos WHERE sec_user_id = ?', (sec_user_id,))
+            await db.executemany(
+                'INSERT OR REPLACE INTO tracked_videos (aweme_id, sec_user_id, create_time) VALUES (?, ?, ?)',
+                [(aweme_id, sec_user_id, create_time) for aweme_id, create_time in tracked.items()
+                 if create_time >= cutoff_time])
+            await db.commit()